@@ -0,0 +1,179 @@
+"""Inventory totals and top-k heaps, maintained on every insert/edit/delete.
+
+The owning table calls add() when a product (or a new version of it)
+enters and remove() with its old field values before they change, so
+the dashboard figures are read in O(1) and never need a full scan.
+Money is accumulated in integer cents so repeated add/remove does not
+drift.
+"""
+import heapq
+from typing import Dict, List, Tuple
+
+
+class IndexedHeap:
+    """Binary min-heap of (priority, key) that can update or drop any key.
+
+    A position map from key to heap slot lets update()/remove() find the
+    entry in O(1) and restore the heap in O(log n).
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple] = []          # (priority, key)
+        self._pos: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pos
+
+    def push(self, key: str, priority) -> None:
+        if key in self._pos:
+            self.update(key, priority)
+            return
+        self._heap.append((priority, key))
+        self._pos[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def extend(self, entries) -> None:
+        """Add many (key, priority) pairs; rebuilds with heapify when cheaper."""
+        entries = list(entries)
+        if len(entries) < len(self._heap) // 4:
+            for key, priority in entries:
+                self.push(key, priority)
+            return
+        for key, priority in entries:
+            if key in self._pos:
+                self._heap[self._pos[key]] = (priority, key)
+            else:
+                self._pos[key] = len(self._heap)
+                self._heap.append((priority, key))
+        heapq.heapify(self._heap)
+        self._pos = {key: i for i, (_, key) in enumerate(self._heap)}
+
+    def update(self, key: str, priority) -> None:
+        i = self._pos[key]
+        old = self._heap[i][0]
+        self._heap[i] = (priority, key)
+        if priority < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, key: str) -> None:
+        i = self._pos.pop(key)
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            self._pos[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self._pos[last[1]])
+
+    def peek(self) -> Tuple:
+        return self._heap[0]
+
+    def smallest(self, k: int) -> List[Tuple]:
+        """The k smallest entries in order, in O(k log k) without popping."""
+        heap = self._heap
+        result = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(result) < k:
+            entry, i = heapq.heappop(frontier)
+            result.append(entry)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def _swap(self, i: int, j: int) -> None:
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, i: int) -> None:
+        heap = self._heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[i] < heap[parent]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i: int) -> None:
+        heap = self._heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and heap[child] < heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+
+def _cents(price) -> int:
+    return round(price * 100)
+
+
+class InventoryAggregates:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_quantity = 0
+        self._total_cents = 0
+        # product_type -> [count, quantity, value in cents]
+        self._by_type: Dict[str, List[int]] = {}
+        self._low_stock = IndexedHeap()       # priority: quantity
+        self._expensive = IndexedHeap()       # priority: -price
+
+    @property
+    def total_value(self) -> float:
+        """Stock value, sum of price * quantity, in RM."""
+        return self._total_cents / 100
+
+    def type_summary(self, product_type: str) -> dict:
+        count, quantity, cents = self._by_type.get(product_type, (0, 0, 0))
+        return {"count": count, "quantity": quantity, "value": cents / 100}
+
+    def types(self) -> Dict[str, dict]:
+        return {t: self.type_summary(t) for t in self._by_type}
+
+    def lowest_stock(self, n: int) -> List[Tuple[str, int]]:
+        """(product_id, quantity) of the n products with the least stock."""
+        return [(pid, qty) for qty, pid in self._low_stock.smallest(n)]
+
+    def most_expensive(self, n: int) -> List[Tuple[str, float]]:
+        return [(pid, -neg_price) for neg_price, pid in self._expensive.smallest(n)]
+
+    def _account(self, product, sign: int) -> None:
+        cents = _cents(product.price) * product.quantity
+        self.count += sign
+        self.total_quantity += sign * product.quantity
+        self._total_cents += sign * cents
+        row = self._by_type.setdefault(product.product_type, [0, 0, 0])
+        row[0] += sign
+        row[1] += sign * product.quantity
+        row[2] += sign * cents
+        if row[0] == 0:
+            del self._by_type[product.product_type]
+
+    def add(self, product) -> None:
+        self._account(product, 1)
+        self._low_stock.push(product.product_id, product.quantity)
+        self._expensive.push(product.product_id, -product.price)
+
+    def add_many(self, products) -> None:
+        products = list(products)
+        for product in products:
+            self._account(product, 1)
+        self._low_stock.extend((p.product_id, p.quantity) for p in products)
+        self._expensive.extend((p.product_id, -p.price) for p in products)
+
+    def remove(self, product) -> None:
+        # must be called with the field values the product was added with
+        self._account(product, -1)
+        self._low_stock.remove(product.product_id)
+        self._expensive.remove(product.product_id)
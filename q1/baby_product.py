@@ -10,3 +10,43 @@ class BabyProduct:
     def __str__(self):
         return (f"ID: {self.product_id}, Name: {self.name}, "
                 f"Type: {self.product_type}, Price: RM{self.price:.2f}, Qty: {self.quantity}")
+
+    @property
+    def numeric_id(self) -> int:
+        # 'P12345678' -> 12345678, parsed once and cached for hashing
+        try:
+            return self._numeric_id
+        except AttributeError:
+            self._numeric_id = int(self.product_id[1:])
+            return self._numeric_id
+
+
+class CompactBabyProduct:
+    """Same fields as BabyProduct but without a per-instance __dict__."""
+    __slots__ = ("product_id", "name", "product_type", "price", "quantity", "_numeric_id")
+
+    def __init__(self, product_id, name, product_type, price, quantity):
+        self.product_id = product_id
+        self.name = name
+        self.product_type = product_type
+        self.price = price
+        self.quantity = quantity
+
+    __str__ = BabyProduct.__str__
+    numeric_id = BabyProduct.numeric_id
+
+
+def clean_edit_fields(name=None, product_type=None, price=None, quantity=None):
+    """Check and coerce edit() arguments before anything is changed.
+
+    Raises ValueError/TypeError for a bad value, so a failed edit leaves
+    the product (and every index over it) exactly as it was.
+    """
+    for field, value in (("name", name), ("product_type", product_type)):
+        if value is not None and not isinstance(value, str):
+            raise TypeError(f"{field} must be a string, got {value!r}")
+    if price is not None:
+        price = float(price)
+    if quantity is not None:
+        quantity = int(quantity)
+    return name, product_type, price, quantity
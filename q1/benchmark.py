@@ -0,0 +1,396 @@
+"""Headless benchmarks for the inventory hash tables.
+
+Run from the q1 folder:
+
+    python benchmark.py suite --sizes 10 1000 100000 --json results.json
+    python benchmark.py backends --size 1000000
+    python benchmark.py contention --threads 1 2 4 8
+
+`suite` times insert, search (hit and miss), edit, delete and iteration on
+a fresh table per run, for sizes from 10 up to 10^7. It reports
+nanoseconds per operation with a 95% confidence interval over the
+repeats, plus the bytes each table keeps allocated. `backends` is the
+quick memory/throughput comparison of the chained and compact storage.
+`contention` runs a read/write mix from several threads against the
+lock-striped ConcurrentHashTable and a single-global-lock baseline.
+Nothing here touches an existing inventory, and plotting only happens
+when --plot is given (it writes an image, it never opens a window).
+"""
+import argparse
+import contextlib
+import csv
+import gc
+import json
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+
+from baby_product import BabyProduct, CompactBabyProduct
+from compact_table import CompactHashTable
+from concurrent_hash_table import ConcurrentHashTable, GlobalLockHashTable
+from hashing import HASH_STRATEGIES
+from hash_table import HashTable
+
+CATALOG = [
+    ("Diapering", "Baby Diaper"), ("Feeding", "Baby Milk"),
+    ("Bathing", "Baby Shampoo"), ("Clothing", "Baby Romper"),
+    ("Healthcare", "Baby Thermometer"),
+]
+
+BACKENDS = {
+    "chained": (HashTable, BabyProduct),
+    "compact": (CompactHashTable, CompactBabyProduct),
+}
+
+OPERATIONS = ["insert", "search_hit", "search_miss", "edit", "delete", "iterate"]
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+# two-sided 95% Student t critical values by degrees of freedom
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447,
+        7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228, 15: 2.131, 20: 2.086,
+        30: 2.042}
+
+
+def make_rows(n: int, seed: int = 42):
+    # plain tuples so the row data is shared by both backends
+    rng = random.Random(seed)
+    ids = rng.sample(range(10000000, 100000000), n)
+    rows = []
+    for i, num in enumerate(ids):
+        product_type, name = CATALOG[i % len(CATALOG)]
+        rows.append((f"P{num}", name, product_type,
+                     round(rng.uniform(10, 150), 2), rng.randint(10, 100)))
+    return rows
+
+
+def build(backend: str, rows, indexed: bool = False):
+    table_cls, product_cls = BACKENDS[backend]
+    table = table_cls(indexed=indexed)
+    for row in rows:
+        table.insert(product_cls(*row))
+    return table
+
+
+# ---- backend comparison ----
+def measure_memory(backend: str, rows, indexed: bool = False) -> int:
+    """Bytes still allocated by the finished table (row tuples excluded)."""
+    gc.collect()
+    tracemalloc.start()
+    table = build(backend, rows, indexed)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return current
+
+
+def measure_throughput(backend: str, rows, lookups: int = 100000):
+    gc.collect()
+    start = time.perf_counter()
+    table = build(backend, rows)
+    insert_s = time.perf_counter() - start
+
+    rng = random.Random(7)
+    keys = [rows[rng.randrange(len(rows))][0] for _ in range(lookups)]
+    start = time.perf_counter()
+    for key in keys:
+        table.search(key)
+    search_s = time.perf_counter() - start
+    return len(rows) / insert_s, lookups / search_s
+
+
+def compare_backends(n: int) -> None:
+    # storage only: secondary indexes and aggregates are left out
+    rows = make_rows(n)
+    print(f"\n{'Backend':<10}{'Memory (MB)':>14}{'B/record':>12}"
+          f"{'Insert/s':>14}{'Search/s':>14}")
+    for backend in BACKENDS:
+        mem = measure_memory(backend, rows)
+        inserts, searches = measure_throughput(backend, rows)
+        print(f"{backend:<10}{mem / 1e6:>14.1f}{mem / n:>12.0f}"
+              f"{inserts:>14,.0f}{searches:>14,.0f}")
+
+
+# ---- benchmark suite ----
+class _Discard:
+    # stdout replacement while timing edit(), which prints on every call
+    def write(self, _):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _timed(fn, ops: int) -> float:
+    """Run fn once with the GC paused; returns nanoseconds per operation."""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        fn()
+        elapsed = time.perf_counter_ns() - start
+    finally:
+        gc.enable()
+    return elapsed / max(ops, 1)
+
+
+def run_once(backend: str, rows, miss_ids, rng: random.Random,
+             hash_strategy: str = "modulo", indexed: bool = True) -> Dict[str, float]:
+    """One isolated pass over every operation; returns ns/op per operation."""
+    table_cls, product_cls = BACKENDS[backend]
+    table = table_cls(hash_strategy=hash_strategy, indexed=indexed)
+    products = [product_cls(*row) for row in rows]
+    hit_ids = [row[0] for row in rows]
+    rng.shuffle(hit_ids)
+    results = {}
+
+    def insert():
+        for product in products:
+            table.insert(product)
+
+    def search_hit():
+        for pid in hit_ids:
+            table.search(pid)
+
+    def search_miss():
+        for pid in miss_ids:
+            table.search(pid)
+
+    def edit():
+        with contextlib.redirect_stdout(_Discard()):
+            for pid in hit_ids:
+                table.edit(pid, quantity=1)
+
+    def iterate():
+        for _ in table.iter_products():
+            pass
+
+    def delete():
+        for pid in hit_ids:
+            table.delete(pid)
+
+    # delete goes last because it empties the table
+    for name, fn, ops in [("insert", insert, len(products)),
+                          ("search_hit", search_hit, len(hit_ids)),
+                          ("search_miss", search_miss, len(miss_ids)),
+                          ("edit", edit, len(hit_ids)),
+                          ("iterate", iterate, len(products)),
+                          ("delete", delete, len(hit_ids))]:
+        results[name] = _timed(fn, ops)
+    return results
+
+
+def confidence_interval(samples: List[float]):
+    mean = statistics.fmean(samples)
+    if len(samples) < 2:
+        return mean, mean
+    df = len(samples) - 1
+    # fall back to the next smaller tabulated df (slightly wider interval)
+    t = 1.96 if df > 30 else T_95[max(k for k in T_95 if k <= df)]
+    half = t * statistics.stdev(samples) / math.sqrt(len(samples))
+    return mean - half, mean + half
+
+
+def run_suite(backends: List[str], sizes: List[int], repeats: int, warmup: int,
+              memory: bool, seed: int, hash_strategy: str = "modulo",
+              indexed: bool = True) -> List[dict]:
+    records = []
+    for backend in backends:
+        for n in sizes:
+            # draw 2n distinct ids: the first half is loaded, the rest are misses
+            all_rows = make_rows(2 * n, seed)
+            rows, miss_ids = all_rows[:n], [row[0] for row in all_rows[n:]]
+            rng = random.Random(seed)
+            samples: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+            for run in range(warmup + repeats):
+                result = run_once(backend, rows, miss_ids, rng, hash_strategy, indexed)
+                if run >= warmup:
+                    for op, ns in result.items():
+                        samples[op].append(ns)
+            mem = measure_memory(backend, rows, indexed) if memory else None
+            for op in OPERATIONS:
+                low, high = confidence_interval(samples[op])
+                records.append({
+                    "backend": backend, "hash": hash_strategy, "indexed": indexed,
+                    "size": n, "operation": op,
+                    "repeats": repeats,
+                    "mean_ns": statistics.fmean(samples[op]),
+                    "median_ns": statistics.median(samples[op]),
+                    "stdev_ns": statistics.stdev(samples[op]) if repeats > 1 else 0.0,
+                    "ci95_low_ns": low, "ci95_high_ns": high,
+                    "bytes_per_record": mem / n if mem is not None else None,
+                })
+            print(f"{backend:<8} n={n:<9,} " + "  ".join(
+                f"{r['operation']}={r['mean_ns']:.0f}ns" for r in records[-len(OPERATIONS):]),
+                file=sys.stderr)
+    return records
+
+
+# ---- contention benchmark ----
+CONCURRENT_TABLES = {
+    "striped": ConcurrentHashTable,
+    "global_lock": GlobalLockHashTable,
+}
+
+
+def run_contention(impl: str, threads: int, preload: int, ops_per_thread: int,
+                   write_ratio: float, seed: int) -> dict:
+    table = CONCURRENT_TABLES[impl]()
+    rows = make_rows(preload + threads * ops_per_thread, seed)
+    for row in rows[:preload]:
+        table.insert(BabyProduct(*row))
+    loaded = [row[0] for row in rows[:preload]]
+    # HashTable grows incrementally; finish that now so the timed window
+    # doesn't pay for the preload (ConcurrentHashTable resizes at once)
+    if hasattr(table, "finish_rehash"):
+        table.finish_rehash()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(tid: int) -> None:
+        rng = random.Random(seed + tid)
+        # each thread inserts/deletes its own fresh ids, edits/reads shared ones
+        fresh = rows[preload + tid * ops_per_thread:preload + (tid + 1) * ops_per_thread]
+        plan = []
+        for i in range(ops_per_thread):
+            r = rng.random()
+            if r < write_ratio / 2:
+                plan.append(("edit", rng.choice(loaded)))
+            elif r < write_ratio:
+                plan.append(("insert", fresh[i]))
+            else:
+                plan.append(("search", rng.choice(loaded)))
+        barrier.wait()
+        for op, arg in plan:
+            if op == "search":
+                table.search(arg)
+            elif op == "edit":
+                table.edit(arg, quantity=1)
+            else:
+                table.insert(BabyProduct(*arg))
+                table.delete(arg[0])
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter_ns() - start
+    total = threads * ops_per_thread
+    return {"impl": impl, "threads": threads, "ops": total,
+            "write_ratio": write_ratio, "elapsed_ns": elapsed,
+            "ops_per_s": total / (elapsed / 1e9)}
+
+
+def write_json(records: List[dict], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump({"python": sys.version.split()[0], "results": records}, f, indent=2)
+
+
+def write_csv(records: List[dict], path: str) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def plot(records: List[dict], path: str) -> None:
+    # imported here so the suite itself runs without matplotlib or a display
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(9, 5))
+    for backend in sorted({r["backend"] for r in records}):
+        for op in OPERATIONS:
+            points = [r for r in records if r["backend"] == backend and r["operation"] == op]
+            if not points:
+                continue
+            sizes = [r["size"] for r in points]
+            ax.errorbar(sizes, [r["mean_ns"] for r in points],
+                        yerr=[[r["mean_ns"] - r["ci95_low_ns"] for r in points],
+                              [r["ci95_high_ns"] - r["mean_ns"] for r in points]],
+                        marker="o", capsize=3, label=f"{backend} {op}")
+    ax.set_xscale("log")
+    ax.set_xlabel("Number of Records")
+    ax.set_ylabel("Time per Operation (ns)")
+    ax.set_title("Hash Table Operation Cost")
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend(fontsize="small", ncol=2)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    suite = sub.add_parser("suite", help="per-operation timings across table sizes")
+    suite.add_argument("--backend", nargs="+", choices=list(BACKENDS), default=["chained"])
+    suite.add_argument("--hash", choices=list(HASH_STRATEGIES), default="modulo")
+    suite.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES,
+                       help="table sizes to measure (up to 10000000)")
+    suite.add_argument("--repeats", type=int, default=5)
+    suite.add_argument("--warmup", type=int, default=1)
+    suite.add_argument("--seed", type=int, default=42)
+    suite.add_argument("--no-index", action="store_true",
+                       help="measure raw storage without secondary indexes/aggregates")
+    suite.add_argument("--no-memory", action="store_true",
+                       help="skip the tracemalloc pass (slow for big sizes)")
+    suite.add_argument("--json", help="write results as JSON to this path")
+    suite.add_argument("--csv", help="write results as CSV to this path")
+    suite.add_argument("--plot", help="save a log-scale chart to this image path")
+
+    backends = sub.add_parser("backends", help="memory/throughput of chained vs compact")
+    backends.add_argument("--size", type=int, default=100000,
+                          help="number of products to load (default 100000)")
+
+    contention = sub.add_parser("contention", help="striped locks vs one global lock")
+    contention.add_argument("--threads", nargs="+", type=int, default=[1, 2, 4, 8])
+    contention.add_argument("--preload", type=int, default=100000)
+    contention.add_argument("--ops", type=int, default=20000, help="operations per thread")
+    contention.add_argument("--write-ratio", type=float, default=0.2)
+    contention.add_argument("--seed", type=int, default=42)
+    contention.add_argument("--json", help="write results as JSON to this path")
+
+    args = parser.parse_args()
+    if args.command == "backends":
+        compare_backends(args.size)
+        return
+    if args.command == "contention":
+        results = []
+        print(f"{'Impl':<12}{'Threads':>8}{'ops/s':>14}")
+        for impl in CONCURRENT_TABLES:
+            for threads in args.threads:
+                r = run_contention(impl, threads, args.preload, args.ops,
+                                   args.write_ratio, args.seed)
+                results.append(r)
+                print(f"{impl:<12}{threads:>8}{r['ops_per_s']:>14,.0f}")
+        if args.json:
+            write_json(results, args.json)
+        return
+
+    if args.repeats < 1:
+        suite.error(f"--repeats must be at least 1, got {args.repeats}")
+    if args.warmup < 0:
+        suite.error(f"--warmup must be at least 0, got {args.warmup}")
+    records = run_suite(args.backend, args.sizes, args.repeats, args.warmup,
+                        not args.no_memory, args.seed, args.hash, not args.no_index)
+    if args.json:
+        write_json(records, args.json)
+    if args.csv:
+        write_csv(records, args.csv)
+    if args.plot:
+        plot(records, args.plot)
+    if not (args.json or args.csv):
+        json.dump(records, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Open-addressing inventory table stored in parallel arrays.
+
+Drop-in alternative to HashTable: the same insert/search/edit/delete/
+get_all_products calls, but records live in flat typed arrays instead of
+per-bucket lists of objects. The numeric part of 'P########' is kept as a
+machine integer, and names/types (which repeat a lot in a catalogue) are
+interned so each slot only stores a small integer code.
+
+Collisions use linear probing; deletes shift the following run back so no
+tombstones are left behind.
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from baby_product import CompactBabyProduct, clean_edit_fields
+from aggregates import InventoryAggregates
+from hashing import HashStrategy, resolve_strategy
+from id_utils import ProductIdAllocator
+from indexes import ProductIndex
+
+EMPTY = -1
+
+
+class CompactHashTable:
+    def __init__(self, size: int = 128, max_load_factor: float = 0.7,
+                 hash_strategy="modulo", indexed: bool = True):
+        if not 0 < max_load_factor < 1:
+            raise ValueError("max_load_factor must be between 0 and 1")
+        self.max_load_factor = max_load_factor
+        self._hash: HashStrategy = resolve_strategy(hash_strategy)
+        self.count = 0
+        # interned strings shared by every slot
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        # indexed=False keeps only the raw storage (no queries beyond by-ID)
+        self.index = ProductIndex() if indexed else None
+        # running totals and top-k heaps for dashboards
+        self.aggregates = InventoryAggregates() if indexed else None
+        # ID allocator backed by this table, so it never returns an ID in use
+        self.ids = ProductIdAllocator(is_used=self.__contains__)
+        self._allocate(self._capacity_for(size))
+
+    def _capacity_for(self, n: int) -> int:
+        capacity = 8
+        while capacity < n:
+            capacity *= 2
+        return capacity
+
+    def _allocate(self, capacity: int) -> None:
+        self.size = capacity
+        self._mask = capacity - 1
+        # 'P########' ids fit in 32 bits, so 4-byte ints are enough for keys
+        self._keys = array("i", [EMPTY]) * capacity
+        self._names = array("i", [0]) * capacity
+        self._types = array("i", [0]) * capacity
+        self._prices = array("d", [0.0]) * capacity
+        self._quantities = array("i", [0]) * capacity
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, product_id: str) -> bool:
+        return self._keys[self._find_slot(int(product_id[1:]))] != EMPTY
+
+    def load_factor(self) -> float:
+        return self.count / self.size
+
+    def hash_function(self, key: str) -> int:
+        return self._hash(int(key[1:]), self.size)
+
+    def _intern(self, s: str) -> int:
+        code = self._string_codes.get(s)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(s)
+            self._string_codes[s] = code
+        return code
+
+    def _find_slot(self, key: int) -> int:
+        # slot holding key, or the empty slot where it would go
+        keys = self._keys
+        mask = self._mask
+        i = self._hash(key, self.size)
+        while True:
+            k = keys[i]
+            if k == key or k == EMPTY:
+                return i
+            i = (i + 1) & mask
+
+    def _product_at(self, i: int) -> CompactBabyProduct:
+        return CompactBabyProduct(
+            f"P{self._keys[i]:08d}",
+            self._strings[self._names[i]],
+            self._strings[self._types[i]],
+            self._prices[i],
+            self._quantities[i],
+        )
+
+    def _write(self, i: int, key: int, product) -> None:
+        self._keys[i] = key
+        self._names[i] = self._intern(product.name)
+        self._types[i] = self._intern(product.product_type)
+        self._prices[i] = product.price
+        self._quantities[i] = product.quantity
+
+    def _grow(self, capacity: Optional[int] = None) -> None:
+        old = (self._keys, self._names, self._types, self._prices, self._quantities)
+        self._allocate(capacity or self.size * 2)
+        keys, names, types, prices, quantities = old
+        for j, key in enumerate(keys):
+            if key != EMPTY:
+                i = self._find_slot(key)
+                self._keys[i] = key
+                self._names[i] = names[j]
+                self._types[i] = types[j]
+                self._prices[i] = prices[j]
+                self._quantities[i] = quantities[j]
+
+    def insert(self, product) -> None:
+        self._insert(product)
+
+    def _insert(self, product, index: bool = True) -> bool:
+        key = int(product.product_id[1:])
+        i = self._find_slot(key)
+        is_new = self._keys[i] == EMPTY
+        if is_new:
+            if (self.count + 1) > self.size * self.max_load_factor:
+                self._grow()
+                i = self._find_slot(key)
+            self.count += 1
+        else:
+            # a duplicate id simply overwrites the slot, like HashTable.insert
+            self._untrack_slot(i)
+        self._write(i, key, product)
+        if index:
+            self._track_slot(i)
+        return is_new
+
+    # ---- bulk operations ----
+    def reserve(self, count: int) -> None:
+        capacity = self._capacity_for(int(count / self.max_load_factor) + 1)
+        if capacity > self.size:
+            self._grow(capacity)
+
+    def insert_many(self, products: Iterable, count_hint: Optional[int] = None,
+                    unique: bool = False) -> int:
+        """Insert products from any iterable; returns how many were new.
+
+        Probing already finds the free slot and any duplicate in one pass,
+        so unique=True only lets the secondary index be filled in one batch.
+        """
+        if count_hint is None and hasattr(products, "__len__"):
+            count_hint = len(products)
+        if count_hint:
+            self.reserve(self.count + count_hint)
+        if not unique:
+            return sum(self._insert(product) for product in products)
+        added = []
+        for product in products:
+            self._insert(product, index=False)
+            added.append(product)
+        self._track_many(added)
+        return len(added)
+
+    def upsert_many(self, products: Iterable,
+                    count_hint: Optional[int] = None) -> Tuple[int, int]:
+        if count_hint is None and hasattr(products, "__len__"):
+            count_hint = len(products)
+        if count_hint:
+            self.reserve(self.count + count_hint)
+        inserted = updated = 0
+        for product in products:
+            if self._insert(product):
+                inserted += 1
+            else:
+                updated += 1
+        return inserted, updated
+
+    def delete_many(self, product_ids: Iterable[str]) -> int:
+        return sum(self.delete(pid) for pid in product_ids)
+
+    def search(self, product_id: str) -> Optional[CompactBabyProduct]:
+        # returns a snapshot object; change stored data through edit()
+        i = self._find_slot(int(product_id[1:]))
+        if self._keys[i] == EMPTY:
+            return None
+        return self._product_at(i)
+
+    def edit(self, product_id: str, name=None, product_type=None, price=None,
+             quantity=None) -> bool:
+        # validate first: a bad value must not leave the slot untracked
+        name, product_type, price, quantity = clean_edit_fields(
+            name, product_type, price, quantity)
+        i = self._find_slot(int(product_id[1:]))
+        if self._keys[i] != EMPTY:
+            self._untrack_slot(i)
+            if name:
+                self._names[i] = self._intern(name)
+            if product_type:
+                self._types[i] = self._intern(product_type)
+            if price is not None:
+                self._prices[i] = price
+            if quantity is not None:
+                self._quantities[i] = quantity
+            self._track_slot(i)
+            print("Product updated successfully!")
+            return True
+        else:
+            print("Product not found.")
+            return False
+
+    def delete(self, product_id: str) -> bool:
+        keys = self._keys
+        mask = self._mask
+        i = self._find_slot(int(product_id[1:]))
+        if keys[i] == EMPTY:
+            return False
+        self._untrack_slot(i)
+        self.ids.release(product_id)
+        # backward-shift deletion: pull later entries of the probe run into
+        # the hole whenever their home slot allows it
+        j = i
+        while True:
+            j = (j + 1) & mask
+            k = keys[j]
+            if k == EMPTY:
+                break
+            home = self._hash(k, self.size)
+            # entry at j may move to i only if i lies on its probe path
+            if (j > i and (home <= i or home > j)) or (j < i and home <= i and home > j):
+                keys[i] = k
+                self._names[i] = self._names[j]
+                self._types[i] = self._types[j]
+                self._prices[i] = self._prices[j]
+                self._quantities[i] = self._quantities[j]
+                i = j
+        keys[i] = EMPTY
+        self.count -= 1
+        return True
+
+    def _track_slot(self, i: int) -> None:
+        if self.index is not None:
+            product = self._product_at(i)
+            self.index.add(product)
+            self.aggregates.add(product)
+
+    def _track_many(self, products: list) -> None:
+        if self.index is not None:
+            self.index.add_many(products)
+            self.aggregates.add_many(products)
+
+    def _untrack_slot(self, i: int) -> None:
+        # call before the slot's fields change
+        if self.index is not None:
+            product = self._product_at(i)
+            self.index.remove(product)
+            self.aggregates.remove(product)
+
+    def find_by_type(self, product_type: str) -> Iterator:
+        return (self.search(pid) for pid in self.index.ids_by_type(product_type))
+
+    def find_by_name(self, name: str) -> Iterator:
+        return (self.search(pid) for pid in self.index.ids_by_name(name))
+
+    def find_by_price(self, low=None, high=None, product_type=None) -> Iterator:
+        return (self.search(pid)
+                for pid in self.index.ids_by_price(low, high, product_type))
+
+    def find_by_quantity(self, low=None, high=None, product_type=None) -> Iterator:
+        return (self.search(pid)
+                for pid in self.index.ids_by_quantity(low, high, product_type))
+
+    def lowest_stock(self, n: int = 10) -> list:
+        return [self.search(pid) for pid, _ in self.aggregates.lowest_stock(n)]
+
+    def most_expensive(self, n: int = 10) -> list:
+        return [self.search(pid) for pid, _ in self.aggregates.most_expensive(n)]
+
+    # ---- distribution statistics ----
+    def stats(self) -> dict:
+        """Probe-length figures for spotting clustering."""
+        histogram = {}
+        longest = 0
+        total = 0
+        for i, key in enumerate(self._keys):
+            if key == EMPTY:
+                continue
+            # slots inspected by a successful search for this key
+            probes = ((i - self._hash(key, self.size)) & self._mask) + 1
+            histogram[probes] = histogram.get(probes, 0) + 1
+            longest = max(longest, probes)
+            total += probes
+        return {
+            "size": self.size,
+            "count": self.count,
+            "load_factor": self.load_factor(),
+            "longest_probe": longest,
+            "probe_histogram": dict(sorted(histogram.items())),
+            # products not sitting in their home slot
+            "collisions": self.count - histogram.get(1, 0),
+            "avg_probe_length": total / self.count if self.count else 0.0,
+        }
+
+    def display_id(self) -> None:
+        print("\n===== PRODUCT IDS IN COMPACT TABLE =====")
+        for i, key in enumerate(self._keys):
+            if key != EMPTY:
+                print(f"Slot {i}: P{key:08d}")
+
+    def display_items(self) -> None:
+        print("\n===== INVENTORY RECORDS =====")
+        for i, key in enumerate(self._keys):
+            if key != EMPTY:
+                print(f"Slot {i}: {self._product_at(i)}")
+
+    def get_all_products(self):
+        return list(self.iter_products())
+
+    def iter_products(self) -> Iterator[CompactBabyProduct]:
+        for i, key in enumerate(self._keys):
+            if key != EMPTY:
+                yield self._product_at(i)
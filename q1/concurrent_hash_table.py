@@ -0,0 +1,198 @@
+"""Thread-safe inventory table with lock striping and copy-on-write buckets.
+
+Readers never take a lock: each bucket is an immutable tuple, and a writer
+publishes a new tuple in a single assignment, so a reader always sees a
+whole bucket. Stored products are never modified in place either. edit()
+and the overwrite path of insert() swap in a new product object, so a
+reader holding a product from search() can never see a half-applied
+update.
+
+Writers lock one of `stripes` locks, picked from the product ID, so writes
+to different stripes run in parallel. The bucket count is always a
+multiple of the stripe count, so two keys that share a bucket also share
+a stripe lock. Resizing takes every stripe lock
+(always in the same order) and swaps in the rebuilt bucket array, so it
+cannot interleave with a write.
+
+Unlike HashTable this class keeps no secondary indexes and its edit()
+does not print; it is meant to sit behind a service, not the menu.
+"""
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+from baby_product import BabyProduct
+from hash_table import HashTable
+from id_utils import ProductIdAllocator
+
+
+class ConcurrentHashTable:
+    def __init__(self, size: int = 64, stripes: int = 16,
+                 max_load_factor: float = 0.75, min_load_factor: float = 0.1):
+        self.max_load_factor = max_load_factor
+        self.min_load_factor = min_load_factor
+        # round up so every bucket maps to exactly one stripe
+        size = max(stripes, -(-size // stripes) * stripes)
+        self._min_size = size
+        self._table: List[Tuple] = [()] * size
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # per-stripe counters, each only touched under its own lock
+        self._counts = [0] * stripes
+        self.ids = ProductIdAllocator(is_used=self.__contains__)
+
+    @property
+    def size(self) -> int:
+        return len(self._table)
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def __contains__(self, product_id: str) -> bool:
+        return self.search(product_id) is not None
+
+    def load_factor(self) -> float:
+        return len(self) / self.size
+
+    def _stripe(self, product_id: str) -> int:
+        # independent of the table size, so a key keeps its lock across resizes
+        return int(product_id[1:]) % len(self._locks)
+
+    def search(self, product_id: str) -> Optional[BabyProduct]:
+        table = self._table
+        for item in table[int(product_id[1:]) % len(table)]:
+            if item.product_id == product_id:
+                return item
+        return None
+
+    def insert(self, product) -> None:
+        stripe = self._stripe(product.product_id)
+        with self._locks[stripe]:
+            table = self._table
+            index = int(product.product_id[1:]) % len(table)
+            bucket = table[index]
+            for i, item in enumerate(bucket):
+                if item.product_id == product.product_id:
+                    table[index] = bucket[:i] + (product,) + bucket[i + 1:]
+                    return
+            table[index] = bucket + (product,)
+            self._counts[stripe] += 1
+        if len(self) > self.size * self.max_load_factor:
+            self._resize()
+
+    def edit(self, product_id: str, name=None, product_type=None, price=None,
+             quantity=None) -> bool:
+        """Replace the product with an updated copy; all fields change at once."""
+        with self._locks[self._stripe(product_id)]:
+            table = self._table
+            index = int(product_id[1:]) % len(table)
+            bucket = table[index]
+            for i, item in enumerate(bucket):
+                if item.product_id == product_id:
+                    updated = BabyProduct(
+                        product_id,
+                        name or item.name,
+                        product_type or item.product_type,
+                        item.price if price is None else price,
+                        item.quantity if quantity is None else quantity,
+                    )
+                    table[index] = bucket[:i] + (updated,) + bucket[i + 1:]
+                    return True
+        return False
+
+    def delete(self, product_id: str) -> bool:
+        stripe = self._stripe(product_id)
+        with self._locks[stripe]:
+            table = self._table
+            index = int(product_id[1:]) % len(table)
+            bucket = table[index]
+            for i, item in enumerate(bucket):
+                if item.product_id == product_id:
+                    table[index] = bucket[:i] + bucket[i + 1:]
+                    self._counts[stripe] -= 1
+                    break
+            else:
+                return False
+        self.ids.release(product_id)
+        if self.size > self._min_size and len(self) < self.size * self.min_load_factor:
+            self._resize()
+        return True
+
+    def _resize(self) -> None:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            # decide under the locks: another thread may have resized while
+            # we were waiting for them
+            count = len(self)
+            if count > self.size * self.max_load_factor:
+                new_size = self.size * 2
+            elif self.size > self._min_size and count < self.size * self.min_load_factor:
+                new_size = max(self._min_size, self.size // 2)
+            else:
+                return
+            buckets: List[list] = [[] for _ in range(new_size)]
+            for bucket in self._table:
+                for item in bucket:
+                    buckets[int(item.product_id[1:]) % new_size].append(item)
+            self._table = [tuple(b) for b in buckets]
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    def iter_products(self) -> Iterator[BabyProduct]:
+        # walks a consistent bucket array; concurrent writes may or may not
+        # show up, but nothing is ever seen half-written
+        for bucket in self._table:
+            yield from bucket
+
+    def get_all_products(self):
+        return list(self.iter_products())
+
+
+class GlobalLockHashTable:
+    """Baseline for the contention benchmark: one lock around every call.
+
+    Like ConcurrentHashTable it keeps no secondary indexes and prints
+    nothing, so the two differ only in how they lock.
+    """
+
+    def __init__(self, size: int = 64):
+        self._table = HashTable(size=size, indexed=False)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._table)
+
+    def search(self, product_id: str):
+        with self._lock:
+            return self._table.search(product_id)
+
+    def insert(self, product) -> None:
+        with self._lock:
+            self._table.insert(product)
+
+    def edit(self, product_id: str, name=None, product_type=None, price=None,
+             quantity=None) -> bool:
+        # HashTable.edit reports to stdout; nothing is indexed here, so
+        # updating the fields in place is the whole edit
+        with self._lock:
+            product = self._table.search(product_id)
+            if product is None:
+                return False
+            if name:
+                product.name = name
+            if product_type:
+                product.product_type = product_type
+            if price is not None:
+                product.price = price
+            if quantity is not None:
+                product.quantity = quantity
+            return True
+
+    def delete(self, product_id: str) -> bool:
+        with self._lock:
+            return self._table.delete(product_id)
+
+    def finish_rehash(self) -> None:
+        with self._lock:
+            self._table.finish_rehash()
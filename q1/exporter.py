@@ -1,16 +1,171 @@
 import csv
+import struct
+import sys
+from array import array
+from itertools import islice
+from typing import Callable, Iterator, List, Optional
+
+from baby_product import BabyProduct
+
+CSV_HEADER = ["product_id", "name", "product_type", "price", "quantity"]
+
+# binary format: magic, total row count, then chunks of
+#   <I rows> ids<u32> prices<f64> quantities<i32> names types
+# where each string column is <I byte length> lengths<u32> utf-8 bytes.
+# A chunk with 0 rows ends the file. Numbers are little-endian.
+BINARY_MAGIC = b"BABYCOL1"
+BINARY_HEADER = struct.Struct("<8sQ")
+CHUNK_HEADER = struct.Struct("<I")
+
 
 def export_to_csv(hash_table, filename: str = "baby_products.csv") -> None:
     products_exist = False
+    # group by the table's own hash so this works for every storage backend
+    buckets = {}
+    for p in hash_table.get_all_products():
+        buckets.setdefault(hash_table.hash_function(p.product_id), []).append(p.product_id)
     with open(filename, mode="w", newline="") as file:
         writer = csv.writer(file)
         writer.writerow(["Table Index", "Product IDs"])
-        for i, bucket in enumerate(hash_table.table):
-            if bucket:
-                products_exist = True
-                product_ids = ", ".join(p.product_id for p in bucket)
-                writer.writerow([i, product_ids])
+        for i in sorted(buckets):
+            products_exist = True
+            writer.writerow([i, ", ".join(buckets[i])])
     if products_exist:
         print(f"\nExported all product IDs (grouped by table index) to '{filename}' successfully!")
     else:
         print("No products in the hash table to export.")
+
+
+def _chunks(hash_table, predicate, chunk_size: int) -> Iterator[list]:
+    products = hash_table.iter_products()
+    if predicate is not None:
+        products = filter(predicate, products)
+    while True:
+        chunk = list(islice(products, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---- full-record CSV ----
+def export_products_csv(hash_table, filename: str,
+                        predicate: Optional[Callable] = None,
+                        chunk_size: int = 10000) -> int:
+    """Stream every product (or those matching predicate) to CSV; returns the row count."""
+    rows = 0
+    with open(filename, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for chunk in _chunks(hash_table, predicate, chunk_size):
+            writer.writerows((p.product_id, p.name, p.product_type, p.price, p.quantity)
+                             for p in chunk)
+            rows += len(chunk)
+    return rows
+
+
+def read_products_csv(filename: str, product_cls=BabyProduct) -> Iterator:
+    with open(filename, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        if next(reader, None) != CSV_HEADER:
+            raise ValueError(f"'{filename}' is not a full-record product export")
+        for pid, name, product_type, price, quantity in reader:
+            yield product_cls(pid, name, product_type, float(price), int(quantity))
+
+
+def import_products_csv(hash_table, filename: str, unique: bool = False,
+                        count_hint: Optional[int] = None) -> int:
+    """Load a CSV written by export_products_csv through the bulk-insert path."""
+    return hash_table.insert_many(read_products_csv(filename),
+                                  count_hint=count_hint, unique=unique)
+
+
+# ---- columnar binary ----
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _write_strings(file, values: List[str]) -> None:
+    encoded = [v.encode("utf-8") for v in values]
+    blob = b"".join(encoded)
+    file.write(CHUNK_HEADER.pack(len(blob)))
+    file.write(_little_endian(array("I", map(len, encoded))))
+    file.write(blob)
+
+
+def export_products_binary(hash_table, filename: str,
+                           predicate: Optional[Callable] = None,
+                           chunk_size: int = 65536) -> int:
+    """Stream products to the compact columnar format; returns the row count."""
+    rows = 0
+    with open(filename, "wb") as file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, 0))
+        for chunk in _chunks(hash_table, predicate, chunk_size):
+            file.write(CHUNK_HEADER.pack(len(chunk)))
+            file.write(_little_endian(array("I", (int(p.product_id[1:]) for p in chunk))))
+            file.write(_little_endian(array("d", (p.price for p in chunk))))
+            file.write(_little_endian(array("i", (p.quantity for p in chunk))))
+            _write_strings(file, [p.name for p in chunk])
+            _write_strings(file, [p.product_type for p in chunk])
+            rows += len(chunk)
+        file.write(CHUNK_HEADER.pack(0))
+        # the total is only known at the end; patch it into the header so
+        # importers can pre-size the table
+        file.seek(0)
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, rows))
+    return rows
+
+
+def _read_column(file, typecode: str, n: int) -> array:
+    column = array(typecode)
+    column.frombytes(file.read(n * column.itemsize))
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _read_strings(file, n: int) -> List[str]:
+    (size,) = CHUNK_HEADER.unpack(file.read(CHUNK_HEADER.size))
+    lengths = _read_column(file, "I", n)
+    blob = file.read(size)
+    values = []
+    pos = 0
+    for length in lengths:
+        values.append(blob[pos:pos + length].decode("utf-8"))
+        pos += length
+    return values
+
+
+def binary_row_count(filename: str) -> int:
+    with open(filename, "rb") as file:
+        magic, rows = BINARY_HEADER.unpack(file.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"'{filename}' is not a binary product export")
+    return rows
+
+
+def read_products_binary(filename: str, product_cls=BabyProduct) -> Iterator:
+    with open(filename, "rb") as file:
+        magic, _ = BINARY_HEADER.unpack(file.read(BINARY_HEADER.size))
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"'{filename}' is not a binary product export")
+        while True:
+            (n,) = CHUNK_HEADER.unpack(file.read(CHUNK_HEADER.size))
+            if n == 0:
+                return
+            ids = _read_column(file, "I", n)
+            prices = _read_column(file, "d", n)
+            quantities = _read_column(file, "i", n)
+            names = _read_strings(file, n)
+            types = _read_strings(file, n)
+            for i in range(n):
+                yield product_cls(f"P{ids[i]:08d}", names[i], types[i],
+                                  prices[i], quantities[i])
+
+
+def import_products_binary(hash_table, filename: str, unique: bool = False) -> int:
+    """Load a binary export through the bulk-insert path, pre-sized from its header."""
+    return hash_table.insert_many(read_products_binary(filename),
+                                  count_hint=binary_row_count(filename), unique=unique)
@@ -1,39 +1,116 @@
-from typing import Optional, List
+import math
+from typing import Iterable, Iterator, Optional, List, Tuple
+
+from aggregates import InventoryAggregates
+from baby_product import clean_edit_fields
+from hashing import HashStrategy, resolve_strategy
+from id_utils import ProductIdAllocator
+from indexes import ProductIndex
 
 class HashTable:
-    def __init__(self, size: int = 100):
+    def __init__(self, size: int = 100, max_load_factor: float = 0.75,
+                 min_load_factor: float = 0.1, rehash_step: int = 4,
+                 hash_strategy="modulo", indexed: bool = True):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if not 0 < min_load_factor < max_load_factor:
+            raise ValueError("need 0 < min_load_factor < max_load_factor")
         self.size = size
+        # bucket = strategy(numeric id, size); see hashing.HASH_STRATEGIES
+        self._hash: HashStrategy = resolve_strategy(hash_strategy)
         self.table: List[list] = [[] for _ in range(size)]
+        self.count = 0
+        self.max_load_factor = max_load_factor
+        self.min_load_factor = min_load_factor
+        # number of old buckets moved per operation while a resize is running
+        self.rehash_step = rehash_step
+        # the table never shrinks below the size it was created with
+        self._min_size = size
+        # old bucket array kept alive while its items are migrated across
+        self._old_table: Optional[List[list]] = None
+        self._old_size = 0
+        self._rehash_pos = 0
+        # secondary indexes, kept in step with every insert/edit/delete
+        # indexed=False keeps only the raw storage (no queries beyond by-ID)
+        self.index = ProductIndex() if indexed else None
+        # running totals and top-k heaps for dashboards
+        self.aggregates = InventoryAggregates() if indexed else None
+        # ID allocator backed by this table, so it never returns an ID in use
+        self.ids = ProductIdAllocator(is_used=self.__contains__)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, product_id: str) -> bool:
+        return self._get(product_id) is not None
+
+    def load_factor(self) -> float:
+        return self.count / self.size
+
+    def is_rehashing(self) -> bool:
+        return self._old_table is not None
 
     def hash_function(self, key: str) -> int:
         # e.g. 'P12345678'; ignores the 'P' and uses the numeric portion
         numeric_key = int(key[1:])
-        return numeric_key % self.size
+        return self._hash(numeric_key, self.size)
+
+    def _locate(self, product_id: str, key: Optional[int] = None) -> list:
+        # bucket currently holding product_id (old table if not migrated yet)
+        if key is None:
+            key = int(product_id[1:])
+        if self._old_table is not None:
+            old_index = self._hash(key, self._old_size)
+            if old_index >= self._rehash_pos:
+                for item in self._old_table[old_index]:
+                    if item.product_id == product_id:
+                        return self._old_table[old_index]
+        return self.table[self._hash(key, self.size)]
 
     def insert(self, product) -> None:
-        index = self.hash_function(product.product_id)
-        for item in self.table[index]:
+        self._insert(product)
+
+    def _insert(self, product) -> bool:
+        # returns True when a new product was added, False on overwrite
+        self._rehash_tick()
+        key = product.numeric_id
+        bucket = self._locate(product.product_id, key)
+        for item in bucket:
             # if duplicate found, replace with new one
             if item.product_id == product.product_id:
+                self._untrack(item)
                 item.name = product.name
                 item.product_type = product.product_type
                 item.price = product.price
                 item.quantity = product.quantity
-                return
+                self._track(item)
+                return False
         # add new product if not found
-        self.table[index].append(product)
+        self.table[self._hash(key, self.size)].append(product)
+        self._track(product)
+        self.count += 1
+        if self.count > self.size * self.max_load_factor:
+            self._start_resize(self.size * 2)
+        return True
 
     def search(self, product_id: str):
-        index = self.hash_function(product_id)
-        for item in self.table[index]:
+        self._rehash_tick()
+        return self._get(product_id)
+
+    def _get(self, product_id: str):
+        for item in self._locate(product_id):
             if item.product_id == product_id:
                 return item
         return None
 
     def edit(self, product_id: str, name=None, product_type=None, price=None,
              quantity=None) -> bool:
+        # validate first: a bad value must not leave the product untracked
+        name, product_type, price, quantity = clean_edit_fields(
+            name, product_type, price, quantity)
         product = self.search(product_id)
         if product:
+            self._untrack(product)
             if name:
                 product.name = name
             if product_type:
@@ -42,6 +119,7 @@ class HashTable:
                 product.price = price
             if quantity is not None:
                 product.quantity = quantity
+            self._track(product)
             print("Product updated successfully!")
             return True
         else:
@@ -49,16 +127,206 @@ class HashTable:
             return False
 
     def delete(self, product_id: str) -> bool:
-        index = self.hash_function(product_id)
-        bucket = self.table[index]
+        self._rehash_tick()
+        bucket = self._locate(product_id)
         for i, item in enumerate(bucket):
             if item.product_id == product_id:
                 del bucket[i]
+                self._untrack(item)
+                self.ids.release(product_id)
+                self.count -= 1
+                if (self.size > self._min_size
+                        and self.count < self.size * self.min_load_factor):
+                    self._start_resize(max(self._min_size, self.size // 2))
                 return True
         return False
 
+    # ---- bulk operations ----
+    def reserve(self, count: int) -> None:
+        # size the bucket array for count products in one rebuild, so a bulk
+        # load does not go through a series of doubling resizes
+        needed = math.ceil(count / self.max_load_factor)
+        if needed > self.size:
+            # grow at least geometrically, or a stream of small batches
+            # would pay for a full rebuild on every call
+            self._rebuild(max(needed, self.size * 2))
+
+    def insert_many(self, products: Iterable, count_hint: Optional[int] = None,
+                    unique: bool = False) -> int:
+        """Insert products from any iterable; returns how many were new.
+
+        count_hint (or len(products) when available) pre-sizes the table.
+        unique=True promises that no product ID is repeated, either in the
+        input or in the table, so the per-bucket duplicate scan is skipped.
+        """
+        if count_hint is None and hasattr(products, "__len__"):
+            count_hint = len(products)
+        if count_hint:
+            self.reserve(self.count + count_hint)
+        if not unique:
+            return sum(self._insert(product) for product in products)
+
+        self.finish_rehash()
+        added = []
+        for product in products:
+            self.table[self._hash(product.numeric_id, self.size)].append(product)
+            added.append(product)
+            self.count += 1
+            if self.count > self.size * self.max_load_factor:
+                # the hint was too small; grow straight away, we are in a
+                # bulk call anyway
+                self._rebuild(self.size * 2)
+        self._track_many(added)
+        return len(added)
+
+    def upsert_many(self, products: Iterable,
+                    count_hint: Optional[int] = None) -> Tuple[int, int]:
+        """Insert new products and overwrite existing ones; returns (inserted, updated)."""
+        if count_hint is None and hasattr(products, "__len__"):
+            count_hint = len(products)
+        if count_hint:
+            self.reserve(self.count + count_hint)
+        inserted = updated = 0
+        for product in products:
+            if self._insert(product):
+                inserted += 1
+            else:
+                updated += 1
+        return inserted, updated
+
+    def delete_many(self, product_ids: Iterable[str]) -> int:
+        # number of IDs that were actually present
+        return sum(self.delete(pid) for pid in product_ids)
+
+    def _rebuild(self, new_size: int) -> None:
+        # immediate (non-incremental) rehash, only used by bulk operations
+        items = self.get_all_products()
+        self._old_table = None
+        self._old_size = 0
+        self._rehash_pos = 0
+        self.size = new_size
+        self.table = [[] for _ in range(new_size)]
+        for item in items:
+            self.table[self._hash(item.numeric_id, self.size)].append(item)
+
+    def _track(self, product) -> None:
+        if self.index is not None:
+            self.index.add(product)
+            self.aggregates.add(product)
+
+    def _track_many(self, products: list) -> None:
+        if self.index is not None:
+            self.index.add_many(products)
+            self.aggregates.add_many(products)
+
+    def _untrack(self, product) -> None:
+        # call before the product's fields change
+        if self.index is not None:
+            self.index.remove(product)
+            self.aggregates.remove(product)
+
+    # ---- secondary index queries (lazy) ----
+    def find_by_type(self, product_type: str) -> Iterator:
+        return (self._get(pid) for pid in self.index.ids_by_type(product_type))
+
+    def find_by_name(self, name: str) -> Iterator:
+        return (self._get(pid) for pid in self.index.ids_by_name(name))
+
+    def find_by_price(self, low=None, high=None, product_type=None) -> Iterator:
+        # low <= price < high, e.g. find_by_price(high=50, product_type="Feeding")
+        return (self._get(pid)
+                for pid in self.index.ids_by_price(low, high, product_type))
+
+    def find_by_quantity(self, low=None, high=None, product_type=None) -> Iterator:
+        return (self._get(pid)
+                for pid in self.index.ids_by_quantity(low, high, product_type))
+
+    def lowest_stock(self, n: int = 10) -> list:
+        return [self._get(pid) for pid, _ in self.aggregates.lowest_stock(n)]
+
+    def most_expensive(self, n: int = 10) -> list:
+        return [self._get(pid) for pid, _ in self.aggregates.most_expensive(n)]
+
+    # ---- incremental rehashing ----
+    def _start_resize(self, new_size: int) -> None:
+        # a previous resize must be drained before another can begin
+        if self._old_table is not None:
+            self.finish_rehash()
+        if new_size == self.size:
+            return
+        self._old_table = self.table
+        self._old_size = self.size
+        self._rehash_pos = 0
+        self.size = new_size
+        self.table = [[] for _ in range(new_size)]
+
+    def _rehash_tick(self) -> None:
+        # move a few old buckets per operation so no single call pays for
+        # the whole rebuild; empty buckets are cheap so allow more of them
+        if self._old_table is None:
+            return
+        moved = 0
+        empty_visits = self.rehash_step * 10
+        while moved < self.rehash_step and self._rehash_pos < self._old_size:
+            bucket = self._old_table[self._rehash_pos]
+            self._rehash_pos += 1
+            if bucket:
+                for item in bucket:
+                    self.table[self._hash(item.numeric_id, self.size)].append(item)
+                bucket.clear()
+                moved += 1
+            else:
+                empty_visits -= 1
+                if empty_visits == 0:
+                    break
+        if self._rehash_pos >= self._old_size:
+            self._old_table = None
+            self._old_size = 0
+            self._rehash_pos = 0
+
+    def finish_rehash(self) -> None:
+        # complete any pending migration (used before whole-table walks)
+        while self._old_table is not None:
+            self._rehash_tick()
+
+    # ---- distribution statistics ----
+    def stats(self) -> dict:
+        """Bucket-distribution figures for spotting a degrading hash."""
+        self.finish_rehash()
+        histogram = {}
+        longest = 0
+        comparisons = 0
+        for bucket in self.table:
+            length = len(bucket)
+            histogram[length] = histogram.get(length, 0) + 1
+            longest = max(longest, length)
+            # finding the i-th item of a chain takes i comparisons
+            comparisons += length * (length + 1) // 2
+        used = self.size - histogram.get(0, 0)
+        return {
+            "size": self.size,
+            "count": self.count,
+            "load_factor": self.load_factor(),
+            "longest_chain": longest,
+            "chain_histogram": dict(sorted(histogram.items())),
+            # products that share their bucket with an earlier one
+            "collisions": self.count - used,
+            "avg_probe_length": comparisons / self.count if self.count else 0.0,
+        }
+
+    def display_stats(self) -> None:
+        s = self.stats()
+        print("\n===== HASH TABLE STATISTICS =====")
+        print(f"Buckets: {s['size']}, Products: {s['count']}, "
+              f"Load factor: {s['load_factor']:.2f}")
+        print(f"Longest chain: {s['longest_chain']}, Collisions: {s['collisions']}, "
+              f"Avg probe length: {s['avg_probe_length']:.2f}")
+        print("Chain length histogram: "
+              + ", ".join(f"{length}: {n}" for length, n in s["chain_histogram"].items()))
+
     def display_id(self) -> None:
         #Display all product IDs organized by bucket.
+        self.finish_rehash()
         print("\n===== PRODUCT IDS IN HASH TABLE =====")
         for i, bucket in enumerate(self.table):
             print(f"Bucket {i}: ", end="")
@@ -69,6 +337,7 @@ class HashTable:
 
     def display_items(self) -> None:
         #same with display_id but shows details
+        self.finish_rehash()
         print("\n===== INVENTORY RECORDS =====")
         for i, bucket in enumerate(self.table):
             print(f"Bucket {i}: ", end="")
@@ -79,7 +348,12 @@ class HashTable:
 
     def get_all_products(self):
         #Get all products as a flat list
-        products = []
+        return list(self.iter_products())
+
+    def iter_products(self) -> Iterator:
+        # lazy walk over every product (don't modify the table meanwhile)
+        if self._old_table is not None:
+            for bucket in self._old_table[self._rehash_pos:]:
+                yield from bucket
         for bucket in self.table:
-            products.extend(bucket)
-        return products
\ No newline at end of file
+            yield from bucket
@@ -0,0 +1,40 @@
+"""Hash strategies for the inventory tables.
+
+A strategy maps the numeric part of a product ID to a bucket in
+range(size). Tables take either a name from HASH_STRATEGIES or any
+callable with the same signature.
+"""
+from typing import Callable, Union
+
+HashStrategy = Callable[[int, int], int]
+
+_GOLDEN_64 = 11400714819323198485      # 2^64 / golden ratio, rounded to odd
+_MASK_64 = (1 << 64) - 1
+
+
+def modulo_hash(key: int, size: int) -> int:
+    # the original scheme; clusters when IDs share a stride with the size
+    return key % size
+
+
+def fibonacci_hash(key: int, size: int) -> int:
+    # multiplicative (Fibonacci) hashing: scramble the key with the golden
+    # ratio constant, then scale the 64-bit result into range(size) with a
+    # multiply-shift, so it works for any size, not just powers of two
+    return (((key * _GOLDEN_64) & _MASK_64) * size) >> 64
+
+
+HASH_STRATEGIES = {
+    "modulo": modulo_hash,
+    "fibonacci": fibonacci_hash,
+}
+
+
+def resolve_strategy(strategy: Union[str, HashStrategy]) -> HashStrategy:
+    if callable(strategy):
+        return strategy
+    try:
+        return HASH_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"unknown hash strategy {strategy!r}; "
+                         f"choose from {', '.join(HASH_STRATEGIES)}") from None
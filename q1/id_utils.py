@@ -1,4 +1,10 @@
 import random
+import threading
+from typing import Callable, List, Optional
+
+ID_LOW = 10000000
+ID_SPAN = 90000000          # 'P10000000' .. 'P99999999'
+
 
 def generate_random_product_id(existing_ids: set) -> str:
     """Generate a unique product ID of the form 'P########'"""
@@ -8,3 +14,100 @@ def generate_random_product_id(existing_ids: set) -> str:
         if product_id not in existing_ids:
             existing_ids.add(product_id)
             return product_id
+
+
+class ProductIdAllocator:
+    """Hands out random-looking, never-repeating product IDs at O(1) cost each.
+
+    IDs come from walking a counter through a keyed permutation of the
+    90M-value ID space (a small Feistel network with cycle-walking), so
+    there is no retry loop that gets slower as the space fills up.
+    Released IDs are reused first. `is_used` lets the owning table be the
+    single source of truth: IDs that were inserted by other means (loaded
+    from disk, imported) are skipped when the counter reaches them.
+    """
+
+    _HALF_BITS = 14                     # 28-bit Feistel domain covers ID_SPAN
+    _HALF_MASK = (1 << _HALF_BITS) - 1
+    _ROUNDS = 4
+
+    def __init__(self, seed: Optional[int] = None,
+                 is_used: Optional[Callable[[str], bool]] = None):
+        rng = random.Random(seed)
+        self._keys = [rng.getrandbits(32) for _ in range(self._ROUNDS)]
+        self._is_used = is_used or (lambda pid: False)
+        self._next = 0
+        # one bit per ID value the counter has passed (handed out or
+        # skipped), so release() can tell them apart without undoing the
+        # permutation; created on first use (11 MB for the whole space)
+        self._passed: Optional[bytearray] = None
+        self._free: List[str] = []
+        self._free_set = set()
+        # allocate/release may be called from several threads
+        self._lock = threading.Lock()
+
+    # ---- keyed permutation of range(ID_SPAN) ----
+    def _round(self, half: int, key: int) -> int:
+        v = ((half ^ key) * 0x9E3779B1) & 0xFFFFFFFF
+        v ^= v >> 15
+        return v & self._HALF_MASK
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self._HALF_BITS, x & self._HALF_MASK
+        for key in self._keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self._HALF_BITS) | right
+
+    def _permute(self, index: int) -> int:
+        # cycle-walk until the value lands inside the ID range
+        # (about 3 steps on average, since 2^28 / 90M ~= 3)
+        x = self._encrypt(index)
+        while x >= ID_SPAN:
+            x = self._encrypt(x)
+        return x
+
+    # ---- public API ----
+    def allocate(self) -> str:
+        """Return an unused product ID."""
+        with self._lock:
+            return self._allocate()
+
+    def _allocate(self) -> str:
+        while self._free:
+            pid = self._free.pop()
+            self._free_set.discard(pid)
+            if not self._is_used(pid):
+                return pid
+        if self._passed is None:
+            self._passed = bytearray((ID_SPAN + 7) // 8)
+        while self._next < ID_SPAN:
+            value = self._permute(self._next)
+            self._next += 1
+            self._passed[value >> 3] |= 1 << (value & 7)
+            pid = f"P{ID_LOW + value}"
+            if not self._is_used(pid):
+                return pid
+        raise RuntimeError("product ID space exhausted")
+
+    def allocate_many(self, n: int) -> List[str]:
+        with self._lock:
+            return [self._allocate() for _ in range(n)]
+
+    def release(self, product_id: str) -> None:
+        """Make a deleted product's ID available again."""
+        passed = self._passed
+        if passed is None:
+            # nothing allocated yet: every ID will come up on its own
+            return
+        value = int(product_id[1:]) - ID_LOW
+        if not 0 <= value < ID_SPAN:
+            return
+        # IDs the counter has not reached yet will come up on their own;
+        # putting them on the free list too could hand them out twice
+        with self._lock:
+            if passed[value >> 3] >> (value & 7) & 1 and product_id not in self._free_set:
+                self._free.append(product_id)
+                self._free_set.add(product_id)
+
+    def remaining(self) -> int:
+        return ID_SPAN - self._next + len(self._free)
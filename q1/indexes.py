@@ -0,0 +1,209 @@
+"""Secondary indexes over the inventory (type, name, price, quantity).
+
+Indexes only store product IDs; the owning table turns IDs back into
+products when a query is iterated, so results are produced lazily and
+large matches are never copied into a list. As with a dict, don't change
+the table while a query iterator is still being consumed.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SortedKeyList:
+    """Sorted list split into short chunks so inserts/removes stay cheap.
+
+    A single big sorted list costs O(n) per insert (everything after the
+    insert point shifts); with chunks of a few hundred items only one small
+    list shifts, and the chunk is found by bisecting each chunk's maximum.
+    """
+
+    CHUNK = 512
+
+    def __init__(self) -> None:
+        self._lists: List[list] = []
+        self._maxes: list = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, item) -> None:
+        self._len += 1
+        if not self._lists:
+            self._lists.append([item])
+            self._maxes.append(item)
+            return
+        pos = bisect_left(self._maxes, item)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._lists[pos].append(item)
+            self._maxes[pos] = item
+        else:
+            insort(self._lists[pos], item)
+        chunk = self._lists[pos]
+        if len(chunk) > 2 * self.CHUNK:
+            # split an oversized chunk in half
+            half = chunk[self.CHUNK:]
+            del chunk[self.CHUNK:]
+            self._maxes[pos] = chunk[-1]
+            self._lists.insert(pos + 1, half)
+            self._maxes.insert(pos + 1, half[-1])
+
+    def update(self, items) -> None:
+        """Add many items; big batches are sorted once instead of one by one."""
+        items = list(items)
+        if len(items) < max(self.CHUNK, self._len // 8):
+            for item in items:
+                self.add(item)
+            return
+        for chunk in self._lists:
+            items.extend(chunk)
+        items.sort()
+        self._lists = [items[i:i + self.CHUNK]
+                       for i in range(0, len(items), self.CHUNK)]
+        self._maxes = [chunk[-1] for chunk in self._lists]
+        self._len = len(items)
+
+    def remove(self, item) -> None:
+        pos = bisect_left(self._maxes, item)
+        if pos == len(self._maxes):
+            raise ValueError(f"{item!r} not in list")
+        chunk = self._lists[pos]
+        idx = bisect_left(chunk, item)
+        if idx == len(chunk) or chunk[idx] != item:
+            raise ValueError(f"{item!r} not in list")
+        del chunk[idx]
+        self._len -= 1
+        if chunk:
+            self._maxes[pos] = chunk[-1]
+        else:
+            del self._lists[pos]
+            del self._maxes[pos]
+
+    def _position(self, key) -> Tuple[int, int]:
+        # (chunk, offset) of the first item >= key
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return pos, 0
+        return pos, bisect_left(self._lists[pos], key)
+
+    def irange(self, low=None, high=None) -> Iterator:
+        """Yield items with low <= item < high (None means unbounded)."""
+        pos, idx = (0, 0) if low is None else self._position(low)
+        lists = self._lists
+        while pos < len(lists):
+            chunk = lists[pos]
+            while idx < len(chunk):
+                item = chunk[idx]
+                if high is not None and not item < high:
+                    return
+                yield item
+                idx += 1
+            pos += 1
+            idx = 0
+
+    def count_range(self, low=None, high=None) -> int:
+        """Number of items in [low, high) without walking them one by one."""
+        start = (0, 0) if low is None else self._position(low)
+        end = (len(self._lists), 0) if high is None else self._position(high)
+        if start >= end:
+            return 0
+        if start[0] == end[0]:
+            return end[1] - start[1]
+        total = len(self._lists[start[0]]) - start[1] + end[1]
+        for pos in range(start[0] + 1, end[0]):
+            total += len(self._lists[pos])
+        return total
+
+
+class ProductIndex:
+    """Hash indexes on product_type and name, sorted indexes on price and quantity."""
+
+    def __init__(self) -> None:
+        # dicts used as insertion-ordered sets of product IDs; the type index
+        # also keeps (price, quantity) so type+range queries can filter there
+        self._by_type: Dict[str, Dict[str, Tuple[float, int]]] = {}
+        self._by_name: Dict[str, Dict[str, None]] = {}
+        self._by_price = SortedKeyList()      # (price, product_id)
+        self._by_quantity = SortedKeyList()   # (quantity, product_id)
+
+    def add(self, product) -> None:
+        pid = product.product_id
+        self._by_type.setdefault(product.product_type, {})[pid] = (
+            product.price, product.quantity)
+        self._by_name.setdefault(product.name, {})[pid] = None
+        self._by_price.add((product.price, pid))
+        self._by_quantity.add((product.quantity, pid))
+
+    def add_many(self, products) -> None:
+        by_type = self._by_type
+        by_name = self._by_name
+        prices = []
+        quantities = []
+        for product in products:
+            pid = product.product_id
+            by_type.setdefault(product.product_type, {})[pid] = (
+                product.price, product.quantity)
+            by_name.setdefault(product.name, {})[pid] = None
+            prices.append((product.price, pid))
+            quantities.append((product.quantity, pid))
+        self._by_price.update(prices)
+        self._by_quantity.update(quantities)
+
+    def remove(self, product) -> None:
+        # must be called with the field values the product was indexed with
+        pid = product.product_id
+        _discard(self._by_type, product.product_type, pid)
+        _discard(self._by_name, product.name, pid)
+        self._by_price.remove((product.price, pid))
+        self._by_quantity.remove((product.quantity, pid))
+
+    def ids_by_type(self, product_type: str) -> Iterator[str]:
+        return iter(self._by_type.get(product_type, ()))
+
+    def ids_by_name(self, name: str) -> Iterator[str]:
+        return iter(self._by_name.get(name, ()))
+
+    def ids_by_price(self, low=None, high=None,
+                     product_type: Optional[str] = None) -> Iterator[str]:
+        return self._range(self._by_price, low, high, product_type)
+
+    def ids_by_quantity(self, low=None, high=None,
+                        product_type: Optional[str] = None) -> Iterator[str]:
+        return self._range(self._by_quantity, low, high, product_type)
+
+    def _range(self, sorted_index: SortedKeyList, low, high,
+               product_type: Optional[str]) -> Iterator[str]:
+        # ids with low <= value < high in ascending (value, id) order,
+        # whichever side the query is driven from
+        low_key = None if low is None else (low,)
+        high_key = None if high is None else (high,)
+        if product_type is None:
+            return (pid for _, pid in sorted_index.irange(low_key, high_key))
+        same_type = self._by_type.get(product_type, {})
+        # drive the query from whichever side has fewer candidates
+        if len(same_type) < sorted_index.count_range(low_key, high_key):
+            return self._filter_type_by_range(same_type, sorted_index, low, high)
+        return (pid for _, pid in sorted_index.irange(low_key, high_key)
+                if pid in same_type)
+
+    def _filter_type_by_range(self, same_type, sorted_index, low, high) -> Iterator[str]:
+        column = 0 if sorted_index is self._by_price else 1
+        matches = []
+        for pid, values in same_type.items():
+            value = values[column]
+            if (low is None or value >= low) and (high is None or value < high):
+                matches.append((value, pid))
+        # the type has fewer products than the range, so sorting them is
+        # cheap and gives the same order as walking the sorted index
+        matches.sort()
+        for _, pid in matches:
+            yield pid
+
+
+def _discard(index: Dict[str, dict], key: str, pid: str) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.pop(pid, None)
+        if not ids:
+            del index[key]
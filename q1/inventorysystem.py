@@ -1,15 +1,22 @@
+import sys
+from typing import Optional
+
 from baby_product import BabyProduct
 from hash_table import HashTable
-from id_utils import generate_random_product_id
+from persistent_store import PersistentHashTable
 from sample_data import generate_sample_data
-from exporter import export_to_csv
-from performance import compare_hash_vs_array_performance
-
-def inventory_system() -> None:
-    ht = HashTable(size=20)
-    generate_sample_data(ht, count=8)
-    #keep track used id
-    used_ids = set(p.product_id for p in ht.get_all_products())
+from exporter import export_products_csv
+
+def inventory_system(data_file: Optional[str] = None) -> None:
+    # with a data file the inventory survives restarts; only an empty store
+    # gets seeded with sample products
+    if data_file:
+        ht = PersistentHashTable(data_file)
+        print(f"Opened '{data_file}' with {len(ht)} products.")
+    else:
+        ht = HashTable(size=20)
+    if len(ht) == 0:
+        generate_sample_data(ht, count=8)
 
     while True:
         print("\n====== Baby Product Inventory ======")
@@ -34,10 +41,10 @@ def inventory_system() -> None:
             except ValueError:
                 print("Invalid numeric value for price or quantity.")
                 continue
-            product_id = generate_random_product_id(used_ids)
+            # the table's allocator knows every ID in use, no separate set
+            product_id = ht.ids.allocate()
             product = BabyProduct(product_id, name, product_type, price, qty)
             ht.insert(product)
-            used_ids.add(product_id)
             print(f"Product inserted successfully! Assigned ID: {product_id}")
 
         elif choice == "2":
@@ -75,7 +82,6 @@ def inventory_system() -> None:
         elif choice == "4":
             pid = input("Enter Product ID to delete (e.g. P12345678): ").strip()
             if ht.delete(pid):
-                used_ids.discard(pid)
                 print("Product deleted successfully!")
             else:
                 print("Product not found.")
@@ -87,12 +93,21 @@ def inventory_system() -> None:
             ht.display_items()
 
         elif choice == "7":
+            # imported here so matplotlib is only loaded when the chart is wanted
+            from performance import compare_hash_vs_array_performance
             compare_hash_vs_array_performance(ht)
 
         elif choice == "8":
-            export_to_csv(ht)
+            filename = "baby_products.csv"
+            rows = export_products_csv(ht, filename)
+            if rows:
+                print(f"\nExported {rows} products to '{filename}' successfully!")
+            else:
+                print("No products in the hash table to export.")
 
         elif choice == "9":
+            if data_file:
+                ht.close()
             print("Exiting Inventory System...")
             break
 
@@ -102,4 +117,5 @@ def inventory_system() -> None:
 
 
 if __name__ == "__main__":
-    inventory_system()
+    # python inventorysystem.py [data_file]   (default: inventory.db)
+    inventory_system(sys.argv[1] if len(sys.argv) > 1 else "inventory.db")
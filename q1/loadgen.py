@@ -0,0 +1,146 @@
+"""Load generator for server.py: throughput and latency percentiles.
+
+    python server.py --seed 10000 &
+    python loadgen.py --connections 8 --pipeline 32 --requests 50000
+
+Each connection keeps up to --pipeline requests in flight. Latency is
+measured per request from send to reply (replies come back in order, so
+a FIFO of send times is enough to match them up).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import List, Optional
+
+from server import MAX_LINE
+
+TYPES = ["Diapers", "Clothing", "Toys", "Feeding", "Bath"]
+
+
+def percentile(sorted_values: List[int], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies_ns: List[int] = []
+        self.errors = 0
+
+
+async def open_connection(host: str, port: int, unix_path: Optional[str]):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path, limit=MAX_LINE)
+    return await asyncio.open_connection(host, port, limit=MAX_LINE)
+
+
+async def known_ids(host, port, unix_path, sample: int) -> List[str]:
+    # insert a few products up front so reads have something to hit
+    reader, writer = await open_connection(host, port, unix_path)
+    products = [{"name": f"Load {i}", "product_type": random.choice(TYPES),
+                 "price": round(random.uniform(5, 500), 2),
+                 "quantity": random.randint(0, 100)} for i in range(sample)]
+    writer.write(json.dumps({"id": 0, "op": "insert_many", "products": products}).encode()
+                 + b"\n")
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    writer.close()
+    return reply["result"]["product_ids"]
+
+
+async def worker(n_requests: int, pipeline: int, write_ratio: float, ids: List[str],
+                 stats: Stats, host, port, unix_path) -> None:
+    reader, writer = await open_connection(host, port, unix_path)
+    sent_at = deque()
+    window = asyncio.Semaphore(pipeline)
+    rng = random.Random()
+
+    async def receive() -> None:
+        for _ in range(n_requests):
+            line = await reader.readline()
+            stats.latencies_ns.append(time.perf_counter_ns() - sent_at.popleft())
+            if not json.loads(line)["ok"]:
+                stats.errors += 1
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for i in range(n_requests):
+        await window.acquire()
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                request = {"op": "edit", "product_id": rng.choice(ids),
+                           "quantity": rng.randint(0, 100)}
+            else:
+                request = {"op": "insert", "product": {
+                    "name": f"Load {i}", "product_type": rng.choice(TYPES),
+                    "price": round(rng.uniform(5, 500), 2),
+                    "quantity": rng.randint(0, 100)}}
+        else:
+            request = {"op": "search", "product_id": rng.choice(ids)}
+        request["id"] = i
+        sent_at.append(time.perf_counter_ns())
+        writer.write(json.dumps(request).encode() + b"\n")
+        # let the socket buffer fill before yielding to the loop
+        if window.locked():
+            await writer.drain()
+    await writer.drain()
+    await receiver
+    writer.close()
+
+
+async def run(args) -> dict:
+    ids = await known_ids(args.host, args.port, args.unix, args.sample)
+    stats = Stats()
+    per_connection = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(per_connection, args.pipeline, args.write_ratio, ids, stats,
+               args.host, args.port, args.unix)
+        for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(stats.latencies_ns)
+    return {
+        "requests": len(latencies),
+        "errors": stats.errors,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) / 1e6,
+        "p99_ms": percentile(latencies, 99) / 1e6,
+        "max_ms": latencies[-1] / 1e6 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generator for the inventory service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--pipeline", type=int, default=16,
+                        help="requests in flight per connection (1 = no pipelining)")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--sample", type=int, default=1000,
+                        help="products inserted up front for reads and edits to target")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['requests']} requests in {result['seconds']:.2f}s "
+          f"({result['throughput']:.0f} req/s), {result['errors']} errors")
+    print(f"latency p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, "
+          f"max {result['max_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
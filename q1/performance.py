@@ -1,7 +1,7 @@
 import time
 import matplotlib.pyplot as plt
 from baby_product import BabyProduct
-from id_utils import generate_random_product_id
+from hash_table import HashTable
 
 
 def compare_hash_vs_array_performance(hash_table) -> None:
@@ -20,14 +20,18 @@ def compare_hash_vs_array_performance(hash_table) -> None:
     arr_times = []  # Array search times
 
     # Prepare test data, copy to get till 1000
-    all_products = array_data.copy()
-    existing_ids = set(p.product_id for p in all_products)
+    all_products = [BabyProduct(p.product_id, p.name, p.product_type, p.price, p.quantity)
+                    for p in array_data]
+
+    # measure on a private copy so the live inventory is left untouched
+    hash_table = HashTable()
+    hash_table.insert_many(all_products, unique=True)
 
     # Generate additional products if needed to reach 1000 items
-    while len(all_products) < 1000:
-        pid = generate_random_product_id(existing_ids)
-        all_products.append(BabyProduct(pid, "Sample", "Misc", 50, 10))
-        hash_table.insert(all_products[-1])
+    padding = [BabyProduct(pid, "Sample", "Misc", 50, 10)
+               for pid in hash_table.ids.allocate_many(1000 - len(all_products))]
+    hash_table.insert_many(padding, unique=True)
+    all_products.extend(padding)
 
     # Measure search performance for different data sizes
     for n in data_sizes:
@@ -35,20 +39,20 @@ def compare_hash_vs_array_performance(hash_table) -> None:
         test_id = subset[-1].product_id  # Use last product ID as search target
 
         # Hash Table search performance measurement
-        start_ht = time.time()
+        start_ht = time.perf_counter_ns()
         for _ in range(100):
             hash_table.search(test_id)
         # Convert to microseconds
-        ht_avg = (time.time() - start_ht) / 100 * 1e6
+        ht_avg = (time.perf_counter_ns() - start_ht) / 100 / 1e3
         ht_times.append(ht_avg)
 
         # Array search performance measurement
-        start_arr = time.time()
+        start_arr = time.perf_counter_ns()
         for _ in range(100):
             for item in subset:
                 if item.product_id == test_id:
                     break
-        arr_avg = (time.time() - start_arr) / 100 * 1e6
+        arr_avg = (time.perf_counter_ns() - start_arr) / 100 / 1e3
         arr_times.append(arr_avg)
 
     # Display table format
@@ -70,4 +74,5 @@ def compare_hash_vs_array_performance(hash_table) -> None:
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    plt.show()
+    print("For headless, repeatable measurements run: python benchmark.py suite")
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""Durable inventory store: memory-mapped snapshot + append-only write-ahead log.
+
+On-disk layout
+--------------
+<path>       snapshot. A 32-byte header followed by `capacity` fixed-width
+             records laid out as an open-addressing hash table (linear
+             probing on the numeric part of the product ID). Opening the
+             store just maps this file; lookups probe it directly, nothing
+             is parsed up front.
+<path>.wal   write-ahead log. Every insert/edit/delete appends one
+             fixed-width entry (with a CRC32) before it is applied. Only
+             the log is replayed on open, into a small in-memory overlay.
+
+compact() writes a fresh snapshot containing the overlay, swaps it in
+atomically with os.replace and empties the log. It also runs on its own
+once the log holds `compact_every` entries. Replaying a log over a
+snapshot that already contains it is harmless, because entries are whole
+records (put) or deletes, so a crash between the swap and the truncate
+loses nothing.
+
+Names and types are stored UTF-8 encoded in fixed-size fields
+(NAME_BYTES / TYPE_BYTES); longer values are clipped on a character
+boundary.
+"""
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from baby_product import BabyProduct
+from id_utils import ProductIdAllocator
+
+MAGIC = b"BABYINV1"
+VERSION = 1
+NAME_BYTES = 48
+TYPE_BYTES = 24
+
+HEADER = struct.Struct("<8sIIQ8x")          # magic, version, capacity, count
+RECORD = struct.Struct(f"<BxxxI{NAME_BYTES}s{TYPE_BYTES}sdi")   # used, id, name, type, price, qty
+WAL_ENTRY = struct.Struct(f"<BI{NAME_BYTES}s{TYPE_BYTES}sdiI")  # op, id, name, type, price, qty, crc
+
+OP_PUT = 1
+OP_DELETE = 2
+
+# (name, product_type, price, quantity) as kept in the overlay
+Fields = Tuple[str, str, float, int]
+
+
+def _encode(text: str, size: int) -> bytes:
+    raw = text.encode("utf-8")
+    if len(raw) > size:
+        raw = raw[:size].decode("utf-8", "ignore").encode("utf-8")
+    return raw
+
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8")
+
+
+class PersistentHashTable:
+    def __init__(self, path: str, compact_every: int = 10000, durable: bool = False):
+        """Open (or create) the store at path.
+
+        durable=True fsyncs the log after every write; otherwise the log is
+        flushed to the OS per write and fsynced on compact()/close().
+        """
+        self.path = path
+        self.wal_path = path + ".wal"
+        self.compact_every = compact_every
+        self.durable = durable
+        # numeric id -> fields, or None for a delete not yet compacted
+        self._overlay: Dict[int, Optional[Fields]] = {}
+        if not os.path.exists(path):
+            self._write_snapshot(path, {}, 64)
+        self._map_snapshot()
+        self.count = self._snapshot_count
+        self._replay_wal()
+        self._wal = open(self.wal_path, "ab")
+        # the store is the source of truth for which IDs are taken, so a
+        # fresh allocator after a restart still never reuses a live ID
+        self.ids = ProductIdAllocator(is_used=self.__contains__)
+
+    # ---- snapshot access ----
+    def _map_snapshot(self) -> None:
+        self._snapshot_file = open(self.path, "rb")
+        self._map = mmap.mmap(self._snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, capacity, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not an inventory snapshot")
+        if len(self._map) != HEADER.size + capacity * RECORD.size:
+            raise ValueError(f"{self.path} is truncated")
+        self._capacity = capacity
+        self._snapshot_count = count
+
+    def _snapshot_lookup(self, key: int) -> Optional[Fields]:
+        mask = self._capacity - 1
+        slot = key & mask
+        while True:
+            used, rec_id, name, ptype, price, qty = RECORD.unpack_from(
+                self._map, HEADER.size + slot * RECORD.size)
+            if not used:
+                return None
+            if rec_id == key:
+                return _decode(name), _decode(ptype), price, qty
+            slot = (slot + 1) & mask
+
+    def _snapshot_records(self) -> Iterator[Tuple[int, Fields]]:
+        for offset in range(HEADER.size, len(self._map), RECORD.size):
+            used, rec_id, name, ptype, price, qty = RECORD.unpack_from(self._map, offset)
+            if used:
+                yield rec_id, (_decode(name), _decode(ptype), price, qty)
+
+    @staticmethod
+    def _write_snapshot(path: str, records: Dict[int, Fields], capacity: int) -> None:
+        # written to a temp file first and renamed, so readers never see a
+        # half-written snapshot
+        tmp = path + ".tmp"
+        size = HEADER.size + capacity * RECORD.size
+        with open(tmp, "wb") as f:
+            f.truncate(size)
+        with open(tmp, "r+b") as f:
+            with mmap.mmap(f.fileno(), size) as m:
+                HEADER.pack_into(m, 0, MAGIC, VERSION, capacity, len(records))
+                mask = capacity - 1
+                for key, (name, ptype, price, qty) in records.items():
+                    slot = key & mask
+                    while m[HEADER.size + slot * RECORD.size]:
+                        slot = (slot + 1) & mask
+                    RECORD.pack_into(m, HEADER.size + slot * RECORD.size, 1, key,
+                                     _encode(name, NAME_BYTES), _encode(ptype, TYPE_BYTES),
+                                     price, qty)
+                m.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # ---- write-ahead log ----
+    def _replay_wal(self) -> None:
+        if not os.path.exists(self.wal_path):
+            return
+        good = 0
+        with open(self.wal_path, "rb") as f:
+            data = f.read()
+        for offset in range(0, len(data) - WAL_ENTRY.size + 1, WAL_ENTRY.size):
+            entry = data[offset:offset + WAL_ENTRY.size]
+            op, key, name, ptype, price, qty, crc = WAL_ENTRY.unpack(entry)
+            if zlib.crc32(entry[:-4]) != crc:
+                break
+            if op == OP_PUT:
+                self._apply(key, (_decode(name), _decode(ptype), price, qty))
+            else:
+                self._apply(key, None)
+            good = offset + WAL_ENTRY.size
+        if good != len(data):
+            # torn or corrupt tail from a crash mid-append: drop it
+            with open(self.wal_path, "r+b") as f:
+                f.truncate(good)
+
+    def _log(self, op: int, key: int, fields: Optional[Fields]) -> None:
+        name, ptype, price, qty = fields or ("", "", 0.0, 0)
+        body = WAL_ENTRY.pack(op, key, _encode(name, NAME_BYTES),
+                              _encode(ptype, TYPE_BYTES), price, qty, 0)[:-4]
+        self._wal.write(body + struct.pack("<I", zlib.crc32(body)))
+        self._wal.flush()
+        if self.durable:
+            os.fsync(self._wal.fileno())
+
+    def _lookup(self, key: int) -> Optional[Fields]:
+        if key in self._overlay:
+            return self._overlay[key]
+        return self._snapshot_lookup(key)
+
+    def _apply(self, key: int, fields: Optional[Fields]) -> None:
+        existed = self._lookup(key) is not None
+        self._overlay[key] = fields
+        self.count += (fields is not None) - existed
+
+    def _put(self, key: int, fields: Optional[Fields]) -> None:
+        if fields is not None:
+            # clip now so reads before and after compaction agree
+            name, ptype, price, qty = fields
+            fields = (_decode(_encode(name, NAME_BYTES)),
+                      _decode(_encode(ptype, TYPE_BYTES)), price, qty)
+        self._log(OP_PUT if fields is not None else OP_DELETE, key, fields)
+        self._apply(key, fields)
+        if len(self._overlay) >= self.compact_every:
+            self.compact()
+
+    # ---- public API (same shape as HashTable) ----
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, product_id: str) -> bool:
+        return self._lookup(int(product_id[1:])) is not None
+
+    def hash_function(self, key: str) -> int:
+        return int(key[1:]) & (self._capacity - 1)
+
+    def insert(self, product) -> None:
+        self._put(int(product.product_id[1:]),
+                  (product.name, product.product_type, product.price, product.quantity))
+
+    def search(self, product_id: str) -> Optional[BabyProduct]:
+        # returns a copy; change stored data through edit()
+        fields = self._lookup(int(product_id[1:]))
+        if fields is None:
+            return None
+        return BabyProduct(product_id, *fields)
+
+    def edit(self, product_id: str, name=None, product_type=None, price=None,
+             quantity=None) -> bool:
+        key = int(product_id[1:])
+        fields = self._lookup(key)
+        if fields:
+            old_name, old_type, old_price, old_qty = fields
+            self._put(key, (name or old_name,
+                            product_type or old_type,
+                            old_price if price is None else price,
+                            old_qty if quantity is None else quantity))
+            print("Product updated successfully!")
+            return True
+        else:
+            print("Product not found.")
+            return False
+
+    def delete(self, product_id: str) -> bool:
+        key = int(product_id[1:])
+        if self._lookup(key) is None:
+            return False
+        self._put(key, None)
+        self.ids.release(product_id)
+        return True
+
+    def insert_many(self, products: Iterable, count_hint: Optional[int] = None,
+                    unique: bool = False) -> int:
+        before = self.count
+        for product in products:
+            self.insert(product)
+        return self.count - before
+
+    def upsert_many(self, products: Iterable,
+                    count_hint: Optional[int] = None) -> Tuple[int, int]:
+        inserted = updated = 0
+        for product in products:
+            before = self.count
+            self.insert(product)
+            if self.count > before:
+                inserted += 1
+            else:
+                updated += 1
+        return inserted, updated
+
+    def delete_many(self, product_ids: Iterable[str]) -> int:
+        return sum(self.delete(pid) for pid in product_ids)
+
+    def _records(self) -> Iterator[Tuple[int, Fields]]:
+        for key, fields in self._snapshot_records():
+            if key not in self._overlay:
+                yield key, fields
+        for key, fields in self._overlay.items():
+            if fields is not None:
+                yield key, fields
+
+    def get_all_products(self):
+        return list(self.iter_products())
+
+    def iter_products(self) -> Iterator[BabyProduct]:
+        for key, fields in self._records():
+            yield BabyProduct(f"P{key:08d}", *fields)
+
+    def display_id(self) -> None:
+        print("\n===== PRODUCT IDS IN STORE =====")
+        print(", ".join(f"P{key:08d}" for key, _ in self._records()) or "[]")
+
+    def display_items(self) -> None:
+        print("\n===== INVENTORY RECORDS =====")
+        for product in self.get_all_products():
+            print(product)
+
+    # ---- maintenance ----
+    def compact(self) -> None:
+        """Fold the log into a new snapshot and start an empty log."""
+        records = dict(self._records())
+        capacity = 64
+        while capacity < 2 * len(records):
+            capacity *= 2
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+        self._map.close()
+        self._snapshot_file.close()
+        self._write_snapshot(self.path, records, capacity)
+        self._wal.truncate(0)
+        os.fsync(self._wal.fileno())
+        self._overlay.clear()
+        self._map_snapshot()
+        self.count = self._snapshot_count
+
+    def close(self) -> None:
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+        self._wal.close()
+        self._map.close()
+        self._snapshot_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,5 +1,4 @@
 from baby_product import BabyProduct
-from id_utils import generate_random_product_id
 import random
 
 def generate_sample_data(ht, count: int = 30) -> None:
@@ -11,15 +10,16 @@ def generate_sample_data(ht, count: int = 30) -> None:
         "Healthcare": ["Baby Thermometer", "Baby Oil", "Baby Powder"]
     }
 
-    used_ids = set()
     all_products = [(ptype, name) for ptype, names in product_catalog.items() for name in names]
 
-    for _ in range(count):
-        product_type, name = random.choice(all_products)
-        price = round(random.uniform(10, 150), 2)
-        quantity = random.randint(10, 100)
-        product_id = generate_random_product_id(used_ids)
-        product = BabyProduct(product_id, name, product_type, price, quantity)
-        ht.insert(product)
+    def products():
+        # IDs come from the table's own allocator so they never collide
+        for product_id in ht.ids.allocate_many(count):
+            product_type, name = random.choice(all_products)
+            price = round(random.uniform(10, 150), 2)
+            quantity = random.randint(10, 100)
+            yield BabyProduct(product_id, name, product_type, price, quantity)
+
+    ht.insert_many(products(), count_hint=count, unique=True)
 
     print(f"\n{count} sample baby products inserted successfully!\n")
@@ -0,0 +1,264 @@
+"""Line-delimited JSON service in front of the inventory table.
+
+    python server.py --port 8765                # TCP on localhost
+    python server.py --unix /tmp/inventory.sock
+    python server.py --data inventory.db        # persistent store
+
+Each request is one JSON object per line, e.g.
+
+    {"id": 1, "op": "search", "product_id": "P12345678"}
+    {"id": 2, "op": "insert", "product": {"name": ..., "product_type": ...,
+                                          "price": ..., "quantity": ...}}
+    {"id": 3, "op": "edit", "product_id": "P12345678", "quantity": 5}
+    {"id": 4, "op": "delete", "product_id": "P12345678"}
+    {"id": 5, "op": "insert_many", "products": [...]}
+    {"id": 6, "op": "delete_many", "product_ids": [...]}
+    {"id": 7, "op": "stats"}
+
+and gets back {"id": ..., "ok": true, "result": ...} or {"id": ...,
+"ok": false, "error": "..."}. An insert without product_id is given one
+by the table's allocator, and the result carries the assigned ID.
+
+Clients may pipeline: the server keeps reading while earlier requests
+are still in flight, and answers on a connection always come back in
+request order. Writes from all connections are gathered into small
+batches (flushed at batch_size or after batch_delay seconds) and applied
+together. Reads flush any pending batch first, so a client always sees
+its own writes.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+from typing import List, Optional, Tuple
+
+from baby_product import BabyProduct, clean_edit_fields
+from hash_table import HashTable
+
+WRITE_OPS = {"insert", "edit", "delete", "insert_many", "delete_many"}
+# bulk requests can be long; asyncio's default line limit is 64 KiB
+MAX_LINE = 16 * 1024 * 1024
+
+
+def product_to_dict(product) -> Optional[dict]:
+    if product is None:
+        return None
+    return {"product_id": product.product_id, "name": product.name,
+            "product_type": product.product_type, "price": product.price,
+            "quantity": product.quantity}
+
+
+class InventoryService:
+    def __init__(self, table, batch_size: int = 256, batch_delay: float = 0.002):
+        self.table = table
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.batched_writes = 0
+
+    # ---- request dispatch ----
+    def submit(self, request: dict) -> asyncio.Future:
+        """Queue one request; the future resolves to its response result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        op = request.get("op")
+        if op in WRITE_OPS:
+            self._pending.append((request, future))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_delay, self.flush)
+            return future
+        # reads see every write queued before them
+        self.flush()
+        try:
+            future.set_result(self._read(op, request))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def _read(self, op, request: dict):
+        if op == "search":
+            return product_to_dict(self.table.search(request["product_id"]))
+        if op == "stats":
+            return {"count": len(self.table)}
+        raise ValueError(f"unknown op {op!r}")
+
+    # ---- write batching ----
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        self.batched_writes += len(batch)
+        # HashTable.edit reports to stdout; keep that out of the service log
+        with contextlib.redirect_stdout(io.StringIO()):
+            i = 0
+            while i < len(batch):
+                request, future = batch[i]
+                if request["op"] == "insert":
+                    # a run of consecutive inserts goes through the bulk path
+                    j = i
+                    while j < len(batch) and batch[j][0]["op"] == "insert":
+                        j += 1
+                    self._apply_inserts(batch[i:j])
+                    i = j
+                    continue
+                try:
+                    future.set_result(self._write(request))
+                except Exception as exc:
+                    future.set_exception(exc)
+                i += 1
+
+    def _make_product(self, data: dict) -> BabyProduct:
+        product_id = data.get("product_id") or self.table.ids.allocate()
+        if not isinstance(product_id, str):
+            raise ValueError(f"product_id must be a string, got {product_id!r}")
+        product = BabyProduct(product_id, data["name"], data["product_type"],
+                              float(data["price"]), int(data["quantity"]))
+        # parse the ID now (the tables hash it), so a bad one fails this
+        # request alone instead of the whole batch inside upsert_many
+        try:
+            product.numeric_id
+        except ValueError:
+            raise ValueError(f"invalid product_id {product_id!r}") from None
+        return product
+
+    def _apply_inserts(self, items) -> None:
+        products = []
+        for request, future in items:
+            try:
+                products.append((self._make_product(request["product"]), future))
+            except Exception as exc:
+                future.set_exception(exc)
+        try:
+            self.table.upsert_many([p for p, _ in products])
+        except Exception:
+            # some rows may have landed already; redo them one by one so
+            # every future reports its own row (insert overwrites, so the
+            # rows that did land are just written again)
+            for product, future in products:
+                try:
+                    self.table.insert(product)
+                    future.set_result(product.product_id)
+                except Exception as exc:
+                    future.set_exception(exc)
+            return
+        for product, future in products:
+            future.set_result(product.product_id)
+
+    def _write(self, request: dict):
+        op = request["op"]
+        if op == "edit":
+            # coerced and checked like an insert, before the table is touched
+            name, product_type, price, quantity = clean_edit_fields(
+                *(request.get(k) for k in ("name", "product_type", "price", "quantity")))
+            return self.table.edit(request["product_id"], name=name, product_type=product_type,
+                                   price=price, quantity=quantity)
+        if op == "delete":
+            return self.table.delete(request["product_id"])
+        if op == "insert_many":
+            products = [self._make_product(d) for d in request["products"]]
+            inserted, updated = self.table.upsert_many(products)
+            return {"inserted": inserted, "updated": updated,
+                    "product_ids": [p.product_id for p in products]}
+        if op == "delete_many":
+            return self.table.delete_many(request["product_ids"])
+        raise ValueError(f"unknown op {op!r}")
+
+    # ---- connections ----
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        # responses are queued in arrival order and written by a separate
+        # task, so reading the next request never waits on an earlier one
+        responses: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    future = self.submit(request)
+                except Exception as exc:
+                    request = {}
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_exception(exc)
+                await responses.put((request.get("id"), future))
+        finally:
+            await responses.put(None)
+            await sender
+            writer.close()
+
+    @staticmethod
+    async def _send(responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        while True:
+            item = await responses.get()
+            if item is None:
+                break
+            request_id, future = item
+            try:
+                reply = {"id": request_id, "ok": True, "result": await future}
+            except Exception as exc:
+                reply = {"id": request_id, "ok": False, "error": str(exc)}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            # only wait for the socket when nothing else is ready to send
+            if responses.empty():
+                await writer.drain()
+
+
+async def serve(service: InventoryService, host: str = "127.0.0.1", port: int = 8765,
+                unix_path: Optional[str] = None) -> None:
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path,
+                                                  limit=MAX_LINE)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle, host, port, limit=MAX_LINE)
+        where = f"{host}:{port}"
+    print(f"Inventory service listening on {where} ({len(service.table)} products)")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inventory JSON-lines service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--data", help="serve a persistent store file instead of memory")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="load this many sample products into an empty table")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batch-delay", type=float, default=0.002,
+                        help="seconds to wait for more writes before flushing")
+    args = parser.parse_args()
+
+    if args.data:
+        from persistent_store import PersistentHashTable
+        table = PersistentHashTable(args.data)
+    else:
+        table = HashTable()
+    if args.seed and len(table) == 0:
+        from sample_data import generate_sample_data
+        generate_sample_data(table, count=args.seed)
+
+    service = InventoryService(table, args.batch_size, args.batch_delay)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.data:
+            table.close()
+
+
+if __name__ == "__main__":
+    main()
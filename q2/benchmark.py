@@ -0,0 +1,879 @@
+"""Headless benchmarks for the social graph.
+
+    python benchmark.py followers --vertices 100000 --degree 10
+    python benchmark.py followers --vertices 20000 --json results.json
+    python benchmark.py backends --vertices 200000
+    python benchmark.py pages --vertices 200000 --limit 50
+    python benchmark.py separation --vertices 200000 --pairs 200
+    python benchmark.py recommend --vertices 50000 --ops 20000
+    python benchmark.py influence --vertices 1000000 --backend csr   (needs numpy)
+    python benchmark.py io --vertices 200000
+    python benchmark.py search --people 200000
+    python benchmark.py components --vertices 200000 --workers 1 2 4 8
+    python benchmark.py snapshots --vertices 200000
+
+Graphs are synthetic, with a power-law in-degree (preferential
+attachment), so a few accounts have very many followers, like a real
+follow graph.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterable, List, Tuple
+
+import components
+from csr_graph import CSRGraph
+from graph import DirectedGraph, PeopleDirectory, Person, Privacy
+import graph_io
+from people_index import tokenize
+from recommend import Recommender
+
+
+def make_edges(n: int, degree: int = 10, seed: int = 42,
+               reciprocity: float = 0.0) -> List[Tuple[str, str]]:
+    """Edges of a preferential-attachment graph on n users.
+
+    Each new user follows `degree` earlier users, picked in proportion to
+    how many followers they already have (plus one, so newcomers can be
+    picked too). Each follow is returned with probability `reciprocity`;
+    without that, nobody follows a newer account, so the graph has no
+    cycles and most pairs are not connected.
+    """
+    rng = random.Random(seed)
+    names = [f"user{i:07d}" for i in range(n)]
+    edges = []
+    # one entry per follower received, plus one per user
+    targets: List[int] = []
+    for i in range(n):
+        if i:
+            picked = set()
+            for _ in range(min(degree, i)):
+                picked.add(rng.choice(targets) if rng.random() < 0.8 else rng.randrange(i))
+            for j in picked:
+                edges.append((names[i], names[j]))
+                targets.append(j)
+                if reciprocity and rng.random() < reciprocity:
+                    edges.append((names[j], names[i]))
+                    targets.append(i)
+        targets.append(i)
+    return edges
+
+
+def make_graph(n: int, degree: int = 10, seed: int = 42, cls=DirectedGraph,
+               reciprocity: float = 0.0):
+    g = cls()
+    for i in range(n):
+        g.addVertex(f"user{i:07d}")
+    for src, dst in make_edges(n, degree, seed, reciprocity):
+        g.addEdge(src, dst)
+    return g
+
+
+def scan_followers(g: DirectedGraph, target: str) -> List[str]:
+    # the original followersOf: test every vertex's outgoing set
+    return sorted(v for v, outs in g._adj.items() if target in outs)
+
+
+def time_calls(fn: Callable, args: Iterable, repeats: int = 1) -> List[int]:
+    """Nanoseconds per call of fn(arg), GC paused while timing."""
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for arg in args:
+            for _ in range(repeats):
+                start = time.perf_counter_ns()
+                fn(arg)
+                samples.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def summarize(samples: List[int]) -> dict:
+    samples = sorted(samples)
+    return {
+        "calls": len(samples),
+        "median_us": statistics.median(samples) / 1e3,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1e3,
+        "mean_us": statistics.fmean(samples) / 1e3,
+    }
+
+
+def bench_followers(args) -> dict:
+    g = make_graph(args.vertices, args.degree, args.seed)
+    rng = random.Random(args.seed)
+    vertices = list(g._adj)
+    # half random accounts, half the most-followed ones
+    popular = sorted(vertices, key=g.inDegree, reverse=True)[:args.queries // 2]
+    targets = popular + rng.sample(vertices, args.queries - len(popular))
+    # the scan is O(V+E) per call, so it gets every 10th target (same mix)
+    scan_targets = targets[::10]
+    for t in targets:
+        assert g.followersOf(t) == scan_followers(g, t)
+    result = {
+        "vertices": g.vertexCount(),
+        "edges": g.edgeCount(),
+        "max_in_degree": g.inDegree(popular[0]) if popular else 0,
+        "reverse_index": summarize(time_calls(g.followersOf, targets)),
+        "scan": summarize(time_calls(lambda t: scan_followers(g, t), scan_targets)),
+    }
+    # like-for-like: the reverse index on the scan's targets
+    same = summarize(time_calls(g.followersOf, scan_targets))
+    result["speedup"] = result["scan"]["median_us"] / same["median_us"]
+    return result
+
+
+def print_table(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['edges']} edges")
+    print(f"{'method':<15}{'calls':>8}{'median us':>12}{'p99 us':>12}")
+    for name in ("reverse_index", "scan"):
+        r = result[name]
+        print(f"{name:<15}{r['calls']:>8}{r['median_us']:>12.1f}{r['p99_us']:>12.1f}")
+    print(f"speedup (median): {result['speedup']:.0f}x")
+
+
+def bench_pages(args) -> dict:
+    g = make_graph(args.vertices, args.degree, args.seed)
+    popular = sorted(g._adj, key=g.inDegree, reverse=True)[:args.queries]
+
+    def first_page(v):
+        return g.followersOf(v, limit=args.limit)
+
+    def sort_all(v):
+        # what every page view used to cost: copy and sort all followers
+        return sorted(list(g._radj[v]))[:args.limit]
+
+    def walk_all(v):
+        # every page in turn, via the cursor
+        after = None
+        while True:
+            page = g.followersOf(v, after=after, limit=args.limit)
+            if not page:
+                return
+            after = page[-1]
+
+    for v in popular[:10]:
+        assert first_page(v) == sort_all(v)
+    return {
+        "vertices": g.vertexCount(),
+        "edges": g.edgeCount(),
+        "max_in_degree": g.inDegree(popular[0]),
+        "first_page": summarize(time_calls(first_page, popular)),
+        "sort_all": summarize(time_calls(sort_all, popular)),
+        "all_pages": summarize(time_calls(walk_all, popular[:10])),
+    }
+
+
+def print_pages(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['edges']} edges, "
+          f"max in-degree {result['max_in_degree']}")
+    print(f"{'method':<15}{'calls':>8}{'median us':>12}{'p99 us':>12}")
+    for name in ("first_page", "sort_all", "all_pages"):
+        r = result[name]
+        print(f"{name:<15}{r['calls']:>8}{r['median_us']:>12.1f}{r['p99_us']:>12.1f}")
+
+
+def bfs_path(g: DirectedGraph, src: str, dst: str):
+    # plain one-directional BFS along outgoing edges; returns (path, visited)
+    if src == dst:
+        return [src], 1
+    parents = {src: None}
+    frontier = [src]
+    while frontier:
+        next_frontier = []
+        for v in frontier:
+            for w in g._adj[v]:
+                if w in parents:
+                    continue
+                parents[w] = v
+                if w == dst:
+                    path = [w]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path[::-1], len(parents)
+                next_frontier.append(w)
+        frontier = next_frontier
+    return None, len(parents)
+
+
+def bench_separation(args) -> dict:
+    g = make_graph(args.vertices, args.degree, args.seed, reciprocity=args.reciprocity)
+    rng = random.Random(args.seed)
+    names = list(g._adj)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(args.pairs)]
+    visited = {"bidirectional": [], "bfs": []}
+    lengths = []
+    for src, dst in pairs:
+        path, n = g._bidirectionalSearch(src, dst, None, None)
+        base, m = bfs_path(g, src, dst)
+        assert (path is None) == (base is None)
+        if path is not None:
+            assert len(path) == len(base)
+            assert all(b in g._adj[a] for a, b in zip(path, path[1:]))
+            lengths.append(len(path) - 1)
+        visited["bidirectional"].append(n)
+        visited["bfs"].append(m)
+    result = {
+        "vertices": g.vertexCount(),
+        "edges": g.edgeCount(),
+        "pairs": len(pairs),
+        "connected": len(lengths),
+        "mean_hops": statistics.fmean(lengths) if lengths else 0.0,
+        "bidirectional": summarize(time_calls(
+            lambda p: g.degreesOfSeparation(*p), pairs)),
+        "bfs": summarize(time_calls(lambda p: bfs_path(g, *p), pairs)),
+    }
+    for name in visited:
+        result[name]["median_visited"] = statistics.median(visited[name])
+    result["speedup"] = result["bfs"]["median_us"] / result["bidirectional"]["median_us"]
+    return result
+
+
+def print_separation(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['edges']} edges, "
+          f"{result['connected']}/{result['pairs']} pairs connected, "
+          f"mean {result['mean_hops']:.2f} hops")
+    print(f"{'method':<15}{'median us':>12}{'p99 us':>12}{'visited':>10}")
+    for name in ("bidirectional", "bfs"):
+        r = result[name]
+        print(f"{name:<15}{r['median_us']:>12.1f}{r['p99_us']:>12.1f}"
+              f"{r['median_visited']:>10.0f}")
+    print(f"speedup (median): {result['speedup']:.0f}x")
+
+
+class _FlushAllRecommender(Recommender):
+    # baseline: any change throws away the whole cache
+    def _on_change(self, event, src, dst):
+        if event != "addVertex":
+            self.invalidate_all()
+
+
+def bench_recommend(args) -> dict:
+    names = [f"user{i:07d}" for i in range(args.vertices)]
+    rng = random.Random(args.seed)
+    # skewed traffic: a small set of users asks most of the time
+    ops = []
+    for _ in range(args.ops):
+        if rng.random() < args.write_ratio:
+            ops.append(("follow", rng.choice(names), rng.choice(names)))
+        else:
+            i = min(int(rng.paretovariate(1.2)) - 1, args.vertices - 1)
+            ops.append(("ask", names[i * 7919 % args.vertices], None))
+
+    results = []
+    for label, cls, capacity in (("no cache", Recommender, 0),
+                                 ("flush all", _FlushAllRecommender, args.capacity),
+                                 ("targeted", Recommender, args.capacity)):
+        g = make_graph(args.vertices, args.degree, args.seed,
+                       reciprocity=args.reciprocity)
+        rec = cls(g, capacity=capacity)
+        latencies = []
+        start = time.perf_counter()
+        for op, a, b in ops:
+            if op == "follow":
+                g.addEdge(a, b)
+            else:
+                t0 = time.perf_counter_ns()
+                rec.recommend(a)
+                latencies.append(time.perf_counter_ns() - t0)
+        elapsed = time.perf_counter() - start
+        row = {"strategy": label, "seconds": elapsed}
+        row.update(summarize(latencies))
+        row.update(rec.stats())
+        results.append(row)
+    return {"vertices": args.vertices, "ops": args.ops, "results": results}
+
+
+def print_recommend(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['ops']} operations")
+    print(f"{'strategy':<12}{'seconds':>9}{'median us':>11}{'mean us':>10}"
+          f"{'hit rate':>10}{'invalidated':>13}")
+    for r in result["results"]:
+        print(f"{r['strategy']:<12}{r['seconds']:>9.2f}{r['median_us']:>11.1f}"
+              f"{r['mean_us']:>10.1f}{r['hit_rate']:>10.1%}{r['invalidations']:>13}")
+
+
+def python_pagerank_step(g: DirectedGraph, r: dict, d: float = 0.85) -> dict:
+    # one PageRank iteration as plain Python over _adj, for comparison
+    n = len(r)
+    dangling = sum(r[v] for v, outs in g._adj.items() if not outs)
+    new = dict.fromkeys(r, (1 - d) / n + d * dangling / n)
+    for v, outs in g._adj.items():
+        if outs:
+            share = d * r[v] / len(outs)
+            for w in outs:
+                new[w] += share
+    return new
+
+
+def bench_influence(args) -> dict:
+    from influence import InfluenceScorer
+    edges = make_edges(args.vertices, args.degree, args.seed, args.reciprocity)
+    names = [f"user{i:07d}" for i in range(args.vertices)]
+    if args.backend == "csr":
+        g = CSRGraph.fromEdges(edges, vertices=names)
+    else:
+        g = build_dict_graph(edges, args.vertices)
+    del edges
+    scorer = InfluenceScorer(g, tol=args.tol)
+
+    def run(**kwargs) -> dict:
+        scorer.pagerank(**kwargs)
+        return {"seconds": scorer.seconds, "setup_s": scorer.setup_seconds,
+                "iterations": scorer.iterations}
+
+    cold = run()
+    start = time.perf_counter()
+    scorer.in_degree_centrality()
+    degree_s = time.perf_counter() - start
+
+    rng = random.Random(args.seed)
+    for _ in range(args.changes):
+        a, b = rng.choice(names), rng.choice(names)
+        if rng.random() < 0.5:
+            g.addEdge(a, b)
+        else:
+            g.removeEdge(a, b)
+    warm = run()
+    recold = run(warm=False)
+
+    result = {
+        "backend": args.backend,
+        "vertices": g.vertexCount(),
+        "edges": g.edgeCount(),
+        "changes": args.changes,
+        "cold": cold,
+        "warm_after_changes": warm,
+        "cold_after_changes": recold,
+        "in_degree_s": degree_s,
+        "top": scorer.top(5),
+    }
+    if args.backend == "dict":
+        r = dict.fromkeys(g._adj, 1 / g.vertexCount())
+        start = time.perf_counter()
+        python_pagerank_step(g, r)
+        result["python_iteration_s"] = time.perf_counter() - start
+    return result
+
+
+def print_influence(result: dict) -> None:
+    print(f"{result['backend']}: {result['vertices']} vertices, {result['edges']} edges")
+    # setup = building or patching the edge arrays; the rest is iterating
+    print(f"{'run':<28}{'seconds':>9}{'setup s':>9}{'iterations':>12}")
+    for label, key in (("cold (first run)", "cold"),
+                       (f"warm after {result['changes']} changes", "warm_after_changes"),
+                       (f"cold after {result['changes']} changes", "cold_after_changes")):
+        r = result[key]
+        print(f"{label:<28}{r['seconds']:>9.2f}{r['setup_s']:>9.2f}{r['iterations']:>12}")
+    print(f"in-degree centrality: {result['in_degree_s']:.3f}s")
+    cold = result["cold"]
+    per_iter = (cold["seconds"] - cold["setup_s"]) / max(1, cold["iterations"])
+    line = f"one iteration: numpy {per_iter * 1e3:.1f} ms"
+    if "python_iteration_s" in result:
+        line += f", python loop over _adj {result['python_iteration_s'] * 1e3:.1f} ms"
+    print(line)
+    print("top:", ", ".join(f"{name} {score:.2e}" for name, score in result["top"]))
+
+
+def build_dict_graph(edges, n: int) -> DirectedGraph:
+    g = DirectedGraph()
+    for i in range(n):
+        g.addVertex(f"user{i:07d}")
+    for src, dst in edges:
+        g.addEdge(src, dst)
+    return g
+
+
+def build_csr_graph(edges, n: int) -> CSRGraph:
+    return CSRGraph.fromEdges(edges, vertices=(f"user{i:07d}" for i in range(n)))
+
+
+BACKENDS = {"DirectedGraph": build_dict_graph, "CSRGraph": build_csr_graph}
+
+
+def bench_backend(name: str, args) -> dict:
+    build = BACKENDS[name]
+    # memory: generate the edges inside the traced window so the graph's
+    # copies of the names are counted, then drop the edge list itself
+    gc.collect()
+    tracemalloc.start()
+    edges = make_edges(args.vertices, args.degree, args.seed)
+    g = build(edges, args.vertices)
+    del edges
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del g
+
+    edges = make_edges(args.vertices, args.degree, args.seed)
+    gc.collect()
+    start = time.perf_counter()
+    g = build(edges, args.vertices)
+    build_s = time.perf_counter() - start
+    n_edges = g.edgeCount()
+
+    rng = random.Random(args.seed)
+    names = [f"user{i:07d}" for i in range(args.vertices)]
+    targets = rng.sample(names, min(args.queries, len(names)))
+    followers = summarize(time_calls(g.followersOf, targets))
+    following = summarize(time_calls(g.listOutgoingAdjacentVertex, targets))
+
+    # writes: a burst of new follows, then the same follows undone
+    writes = [(rng.choice(names), rng.choice(names)) for _ in range(args.writes)]
+    start = time.perf_counter()
+    for src, dst in writes:
+        g.addEdge(src, dst)
+    for src, dst in writes:
+        g.removeEdge(src, dst)
+    write_s = time.perf_counter() - start
+    return {
+        "backend": name,
+        "vertices": args.vertices,
+        "edges": n_edges,
+        "memory_mb": memory / 2 ** 20,
+        "bytes_per_edge": memory / n_edges if n_edges else 0.0,
+        "build_s": build_s,
+        "followersOf_us": followers["median_us"],
+        "listOutgoing_us": following["median_us"],
+        "writes_per_s": 2 * len(writes) / write_s if write_s else 0.0,
+    }
+
+
+def print_backends(results: List[dict]) -> None:
+    print(f"{results[0]['vertices']} vertices, {results[0]['edges']} edges")
+    print(f"{'backend':<14}{'MB':>8}{'B/edge':>8}{'build s':>9}"
+          f"{'followersOf us':>16}{'following us':>14}{'writes/s':>11}")
+    for r in results:
+        print(f"{r['backend']:<14}{r['memory_mb']:>8.0f}{r['bytes_per_edge']:>8.0f}"
+              f"{r['build_s']:>9.2f}{r['followersOf_us']:>16.1f}"
+              f"{r['listOutgoing_us']:>14.1f}{r['writes_per_s']:>11.0f}")
+
+
+def bench_io(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="graph-io-")
+    edges_path = os.path.join(workdir, "edges.tsv")
+    snap_path = os.path.join(workdir, "graph.snap")
+    try:
+        graph_io.write_edges(edges_path, make_edges(args.vertices, args.degree, args.seed))
+
+        start = time.perf_counter()
+        g, directory = graph_io.load_text(edges_path, chunk_size=args.chunk_size)
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        csr = CSRGraph.fromEdges(graph_io.iter_edges(edges_path))
+        csr_load_s = time.perf_counter() - start
+        del csr
+
+        # the loader's own overhead on top of the graph it builds: the
+        # peak during the load minus what is still allocated afterwards
+        gc.collect()
+        tracemalloc.start()
+        traced, _ = graph_io.load_text(edges_path, chunk_size=args.chunk_size)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del traced
+
+        start = time.perf_counter()
+        size = graph_io.save_snapshot(snap_path, g, directory)
+        save_s = time.perf_counter() - start
+
+        start = time.perf_counter_ns()
+        snap = graph_io.open_snapshot(snap_path)
+        open_us = (time.perf_counter_ns() - start) / 1e3
+        rng = random.Random(args.seed)
+        targets = rng.sample(g.vertices(), min(args.queries, g.vertexCount()))
+        for v in targets[:20]:
+            assert snap.followersOf(v, limit=50) == g.followersOf(v, limit=50)
+        mapped = summarize(time_calls(lambda v: snap.followersOf(v, limit=50), targets))
+        in_memory = summarize(time_calls(lambda v: g.followersOf(v, limit=50), targets))
+        start = time.perf_counter()
+        snap.to_csr_graph()
+        to_csr_s = time.perf_counter() - start
+        snap.close()
+
+        start = time.perf_counter()
+        graph_io.load_snapshot(snap_path)
+        load_snapshot_s = time.perf_counter() - start
+        return {
+            "vertices": g.vertexCount(),
+            "edges": g.edgeCount(),
+            "text_mb": os.path.getsize(edges_path) / 1e6,
+            "snapshot_mb": size / 1e6,
+            "chunk_size": args.chunk_size,
+            "load_text_s": load_s,
+            "load_text_csr_s": csr_load_s,
+            "loader_overhead_mb": (peak - current) / 2 ** 20,
+            "save_snapshot_s": save_s,
+            "open_snapshot_us": open_us,
+            "load_snapshot_s": load_snapshot_s,
+            "snapshot_to_csr_s": to_csr_s,
+            "mapped_page_us": mapped["median_us"],
+            "in_memory_page_us": in_memory["median_us"],
+        }
+    finally:
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+
+def print_io(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['edges']} edges: "
+          f"{result['text_mb']:.1f} MB TSV, {result['snapshot_mb']:.1f} MB snapshot")
+    print(f"{'step':<34}{'time':>12}")
+    for label, key in (("TSV -> DirectedGraph (streamed)", "load_text_s"),
+                       ("TSV -> CSRGraph.fromEdges", "load_text_csr_s"),
+                       ("save snapshot", "save_snapshot_s"),
+                       ("snapshot -> DirectedGraph", "load_snapshot_s"),
+                       ("snapshot -> CSRGraph", "snapshot_to_csr_s")):
+        print(f"{label:<34}{result[key]:>11.2f}s")
+    print(f"{'open snapshot (mmap)':<34}{result['open_snapshot_us']:>10.0f}us")
+    print(f"followers page of 50: mapped {result['mapped_page_us']:.1f} us, "
+          f"in memory {result['in_memory_page_us']:.1f} us")
+    print(f"loader overhead above the graph: {result['loader_overhead_mb']:.1f} MB "
+          f"(chunks of {result['chunk_size']} rows)")
+
+
+SYLLABLES = ["an", "bel", "cor", "da", "el", "fin", "gar", "ho", "is", "jo",
+             "ka", "li", "mar", "no", "or", "pe", "ra", "si", "to", "vi"]
+
+
+def make_people(n: int, seed: int = 42, vocabulary: int = 5000) -> Tuple[List[Person], List[str]]:
+    # bios draw words from a Zipf-like vocabulary: a few very common
+    # words, a long tail of rare ones (like real text)
+    rng = random.Random(seed)
+    words = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+                    for _ in range(vocabulary)})
+    rng.shuffle(words)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    people = []
+    for i in range(n):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(3)).capitalize() + str(i)
+        bio = " ".join(rng.choices(words, weights, k=rng.randint(3, 12)))
+        # one in five profiles is private
+        privacy = Privacy.PRIVATE if rng.random() < 0.2 else Privacy.PUBLIC
+        people.append(Person(name, rng.choice("MF"), bio, privacy))
+    return people, words
+
+
+def bench_search(args) -> dict:
+    people, words = make_people(args.people, args.seed)
+    start = time.perf_counter()
+    directory = PeopleDirectory()
+    for p in people:
+        directory.add(p)
+    build_s = time.perf_counter() - start
+    by_name = directory._by_name
+
+    def scan_prefix(prefix):
+        # what type-ahead costs without an index: test and sort every name
+        prefix = prefix.casefold()
+        return sorted((n for n in by_name if n.casefold().startswith(prefix)),
+                      key=lambda n: (n.casefold(), n))[:args.limit]
+
+    def scan_bios(query):
+        words = set(tokenize(query))
+        return [p.name for p in by_name.values()
+                if p.privacy == Privacy.PUBLIC and words <= set(tokenize(p.biography))]
+
+    rng = random.Random(args.seed)
+    prefixes = [rng.choice(people).name[:rng.randint(2, 5)] for _ in range(args.queries)]
+    # query words are drawn like bio words: mostly common ones
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    queries = [" ".join(rng.choices(words, weights, k=rng.randint(1, 2)))
+               for _ in range(args.queries)]
+    for prefix in prefixes[:10]:
+        assert directory.search_names(prefix, limit=args.limit) == scan_prefix(prefix)
+    for query in queries[:10]:
+        hits = directory.search_bios(query, limit=len(by_name))
+        assert sorted(n for n, _ in hits) == sorted(scan_bios(query))
+    scan_queries = queries[:max(1, args.queries // 20)]
+    return {
+        "people": len(by_name),
+        "build_s": build_s,
+        "prefix_index": summarize(time_calls(
+            lambda q: directory.search_names(q, limit=args.limit), prefixes)),
+        "prefix_scan": summarize(time_calls(scan_prefix, prefixes[:len(scan_queries)])),
+        "bio_index": summarize(time_calls(
+            lambda q: directory.search_bios(q, limit=args.limit), queries)),
+        "bio_scan": summarize(time_calls(scan_bios, scan_queries)),
+        "all_names_index": summarize(time_calls(lambda _: directory.all_names(), range(5))),
+        "all_names_sort": summarize(time_calls(lambda _: sorted(by_name), range(5))),
+    }
+
+
+def print_search(result: dict) -> None:
+    print(f"{result['people']} people, indexes built in {result['build_s']:.2f}s")
+    print(f"{'method':<18}{'calls':>8}{'median us':>12}{'p99 us':>12}")
+    for name in ("prefix_index", "prefix_scan", "bio_index", "bio_scan",
+                 "all_names_index", "all_names_sort"):
+        r = result[name]
+        print(f"{name:<18}{r['calls']:>8}{r['median_us']:>12.1f}{r['p99_us']:>12.1f}")
+
+
+def bench_components(args) -> dict:
+    edges = make_edges(args.vertices, args.degree, args.seed, args.reciprocity)
+    g = CSRGraph.fromEdges(edges, vertices=(f"user{i:07d}" for i in range(args.vertices)))
+    del edges
+    result = {"vertices": g.vertexCount(), "edges": g.edgeCount(),
+              "cpus": os.cpu_count(), "depth": args.depth}
+    for name, fn in (("scc", components.strongly_connected_components),
+                     ("wcc", components.weakly_connected_components)):
+        start = time.perf_counter()
+        found = fn(g)
+        result[name] = dict(components.component_summary(found),
+                            seconds=time.perf_counter() - start)
+
+    workdir = tempfile.mkdtemp(prefix="components-")
+    snap_path = os.path.join(workdir, "graph.snap")
+    try:
+        graph_io.save_snapshot(snap_path, g)
+        rng = random.Random(args.seed)
+        sources = rng.sample(g.vertices(), min(args.sources, g.vertexCount()))
+        runs = []
+        expected = None
+        for workers in args.workers:
+            # wall time includes starting the pool and mapping the snapshot
+            start = time.perf_counter()
+            counts = components.reach_sizes(g, sources, max_depth=args.depth,
+                                            workers=workers, snapshot=snap_path)
+            seconds = time.perf_counter() - start
+            if expected is None:
+                expected = counts
+            assert counts == expected
+            runs.append({"workers": workers, "seconds": seconds})
+        for run in runs:
+            run["speedup"] = runs[0]["seconds"] / run["seconds"]
+            run["efficiency"] = run["speedup"] / run["workers"] * runs[0]["workers"]
+        result["reach"] = runs
+        result["sources"] = len(sources)
+        result["mean_reach"] = statistics.fmean(expected.values()) if expected else 0.0
+    finally:
+        os.remove(snap_path)
+        os.rmdir(workdir)
+    return result
+
+
+def print_components(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['edges']} edges, {result['cpus']} CPUs")
+    for name in ("scc", "wcc"):
+        r = result[name]
+        print(f"{name.upper()}: {r['components']} components, largest {r['largest']}, "
+              f"{r['singletons']} singletons ({r['seconds']:.2f}s)")
+    print(f"reach within {result['depth']} hops from {result['sources']} sources "
+          f"(mean {result['mean_reach']:.0f} accounts)")
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}{'efficiency':>12}")
+    for r in result["reach"]:
+        print(f"{r['workers']:>8}{r['seconds']:>10.2f}{r['speedup']:>9.2f}x{r['efficiency']:>11.0%}")
+
+
+def bench_snapshots(args) -> dict:
+    from versioning import ChangeFeed
+    g = DirectedGraph()
+    g.addEdges(make_edges(args.vertices, args.degree, args.seed))
+    rng = random.Random(args.seed)
+    names = g.vertices()
+    writes = [(rng.choice(names), rng.choice(names)) for _ in range(args.writes)]
+
+    def write_rate(pin_every: int = 0) -> Tuple[float, int]:
+        # follows then unfollows; optionally re-pinning a snapshot every
+        # pin_every writes, like an analytics job that keeps starting over
+        view = g.snapshot() if pin_every else None
+        kept = 0
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for i, (src, dst) in enumerate(writes + writes):
+                if i < len(writes):
+                    g.addEdge(src, dst)
+                else:
+                    g.removeEdge(src, dst)
+                if pin_every and i % pin_every == pin_every - 1:
+                    kept += len(view._kept[0]) + len(view._kept[1])
+                    view.release()
+                    view = g.snapshot()
+            seconds = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if view is not None:
+            view.release()
+        return 2 * len(writes) / seconds, kept
+
+    write_rate()                # warm-up
+    plain, _ = write_rate()
+    pinned, kept = write_rate(args.pin_every)
+    feed = ChangeFeed(g)
+    with_feed, _ = write_rate()
+    feed_entries = len(feed)
+    feed.close()
+
+    pin_ns = time_calls(lambda _: g.snapshot().release(), range(1000))
+    start = time.perf_counter()
+    # the alternative to a pinned view: copy every row
+    {v: row.copy() for v, row in g._adj.items()}
+    {v: row.copy() for v, row in g._radj.items()}
+    copy_s = time.perf_counter() - start
+    return {
+        "vertices": g.vertexCount(),
+        "edges": g.edgeCount(),
+        "writes": 2 * len(writes),
+        "writes_per_s": plain,
+        "pinned_writes_per_s": pinned,
+        "pin_every": args.pin_every,
+        "rows_kept_per_pin": kept / max(1, 2 * len(writes) // args.pin_every),
+        "feed_writes_per_s": with_feed,
+        "feed_entries": feed_entries,
+        "pin_us": summarize(pin_ns)["median_us"],
+        "full_copy_s": copy_s,
+    }
+
+
+def print_snapshots(result: dict) -> None:
+    print(f"{result['vertices']} vertices, {result['edges']} edges, "
+          f"{result['writes']} writes per run")
+    print(f"{'writes with':<36}{'writes/s':>10}")
+    print(f"{'nothing pinned':<36}{result['writes_per_s']:>10.0f}")
+    print(f"{'a snapshot re-pinned every ' + str(result['pin_every']):<36}"
+          f"{result['pinned_writes_per_s']:>10.0f}")
+    print(f"{'a change feed attached':<36}{result['feed_writes_per_s']:>10.0f}")
+    print(f"taking a snapshot: {result['pin_us']:.1f} us "
+          f"(copying every row instead: {result['full_copy_s']:.2f} s)")
+    print(f"rows kept per snapshot: {result['rows_kept_per_pin']:.0f}, "
+          f"feed entries: {result['feed_entries']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Social graph benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("followers", help="reverse index vs full scan for followersOf")
+    p.add_argument("--vertices", type=int, default=50000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("backends", help="memory and speed of DirectedGraph vs CSRGraph")
+    p.add_argument("--vertices", type=int, default=100000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--queries", type=int, default=1000)
+    p.add_argument("--writes", type=int, default=50000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("pages", help="first page of followers vs sorting them all")
+    p.add_argument("--vertices", type=int, default=100000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--queries", type=int, default=100, help="most-followed accounts to query")
+    p.add_argument("--limit", type=int, default=50, help="page size")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("separation", help="bidirectional vs one-directional BFS")
+    p.add_argument("--vertices", type=int, default=100000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--pairs", type=int, default=200)
+    p.add_argument("--reciprocity", type=float, default=0.3,
+                   help="chance that a follow is returned")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("recommend", help="who-to-follow cache: none vs flush-all vs targeted")
+    p.add_argument("--vertices", type=int, default=50000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--reciprocity", type=float, default=0.3)
+    p.add_argument("--ops", type=int, default=20000)
+    p.add_argument("--write-ratio", type=float, default=0.05)
+    p.add_argument("--capacity", type=int, default=4096)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("influence", help="PageRank cold vs warm start (needs numpy)")
+    p.add_argument("--vertices", type=int, default=200000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--reciprocity", type=float, default=0.3)
+    p.add_argument("--backend", choices=["dict", "csr"], default="dict")
+    p.add_argument("--changes", type=int, default=1000, help="follows/unfollows between runs")
+    p.add_argument("--tol", type=float, default=1e-6)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("io", help="streaming TSV load and mmap snapshot save/open/query")
+    p.add_argument("--vertices", type=int, default=100000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--chunk-size", type=int, default=graph_io.CHUNK_SIZE)
+    p.add_argument("--queries", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("search", help="name prefix and bio keyword search: index vs scan")
+    p.add_argument("--people", type=int, default=100000)
+    p.add_argument("--queries", type=int, default=1000)
+    p.add_argument("--limit", type=int, default=10, help="results per page")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("components", help="SCC/WCC, and reach queries on 1..N worker processes")
+    p.add_argument("--vertices", type=int, default=100000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--reciprocity", type=float, default=0.3)
+    p.add_argument("--sources", type=int, default=400, help="reach queries to run")
+    p.add_argument("--depth", type=int, default=3, help="hops per reach query")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    p = sub.add_parser("snapshots", help="cost of pinned snapshots and the change feed on writes")
+    p.add_argument("--vertices", type=int, default=100000)
+    p.add_argument("--degree", type=int, default=10, help="follows per new user")
+    p.add_argument("--writes", type=int, default=50000)
+    p.add_argument("--pin-every", type=int, default=1000, help="writes between snapshots")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="also write the results to this JSON file")
+
+    args = parser.parse_args()
+    if args.command == "followers":
+        result = bench_followers(args)
+        print_table(result)
+    elif args.command == "backends":
+        result = [bench_backend(name, args) for name in BACKENDS]
+        print_backends(result)
+    elif args.command == "pages":
+        result = bench_pages(args)
+        print_pages(result)
+    elif args.command == "separation":
+        result = bench_separation(args)
+        print_separation(result)
+    elif args.command == "recommend":
+        result = bench_recommend(args)
+        print_recommend(result)
+    elif args.command == "influence":
+        result = bench_influence(args)
+        print_influence(result)
+    elif args.command == "io":
+        result = bench_io(args)
+        print_io(result)
+    elif args.command == "search":
+        result = bench_search(args)
+        print_search(result)
+    elif args.command == "components":
+        result = bench_components(args)
+        print_components(result)
+    elif args.command == "snapshots":
+        result = bench_snapshots(args)
+        print_snapshots(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
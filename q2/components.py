@@ -0,0 +1,282 @@
+"""Connected components and reach analytics for the follow graph.
+
+- strongly_connected_components: groups where everyone can reach
+  everyone else by following links (mutual-follow clusters). Iterative
+  Tarjan with an explicit stack, so deep graphs never hit Python's
+  recursion limit.
+- weakly_connected_components: groups connected when follow direction
+  is ignored (isolated communities). Union-find with union by size and
+  path halving.
+- reach_sizes: for many source users, how many accounts are within
+  max_depth hops (followers of followers, or the other way).
+
+Everything runs on flat CSR arrays of integer vertex IDs: a CSRGraph
+or GraphSnapshot already has them, a DirectedGraph is converted first.
+
+reach_sizes(..., workers=N) spreads the sources over a
+ProcessPoolExecutor. Workers do not get a pickled copy of the graph:
+the graph is written to a snapshot file once (or an existing one is
+passed as snapshot=), and each worker maps that same file read-only,
+so all processes share one copy of the arrays through the page cache.
+"""
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import graph_io
+
+FOLLOWERS = "followers"
+FOLLOWING = "following"
+
+
+def _arrays(graph) -> Tuple[List[str], array, array, array, array]:
+    # (names, out_offsets, out_targets, in_offsets, in_sources)
+    if isinstance(graph, graph_io.GraphSnapshot):
+        names = [graph.name(i) for i in range(graph.n)]
+        arrays = (graph._out_offsets, graph._out_targets,
+                  graph._in_offsets, graph._in_sources)
+        if graph.vertexCount() != graph.n:
+            # people without a vertex have empty rows; leave them out
+            keep = [i for i in range(graph.n) if graph._flags[i] & graph_io.IN_GRAPH]
+            return _renumber(names, keep, *arrays)
+        return (names, *arrays)
+    if hasattr(graph, "_out_targets"):
+        # CSRGraph: already flat once the delta buffer is merged
+        graph.merge()
+        names = graph._names
+        arrays = (graph._out_offsets, graph._out_targets,
+                  graph._in_offsets, graph._in_sources)
+        if len(graph._ids) != len(names):
+            keep = [i for i, name in enumerate(names) if name is not None]
+            return _renumber(names, keep, *arrays)
+        return (list(names), *arrays)
+    names = graph.vertices()
+    index = {name: i for i, name in enumerate(names)}
+    out_offsets, out_targets = graph_io._csr(graph, names, index,
+                                             graph.listOutgoingAdjacentVertex)
+    in_offsets, in_sources = graph_io._csr(graph, names, index, graph.followersOf)
+    return names, out_offsets, out_targets, in_offsets, in_sources
+
+
+def _renumber(names, keep, *arrays):
+    remap = array("i", [-1]) * len(names)
+    for new, old in enumerate(keep):
+        remap[old] = new
+    result = [[names[i] for i in keep]]
+    for offsets, values in zip(arrays[::2], arrays[1::2]):
+        new_offsets = array("q", [0])
+        new_values = array("i")
+        for i in keep:
+            new_values.extend(remap[j] for j in values[offsets[i]:offsets[i + 1]])
+            new_offsets.append(len(new_values))
+        result += [new_offsets, new_values]
+    return tuple(result)
+
+
+# ---- strongly connected ----
+def _tarjan(n: int, offsets, targets) -> List[List[int]]:
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # explicit DFS stack of (vertex, next edge position)
+        work = [(root, offsets[root])]
+        while work:
+            v, pos = work[-1]
+            end = offsets[v + 1]
+            descended = False
+            while pos < end:
+                w = targets[pos]
+                pos += 1
+                if index[w] == -1:
+                    work[-1] = (v, pos)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append((w, offsets[w]))
+                    descended = True
+                    break
+                if on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            if descended:
+                continue
+            work.pop()
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+    return components
+
+
+def strongly_connected_components(graph) -> List[List[str]]:
+    """Mutual-reachability groups, largest first, names sorted in each."""
+    names, out_offsets, out_targets, _, _ = _arrays(graph)
+    components = _tarjan(len(names), out_offsets, out_targets)
+    result = [sorted(names[i] for i in c) for c in components]
+    result.sort(key=lambda c: (-len(c), c[0]))
+    return result
+
+
+# ---- weakly connected ----
+def _union_find(n: int, offsets, targets) -> List[int]:
+    parent = list(range(n))
+    size = [1] * n
+    for u in range(n):
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            # find both roots, halving paths on the way
+            a = u
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            b = v
+            while parent[b] != b:
+                parent[b] = parent[parent[b]]
+                b = parent[b]
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+    for u in range(n):
+        root = u
+        while parent[root] != root:
+            root = parent[root]
+        parent[u] = root
+    return parent
+
+
+def weakly_connected_components(graph) -> List[List[str]]:
+    """Groups connected ignoring follow direction, largest first, names sorted."""
+    names, out_offsets, out_targets, _, _ = _arrays(graph)
+    roots = _union_find(len(names), out_offsets, out_targets)
+    groups: Dict[int, List[str]] = {}
+    for i, root in enumerate(roots):
+        groups.setdefault(root, []).append(names[i])
+    result = [sorted(c) for c in groups.values()]
+    result.sort(key=lambda c: (-len(c), c[0]))
+    return result
+
+
+def component_summary(components: Sequence[Sequence[str]]) -> dict:
+    sizes = [len(c) for c in components]
+    return {
+        "components": len(sizes),
+        "largest": max(sizes, default=0),
+        "singletons": sum(1 for s in sizes if s == 1),
+        "vertices": sum(sizes),
+    }
+
+
+# ---- reach ----
+def _reach(offsets, values, n: int, source: int, max_depth: Optional[int]) -> int:
+    # BFS from source; accounts reached, not counting the source
+    seen = bytearray(n)
+    seen[source] = 1
+    frontier = [source]
+    reached = 0
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for v in frontier:
+            for w in values[offsets[v]:offsets[v + 1]]:
+                if not seen[w]:
+                    seen[w] = 1
+                    next_frontier.append(w)
+        reached += len(next_frontier)
+        frontier = next_frontier
+    return reached
+
+
+def _reach_all(graph, sources: List[str], direction: str,
+               max_depth: Optional[int]) -> Dict[str, int]:
+    names, out_offsets, out_targets, in_offsets, in_sources = _arrays(graph)
+    index = {name: i for i, name in enumerate(names)}
+    offsets, values = ((in_offsets, in_sources) if direction == FOLLOWERS
+                       else (out_offsets, out_targets))
+    return {s: _reach(offsets, values, len(names), index[s], max_depth) for s in sources}
+
+
+# per-process state for pool workers
+_worker = {}
+
+
+def _init_worker(path: str, direction: str, max_depth: Optional[int]) -> None:
+    snap = graph_io.open_snapshot(path)
+    _worker["snap"] = snap
+    if direction == FOLLOWERS:
+        _worker["rows"] = (snap._in_offsets, snap._in_sources)
+    else:
+        _worker["rows"] = (snap._out_offsets, snap._out_targets)
+    _worker["max_depth"] = max_depth
+
+
+def _reach_batch(ids: List[int]) -> List[int]:
+    snap = _worker["snap"]
+    offsets, values = _worker["rows"]
+    return [_reach(offsets, values, snap.n, i, _worker["max_depth"]) for i in ids]
+
+
+def reach_sizes(graph, sources: Iterable[str], direction: str = FOLLOWERS,
+                max_depth: Optional[int] = None, workers: int = 1,
+                snapshot: Optional[str] = None, chunk_size: int = 16) -> Dict[str, int]:
+    """How many accounts each source reaches within max_depth hops.
+
+    direction="followers" follows edges backwards (who would see a post
+    passed on by followers of followers); "following" forwards.
+    With workers > 1 the sources are split over worker processes that
+    share a read-only mapped snapshot (written to a temp file unless
+    snapshot= names an existing one for this graph).
+    """
+    if direction not in (FOLLOWERS, FOLLOWING):
+        raise ValueError(f"direction must be {FOLLOWERS!r} or {FOLLOWING!r}")
+    sources = [s for s in sources if graph.hasVertex(s)]
+    if workers <= 1:
+        if snapshot is not None:
+            with graph_io.open_snapshot(snapshot) as snap:
+                return _reach_all(snap, sources, direction, max_depth)
+        return _reach_all(graph, sources, direction, max_depth)
+
+    path = snapshot
+    workdir = None
+    if path is None:
+        if isinstance(graph, graph_io.GraphSnapshot):
+            path = graph.path
+        else:
+            workdir = tempfile.mkdtemp(prefix="reach-")
+            path = os.path.join(workdir, "graph.snap")
+            graph_io.save_snapshot(path, graph)
+    try:
+        with graph_io.open_snapshot(path) as snap:
+            ids = [snap._id(s) for s in sources]
+        batches = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(path, direction, max_depth)) as pool:
+            counts = [c for batch in pool.map(_reach_batch, batches) for c in batch]
+        return dict(zip(sources, counts))
+    finally:
+        if workdir is not None:
+            os.remove(path)
+            os.rmdir(workdir)
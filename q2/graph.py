@@ -1,49 +1,199 @@
 from __future__ import annotations
+import os
+import sys
+import threading
+import weakref
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Dict, Set, Iterable, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from people_index import NameIndex, TextIndex
+from sorted_set import SortedSet
 
 # Directed, unweighted graph
 class DirectedGraph:
 
     def __init__(self) -> None:
-        # Adjacency list storing: vertex -> set of outgoing neighbors
-        self._adj: Dict[str, Set[str]] = {}
+        # Adjacency list storing: vertex -> sorted set of outgoing neighbors
+        self._adj: Dict[str, SortedSet] = {}
+        # Reverse index: vertex -> sorted set of incoming neighbors (followers)
+        # Kept in step with _adj so follower lookups never scan the graph
+        self._radj: Dict[str, SortedSet] = {}
+        # All vertex names, kept in order for vertices()
+        self._vertices = SortedSet()
+        self._edge_count = 0
+        # Callbacks told about every change: fn(event, src, dst), where
+        # event is "addVertex", "removeVertex" (dst is None), "addEdge"
+        # or "removeEdge". Called after the change has been applied
+        self._listeners: List[Callable[[str, str, Optional[str]], None]] = []
+        # Bumped on every change; a snapshot or change feed entry records it
+        self.version = 0
+        # Pinned snapshots (GraphView), and the rows (out, in) already
+        # copied since the newest one was taken, see _writable()
+        # (weak references, so a forgotten view doesn't pin rows forever)
+        self._pins: Dict[int, weakref.ref] = {}
+        self._fresh = (set(), set())
+        self._vertices_fresh = False
+        # Held by every change and by snapshot()/_unpin(), so a snapshot
+        # taken on another thread never lands halfway through a change.
+        # Reentrant: addEdge calls addVertex, listeners may read the graph
+        self._lock = threading.RLock()
+
+    def addListener(self, fn: Callable[[str, str, Optional[str]], None]) -> None:
+        self._listeners.append(fn)
+
+    def removeListener(self, fn: Callable[[str, str, Optional[str]], None]) -> None:
+        self._listeners.remove(fn)
+
+    def _notify(self, event: str, src: str, dst: Optional[str] = None) -> None:
+        self.version += 1
+        for fn in self._listeners:
+            fn(event, src, dst)
+
+    # Snapshots
+    def snapshot(self) -> "GraphView":
+        # A read-only view of the graph as it is now. Taking one is O(1);
+        # it stays unchanged while this graph is modified, until released
+        from versioning import GraphView
+        with self._lock:
+            view = GraphView(self)
+            key = id(view)
+            self._pins[key] = weakref.ref(view, lambda _: self._unpin(key))
+            self._fresh[0].clear()
+            self._fresh[1].clear()
+            self._vertices_fresh = False
+            return view
+
+    def _unpin(self, key: int) -> None:
+        with self._lock:
+            self._pins.pop(key, None)
+            if not self._pins:
+                self._fresh[0].clear()
+                self._fresh[1].clear()
+
+    def _writable(self, side: int, v: str) -> None:
+        # Copy-on-write for pinned snapshots: the first write to a row
+        # after a snapshot hands the current row (None if v doesn't exist
+        # yet) to every pinned view that has not kept one, and carries on
+        # with a private copy. Later writes to the row go straight through
+        if self._pins:
+            table = self._radj if side else self._adj
+            fresh = self._fresh[side]
+            if v not in fresh:
+                row = table.get(v)
+                for ref in list(self._pins.values()):
+                    view = ref()
+                    if view is not None:
+                        view._keep(side, v, row)
+                if row is not None:
+                    table[v] = row.copy()
+                fresh.add(v)
+
+    def _writable_vertices(self) -> SortedSet:
+        # Same for the vertex set, copied as a whole once per snapshot
+        if self._pins and not self._vertices_fresh:
+            self._vertices = self._vertices.copy()
+            self._vertices_fresh = True
+        return self._vertices
 
     def addVertex(self, v: str) -> None:
         # Add a vertex if it does not already exist
-        if v not in self._adj:
-            self._adj[v] = set()
+        with self._lock:
+            if v not in self._adj:
+                if self._pins:
+                    self._writable(0, v)
+                    self._writable(1, v)
+                self._adj[v] = SortedSet()
+                self._radj[v] = SortedSet()
+                self._writable_vertices().add(v)
+                self._notify("addVertex", v)
 
     def addEdge(self, src: str, dst: str) -> None:
         # Ensure both vertices exist before adding the directed edge
-        if src not in self._adj:
-            self._adj[src] = set()
-        if dst not in self._adj:
-            self._adj[dst] = set()
+        with self._lock:
+            self.addVertex(src)
+            self.addVertex(dst)
+
+            # Add directed edge src → dst (and dst ← src in the reverse index)
+            if self._pins:
+                if dst in self._adj[src]:
+                    return
+                self._writable(0, src)
+                self._writable(1, dst)
+            if self._adj[src].add(dst):
+                self._radj[dst].add(src)
+                self._edge_count += 1
+                self._notify("addEdge", src, dst)
+
+    def addEdges(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        # Bulk addEdge: fills _adj and _radj in the same pass and returns
+        # how many edges were new
+        with self._lock:
+            adj, radj = self._adj, self._radj
+            added = 0
+            for src, dst in pairs:
+                if src not in adj:
+                    self.addVertex(src)
+                if dst not in adj:
+                    self.addVertex(dst)
+                if self._pins:
+                    if dst in adj[src]:
+                        continue
+                    self._writable(0, src)
+                    self._writable(1, dst)
+                if adj[src].add(dst):
+                    radj[dst].add(src)
+                    added += 1
+                    self._edge_count += 1
+                    if self._listeners:
+                        self._notify("addEdge", src, dst)
+                    else:
+                        self.version += 1
+            return added
+
+    def removeVertex(self, v: str) -> bool:
+        # Remove a vertex together with every edge into or out of it
+        with self._lock:
+            if v not in self._adj:
+                return False
+            # edge by edge, so listeners see each removal while v still exists
+            for dst in list(self._adj[v]):
+                self.removeEdge(v, dst)
+            for src in list(self._radj[v]):
+                self.removeEdge(src, v)
+            if self._pins:
+                self._writable(0, v)
+                self._writable(1, v)
+            del self._adj[v]
+            del self._radj[v]
+            self._writable_vertices().discard(v)
+            self._notify("removeVertex", v)
+            return True
 
-        # Add directed edge src → dst
-        self._adj[src].add(dst)
+    # Neighbor lists are stored sorted, so a page costs O(log k + limit).
+    # Pass the last name of the previous page as `after` to get the next one.
 
     #following function
-    def listOutgoingAdjacentVertex(self, v: str) -> Iterable[str]:
-        # Return all vertices that v points to (outgoing neighbors)
+    def listOutgoingAdjacentVertex(self, v: str, after: Optional[str] = None,
+                                   limit: Optional[int] = None) -> List[str]:
+        # Return the vertices that v points to (outgoing neighbors), in order
         if v not in self._adj:
             return []
-        outs = list(self._adj[v])
+        return self._adj[v].page(after, limit)
 
-        # Try to return sorted result; fallback for non-sortable items
-        try:
-            return sorted(outs)
-        except:
-            return outs
+    def iterOutgoing(self, v: str, after: Optional[str] = None) -> Iterator[str]:
+        # Lazy version of listOutgoingAdjacentVertex
+        if v not in self._adj:
+            return iter(())
+        return self._adj[v].iter_after(after)
 
-    def vertices(self) -> Iterable[str]:
-        # Return list of all vertices in the graph
-        try:
-            return sorted(self._adj.keys())
-        except:
-            return list(self._adj.keys())
+    def vertices(self, after: Optional[str] = None,
+                 limit: Optional[int] = None) -> List[str]:
+        # Return the vertices of the graph, in order
+        return self._vertices.page(after, limit)
+
+    def iterVertices(self, after: Optional[str] = None) -> Iterator[str]:
+        return self._vertices.iter_after(after)
 
     def hasVertex(self, v: str) -> bool:
         # Check if vertex exists in the graph
@@ -51,27 +201,134 @@ class DirectedGraph:
 
     def removeEdge(self, src: str, dst: str) -> bool:
         # Remove a directed edge src → dst if it exists
-        if src in self._adj and dst in self._adj[src]:
-            self._adj[src].remove(dst)
-            return True
-        return False
-
-
-    def followersOf(self, target: str) -> Iterable[str]:
-        # Return all vertices that have an edge pointing to 'target'
-        result = []
-
-        # Loop through every vertex and its outgoing edges
-        for vertex, outgoing_edges in self._adj.items():
-            # Check if this vertex points to the target
-            if target in outgoing_edges:
-                result.append(vertex)
-
-        # Return sorted follower list
-        try:
-            return sorted(result)
-        except:
-            return result
+        with self._lock:
+            if src not in self._adj:
+                return False
+            if self._pins:
+                if dst not in self._adj[src]:
+                    return False
+                self._writable(0, src)
+                self._writable(1, dst)
+            if self._adj[src].discard(dst):
+                self._radj[dst].discard(src)
+                self._edge_count -= 1
+                self._notify("removeEdge", src, dst)
+                return True
+            return False
+
+    def followersOf(self, target: str, after: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[str]:
+        # Return the vertices that have an edge pointing to 'target', in order
+        # (read straight from the reverse index: O(in-degree), not O(V+E))
+        if target not in self._radj:
+            return []
+        return self._radj[target].page(after, limit)
+
+    def iterFollowers(self, target: str, after: Optional[str] = None) -> Iterator[str]:
+        # Lazy version of followersOf
+        if target not in self._radj:
+            return iter(())
+        return self._radj[target].iter_after(after)
+
+    # Degree counters, O(1) each
+    def outDegree(self, v: str) -> int:
+        # Number of accounts v follows
+        return len(self._adj.get(v, ()))
+
+    def inDegree(self, v: str) -> int:
+        # Number of followers of v
+        return len(self._radj.get(v, ()))
+
+    def vertexCount(self) -> int:
+        return len(self._adj)
+
+    def edgeCount(self) -> int:
+        return self._edge_count
+
+    # Degrees of separation
+    def shortestPath(self, src: str, dst: str, maxDepth: Optional[int] = None,
+                     directory: Optional[PeopleDirectory] = None) -> Optional[List[str]]:
+        # Shortest follow chain src -> ... -> dst, or None if there is none
+        # within maxDepth hops. With a directory, PRIVATE users are never
+        # used as a hop in between (their follow lists are hidden)
+        blocked = None
+        if directory is not None:
+            def blocked(v: str) -> bool:
+                p = directory.get(v)
+                return p is not None and p.privacy == Privacy.PRIVATE
+        return self._bidirectionalSearch(src, dst, maxDepth, blocked)[0]
+
+    def degreesOfSeparation(self, src: str, dst: str, maxDepth: Optional[int] = None,
+                            directory: Optional[PeopleDirectory] = None) -> Optional[int]:
+        # Number of hops from src to dst (0 for the same user), or None
+        path = self.shortestPath(src, dst, maxDepth, directory)
+        return None if path is None else len(path) - 1
+
+    def _bidirectionalSearch(self, src: str, dst: str, max_depth: Optional[int],
+                             blocked: Optional[Callable[[str], bool]]
+                             ) -> Tuple[Optional[List[str]], int]:
+        # Returns (path, number of vertices visited).
+        # BFS forward from src over outgoing edges and backward from dst
+        # over incoming edges, one whole level at a time, always growing
+        # the side whose next level is cheaper. The search stops at the
+        # first level where the two sides meet, so it touches about
+        # 2 * b^(d/2) vertices instead of b^d.
+        if src not in self._adj or dst not in self._adj:
+            return None, 0
+        if src == dst:
+            return [src], 1
+        # vertex -> the vertex it was reached from (doubles as visited set)
+        parents_f: Dict[str, Optional[str]] = {src: None}
+        parents_b: Dict[str, Optional[str]] = {dst: None}
+        frontier_f, frontier_b = [src], [dst]
+        depth = 0
+        while frontier_f and frontier_b:
+            if max_depth is not None and depth >= max_depth:
+                break
+            # estimated cost of each side = edges it would scan
+            cost_f = sum(len(self._adj[v]) for v in frontier_f)
+            cost_b = sum(len(self._radj[v]) for v in frontier_b)
+            if cost_f <= cost_b:
+                frontier_f, meet = self._expand(frontier_f, self._adj, parents_f,
+                                                parents_b, blocked)
+            else:
+                frontier_b, meet = self._expand(frontier_b, self._radj, parents_b,
+                                                parents_f, blocked)
+            depth += 1
+            if meet is not None:
+                path = []
+                v = meet
+                while v is not None:
+                    path.append(v)
+                    v = parents_f[v]
+                path.reverse()
+                v = parents_b[meet]
+                while v is not None:
+                    path.append(v)
+                    v = parents_b[v]
+                return path, len(parents_f) + len(parents_b)
+        return None, len(parents_f) + len(parents_b)
+
+    @staticmethod
+    def _expand(frontier: List[str], adj: Dict[str, SortedSet],
+                parents: Dict[str, Optional[str]], other: Dict[str, Optional[str]],
+                blocked: Optional[Callable[[str], bool]]) -> Tuple[List[str], Optional[str]]:
+        # Grow one BFS level. Returns the new frontier and a vertex where it
+        # touched the other side (if any). Every meet found on this level
+        # gives a path of the same length, so the first one is fine
+        next_frontier = []
+        for v in frontier:
+            for w in adj[v]:
+                if w in parents:
+                    continue
+                if w in other:
+                    parents[w] = v
+                    return next_frontier, w
+                if blocked is not None and blocked(w):
+                    continue
+                parents[w] = v
+                next_frontier.append(w)
+        return next_frontier, None
 
 
 # Person Entity
@@ -92,20 +349,53 @@ class Person:
 class PeopleDirectory:
     def __init__(self) -> None:
         self._by_name: Dict[str, Person] = {}
+        # Search indexes, kept up to date by add() and set_privacy()
+        self._names = NameIndex()
+        self._bios = TextIndex()
 
     def add(self, p: Person) -> None:
+        # Adding an existing name replaces that person (and their bio)
         self._by_name[p.name] = p
+        self._names.add(p.name)
+        self._index_bio(p)
+
+    def _index_bio(self, p: Person) -> None:
+        # Private biographies never go into the index
+        if p.privacy == Privacy.PUBLIC:
+            self._bios.add(p.name, p.biography)
+        else:
+            self._bios.discard(p.name)
+
+    def set_privacy(self, name: str, privacy: Privacy) -> None:
+        p = self._by_name[name]
+        p.privacy = privacy
+        self._index_bio(p)
 
     def get(self, name: str) -> Optional[Person]:
         return self._by_name.get(name)
 
     #function that return a list of name
-    def all_names(self) -> Iterable[str]:
-        return sorted(self._by_name.keys())
+    def all_names(self) -> List[str]:
+        # Kept in order by the name index (case-insensitive), so no sort;
+        # a copy, so callers can't change the index's list
+        return list(self._names.names())
 
     def exists(self, name: str) -> bool:
         return name in self._by_name
 
+    def search_names(self, prefix: str, after: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[str]:
+        """Names starting with prefix (ignoring case), in order, after the cursor."""
+        return self._names.search(prefix, after, limit)
+
+    def search_bios(self, query: str, limit: int = 10,
+                    offset: int = 0) -> List[Tuple[str, float]]:
+        """(name, score) of public profiles whose bio has every word of query."""
+        hits = self._bios.search(query, limit, offset)
+        # Belt and braces for a Person whose privacy was changed in place
+        return [(name, score) for name, score in hits
+                if self._by_name[name].privacy == Privacy.PUBLIC]
+
 
 # Seed data
 def seed_data(dir: PeopleDirectory, g: DirectedGraph) -> None:
@@ -168,13 +458,26 @@ def print_profile(p: Person, ignore_privacy: bool = True) -> None:
         print("Privacy  : PRIVATE")
         print("Details  : (hidden)\n")
 
+# Long lists are shown one page at a time
+PAGE_SIZE = 50
+
+def format_page(names: List[str], total: int) -> str:
+    if not names:
+        return "(none)"
+    text = ", ".join(names)
+    if total > len(names):
+        text += f", ... and {total - len(names)} more"
+    return text
+
 def show_following(g: DirectedGraph, who: str) -> None:
-    outs = list(g.listOutgoingAdjacentVertex(who))
-    print(f"\n{who} follows ({len(outs)}): {', '.join(outs) if outs else '(none)'}\n")
+    outs = g.listOutgoingAdjacentVertex(who, limit=PAGE_SIZE)
+    total = g.outDegree(who)
+    print(f"\n{who} follows ({total}): {format_page(outs, total)}\n")
 
 def show_followers(g: DirectedGraph, who: str) -> None:
-    ins = list(g.followersOf(who))
-    print(f"\nFollowers of {who} ({len(ins)}): {', '.join(ins) if ins else '(none)'}\n")
+    ins = g.followersOf(who, limit=PAGE_SIZE)
+    total = g.inDegree(who)
+    print(f"\nFollowers of {who} ({total}): {format_page(ins, total)}\n")
 
 def add_user_flow(dir: PeopleDirectory, g: DirectedGraph) -> None:
     print("\nAdd new user profile:")
@@ -219,6 +522,43 @@ def unfollow_flow(dir: PeopleDirectory, g: DirectedGraph) -> None:
         else:
             print("Relationship not found.\n")
 
+def separation_flow(dir: PeopleDirectory, g: DirectedGraph) -> None:
+    print("\nDegrees of separation")
+    x = choose_name("  From: ", dir)
+    y = choose_name("  To: ", dir)
+    if x and y:
+        # private users' follow lists are hidden, so they can't be a hop
+        path = g.shortestPath(x, y, maxDepth=6, directory=dir)
+        if path is None:
+            print(f"No connection from {x} to {y} within 6 steps.\n")
+        else:
+            print(f"{len(path) - 1} degree(s): {' -> '.join(path)}\n")
+
+def recommend_flow(dir: PeopleDirectory, recommender) -> None:
+    n = choose_name("Name: ", dir)
+    if n:
+        picks = recommender.recommend(n, limit=5)
+        if not picks:
+            print(f"\nNo suggestions for {n} yet.\n")
+            return
+        print(f"\nWho {n} might follow:")
+        for name, mutual in picks:
+            print(f"  {name} (followed by {mutual} of the people {n} follows)")
+        print()
+
+def search_flow(dir: PeopleDirectory) -> None:
+    text = input_nonempty("Search: ")
+    names = dir.search_names(text, limit=PAGE_SIZE)
+    print(f"\nNames starting with '{text}': {format_page(names, len(names))}")
+    hits = dir.search_bios(text, limit=10)
+    if hits:
+        print("Bios mentioning it:")
+        for name, _ in hits:
+            print(f"  {name}: {dir.get(name).biography}")
+    else:
+        print("Bios mentioning it: (none)")
+    print()
+
 def list_all_users(dir: PeopleDirectory) -> None:
     names = dir.all_names()
     print("\nAll users:")
@@ -227,10 +567,19 @@ def list_all_users(dir: PeopleDirectory) -> None:
 
 
 # Main Menu
-def main() -> None:
-    directory = PeopleDirectory()
-    graph = DirectedGraph()
-    seed_data(directory, graph)
+def main(data_file: Optional[str] = None) -> None:
+    # with a snapshot file, start from it (if it exists) and save on exit
+    if data_file and os.path.exists(data_file):
+        from graph_io import load_snapshot
+        graph, directory = load_snapshot(data_file)
+        print(f"Loaded {graph.vertexCount()} users from {data_file}\n")
+    else:
+        directory = PeopleDirectory()
+        graph = DirectedGraph()
+        seed_data(directory, graph)
+    # imported here: recommend.py itself imports this module
+    from recommend import Recommender
+    recommender = Recommender(graph, directory)
 
     while True:
         print(
@@ -243,7 +592,10 @@ def main() -> None:
             "6) Follow user\n"
             "7) Unfollow user\n"
             "8) View profile (respect privacy)\n"
-            "9) Exit\n"
+            "9) Degrees of separation\n"
+            "10) Who to follow\n"
+            "11) Search users\n"
+            "12) Exit\n"
         )
         choice = input("Choose: ").strip()
 
@@ -280,6 +632,19 @@ def main() -> None:
                 print_profile(directory.get(n), ignore_privacy=False)
 
         elif choice == "9":
+            separation_flow(directory, graph)
+
+        elif choice == "10":
+            recommend_flow(directory, recommender)
+
+        elif choice == "11":
+            search_flow(directory)
+
+        elif choice == "12":
+            if data_file:
+                from graph_io import save_snapshot
+                save_snapshot(data_file, graph, directory)
+                print(f"Saved to {data_file}")
             print("Successfully Exit!")
             break
 
@@ -288,4 +653,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,473 @@
+"""Streaming graph loaders and memory-mapped binary snapshots.
+
+Text input
+----------
+Edge lists are CSV or TSV (chosen by extension, or pass delimiter=),
+one `follower,followed` pair per row. People files have
+`name,gender,biography,privacy` rows. A header row is skipped if there
+is one, and so are blank rows and `#` comments. Rows go through the csv
+module one buffered line at a time and are handed on in chunks of
+chunk_size, so memory is bounded by the chunk and the graph, never the
+file:
+
+    graph, people = load_text("edges.tsv", "people.csv")
+    compact = CSRGraph.fromEdges(iter_edges("edges.tsv"))
+
+Snapshot layout (little-endian)
+-------------------------------
+A 104-byte header: magic, format version, number of names N (everyone
+in the graph or the directory), graph vertex count, edge count E, and
+the offsets of 8 sections. Each section starts on an 8-byte boundary:
+
+    name_offsets  q[N+1]  name i = name_blob[name_offsets[i]:name_offsets[i+1]]
+    name_blob     UTF-8, names sorted, so vertex IDs are in name order
+    out_offsets   q[N+1]  CSR: IDs vertex i follows ...
+    out_targets   i[E]    ... sorted, i.e. in name order too
+    in_offsets    q[N+1]  CSC: followers of vertex i ...
+    in_sources    i[E]    ... sorted
+    people        B[N] flags (1: has a Person, 2: private, 4: in graph),
+                  then B[N] genders (one ASCII letter, or space)
+    bio_offsets   q[N+1], then the UTF-8 biographies right after
+
+open_snapshot() mmaps the file and answers graph and profile queries
+straight from those arrays (nothing is parsed up front, so opening is
+O(1) and pages come in from the OS cache as they are touched).
+load_snapshot() rebuilds a mutable DirectedGraph + PeopleDirectory, and
+GraphSnapshot.to_csr_graph() copies the arrays into a CSRGraph as they
+are. Snapshots are written to a temp file and moved into place with
+os.replace, so a crash never leaves a half-written one behind.
+"""
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from csr_graph import CSRGraph
+from graph import DirectedGraph, PeopleDirectory, Person, Privacy
+
+MAGIC = b"SOCGRPH1"
+VERSION = 1
+SECTIONS = ("name_offsets", "name_blob", "out_offsets", "out_targets",
+            "in_offsets", "in_sources", "people", "bio_offsets")
+# magic, version, (pad), names, vertices, edges, section offsets
+HEADER = struct.Struct(f"<8sI4xQQQ{len(SECTIONS)}Q")
+
+HAS_PERSON = 1
+PRIVATE = 2
+IN_GRAPH = 4
+
+CHUNK_SIZE = 65536
+
+
+# ---- text input ----
+def _delimiter_for(path: str) -> str:
+    return "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+
+
+def _rows(path: str, delimiter: Optional[str], header: str) -> Iterator[List[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter or _delimiter_for(path))
+        first = True
+        for row in reader:
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            if first:
+                first = False
+                if row[0].strip().lower() == header:
+                    continue
+            yield row
+
+
+def iter_edges(path: str, delimiter: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """(follower, followed) pairs from an edge-list file, read lazily."""
+    for row in _rows(path, delimiter, "follower"):
+        if len(row) < 2:
+            raise ValueError(f"{path}: expected follower and followed columns, got {row!r}")
+        yield row[0].strip(), row[1].strip()
+
+
+def iter_edge_chunks(path: str, delimiter: Optional[str] = None,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[List[Tuple[str, str]]]:
+    edges = iter_edges(path, delimiter)
+    while True:
+        chunk = list(islice(edges, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_people(path: str, delimiter: Optional[str] = None) -> Iterator[Person]:
+    for row in _rows(path, delimiter, "name"):
+        name, gender, bio, privacy = (row + ["", "", "", ""])[:4]
+        private = privacy.strip().upper() == "PRIVATE"
+        # the menu only knows M/F; keep the first letter of longer spellings
+        yield Person(name.strip(), gender.strip()[:1].upper(), bio.strip(),
+                     Privacy.PRIVATE if private else Privacy.PUBLIC)
+
+
+def load_text(edges_path: Optional[str], people_path: Optional[str] = None,
+              graph: Optional[DirectedGraph] = None,
+              directory: Optional[PeopleDirectory] = None,
+              delimiter: Optional[str] = None,
+              chunk_size: int = CHUNK_SIZE) -> Tuple[DirectedGraph, PeopleDirectory]:
+    """Stream people and edges into a DirectedGraph and PeopleDirectory.
+
+    Following and follower sets are filled in the same pass
+    (DirectedGraph.addEdges), one chunk of rows at a time.
+    """
+    graph = graph if graph is not None else DirectedGraph()
+    directory = directory if directory is not None else PeopleDirectory()
+    if people_path:
+        for person in iter_people(people_path, delimiter):
+            directory.add(person)
+            graph.addVertex(person.name)
+    if edges_path:
+        for chunk in iter_edge_chunks(edges_path, delimiter, chunk_size):
+            graph.addEdges(chunk)
+    return graph, directory
+
+
+def write_edges(path: str, edges: Iterable[Tuple[str, str]],
+                delimiter: Optional[str] = None) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delimiter or _delimiter_for(path))
+        writer.writerow(["follower", "followed"])
+        for src, dst in edges:
+            writer.writerow([src, dst])
+            count += 1
+    return count
+
+
+def write_people(path: str, people: Iterable[Person],
+                 delimiter: Optional[str] = None) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delimiter or _delimiter_for(path))
+        writer.writerow(["name", "gender", "biography", "privacy"])
+        for p in people:
+            writer.writerow([p.name, p.gender, p.biography, p.privacy.name])
+            count += 1
+    return count
+
+
+# ---- snapshots ----
+def _le(a: array) -> bytes:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _pad(f) -> int:
+    f.write(b"\0" * (-f.tell() % 8))
+    return f.tell()
+
+
+def _csr(graph, names: List[str], index: dict, neighbors) -> Tuple[array, array]:
+    offsets = array("q", [0])
+    values = array("i")
+    for name in names:
+        if graph.hasVertex(name):
+            # rows come back sorted by name, which is ID order here
+            values.extend([index[w] for w in neighbors(name)])
+        offsets.append(len(values))
+    return offsets, values
+
+
+def save_snapshot(path: str, graph, directory: Optional[PeopleDirectory] = None) -> int:
+    """Write a DirectedGraph or CSRGraph (plus people) to path.
+
+    Returns the file size in bytes.
+    """
+    people = directory._by_name if directory is not None else {}
+    names = sorted(set(graph.vertices()) | set(people))
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    out_offsets, out_targets = _csr(graph, names, index, graph.listOutgoingAdjacentVertex)
+    in_offsets, in_sources = _csr(graph, names, index, graph.followersOf)
+
+    flags = bytearray(n)
+    genders = bytearray(b" " * n)
+    bio_offsets = array("q", [0])
+    bios = []
+    size = 0
+    for i, name in enumerate(names):
+        flag = IN_GRAPH if graph.hasVertex(name) else 0
+        person = people.get(name)
+        if person is not None:
+            flag |= HAS_PERSON
+            if person.privacy == Privacy.PRIVATE:
+                flag |= PRIVATE
+            if person.gender[:1].isascii() and person.gender[:1].isalpha():
+                genders[i] = ord(person.gender[:1])
+            bio = person.biography.encode("utf-8")
+            bios.append(bio)
+            size += len(bio)
+        flags[i] = flag
+        bio_offsets.append(size)
+
+    encoded = [name.encode("utf-8") for name in names]
+    name_offsets = array("q", [0])
+    size = 0
+    for b in encoded:
+        size += len(b)
+        name_offsets.append(size)
+
+    pos = {}
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(bytes(HEADER.size))
+        for key, data in (("name_offsets", _le(name_offsets)),
+                          ("name_blob", b"".join(encoded)),
+                          ("out_offsets", _le(out_offsets)),
+                          ("out_targets", _le(out_targets)),
+                          ("in_offsets", _le(in_offsets)),
+                          ("in_sources", _le(in_sources)),
+                          ("people", bytes(flags) + bytes(genders)),
+                          ("bio_offsets", _le(bio_offsets) + b"".join(bios))):
+            pos[key] = _pad(f)
+            f.write(data)
+        size = f.tell()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, n, graph.vertexCount(), len(out_targets),
+                            *(pos[s] for s in SECTIONS)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return size
+
+
+class GraphSnapshot:
+    """Read-only graph + profiles served from a memory-mapped snapshot.
+
+    Vertex IDs are ranks in name order, so a name lookup is a binary
+    search over the name table and every neighbor row is already sorted:
+    a page after a cursor is two binary searches plus the page itself.
+    """
+
+    def __init__(self, path: str) -> None:
+        if sys.byteorder != "little":
+            raise OSError("snapshots can only be mapped on little-endian hosts")
+        self.path = path
+        self._views = []
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, vertices, e, *offsets = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} graph snapshot")
+        self.n, self._vertex_count, self._edge_count = n, vertices, e
+        pos = dict(zip(SECTIONS, offsets))
+        view = memoryview(self._mm)
+        self._views.append(view)
+
+        def section(key: str, code: str, count: int, skip: int = 0):
+            start = pos[key] + skip
+            v = view[start:start + struct.calcsize(code) * count].cast(code)
+            self._views.append(v)
+            return v
+
+        self._name_offsets = section("name_offsets", "q", n + 1)
+        self._name_base = pos["name_blob"]
+        self._out_offsets = section("out_offsets", "q", n + 1)
+        self._out_targets = section("out_targets", "i", e)
+        self._in_offsets = section("in_offsets", "q", n + 1)
+        self._in_sources = section("in_sources", "i", e)
+        self._flags = section("people", "B", n)
+        self._genders = section("people", "B", n, skip=n)
+        self._bio_offsets = section("bio_offsets", "q", n + 1)
+        self._bio_base = pos["bio_offsets"] + 8 * (n + 1)
+
+    def close(self) -> None:
+        # every view into the map has to be released before the map closes
+        for v in reversed(self._views):
+            v.release()
+        self._views = []
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "GraphSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- names and IDs ----
+    def name(self, i: int) -> str:
+        o, base = self._name_offsets, self._name_base
+        return self._mm[base + o[i]:base + o[i + 1]].decode("utf-8")
+
+    def _rank(self, name: str) -> int:
+        # number of stored names < name
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.name(mid) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _after(self, name: Optional[str]) -> int:
+        # first ID whose name sorts strictly after `name`
+        if name is None:
+            return 0
+        i = self._rank(name)
+        return i + 1 if i < self.n and self.name(i) == name else i
+
+    def _id(self, name: str) -> Optional[int]:
+        i = self._rank(name)
+        return i if i < self.n and self.name(i) == name else None
+
+    def _vertex_id(self, name: str) -> Optional[int]:
+        i = self._id(name)
+        return i if i is not None and self._flags[i] & IN_GRAPH else None
+
+    def _page(self, offsets, values, v: str, after: Optional[str],
+              limit: Optional[int]) -> List[str]:
+        i = self._vertex_id(v)
+        if i is None:
+            return []
+        lo, hi = offsets[i], offsets[i + 1]
+        if after is not None:
+            lo = bisect_left(values, self._after(after), lo, hi)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self.name(j) for j in values[lo:hi]]
+
+    # ---- DirectedGraph queries ----
+    def hasVertex(self, v: str) -> bool:
+        return self._vertex_id(v) is not None
+
+    def listOutgoingAdjacentVertex(self, v: str, after: Optional[str] = None,
+                                   limit: Optional[int] = None) -> List[str]:
+        return self._page(self._out_offsets, self._out_targets, v, after, limit)
+
+    def followersOf(self, target: str, after: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[str]:
+        return self._page(self._in_offsets, self._in_sources, target, after, limit)
+
+    def outDegree(self, v: str) -> int:
+        i = self._vertex_id(v)
+        return 0 if i is None else self._out_offsets[i + 1] - self._out_offsets[i]
+
+    def inDegree(self, v: str) -> int:
+        i = self._vertex_id(v)
+        return 0 if i is None else self._in_offsets[i + 1] - self._in_offsets[i]
+
+    def vertices(self, after: Optional[str] = None,
+                 limit: Optional[int] = None) -> List[str]:
+        result = []
+        flags = self._flags
+        for i in range(self._after(after), self.n):
+            if limit is not None and len(result) >= limit:
+                break
+            if flags[i] & IN_GRAPH:
+                result.append(self.name(i))
+        return result
+
+    def vertexCount(self) -> int:
+        return self._vertex_count
+
+    def edgeCount(self) -> int:
+        return self._edge_count
+
+    # ---- PeopleDirectory queries ----
+    def _person(self, i: int) -> Optional[Person]:
+        flag = self._flags[i]
+        if not flag & HAS_PERSON:
+            return None
+        o, base = self._bio_offsets, self._bio_base
+        bio = self._mm[base + o[i]:base + o[i + 1]].decode("utf-8")
+        return Person(self.name(i), chr(self._genders[i]).strip(), bio,
+                      Privacy.PRIVATE if flag & PRIVATE else Privacy.PUBLIC)
+
+    def get(self, name: str) -> Optional[Person]:
+        i = self._id(name)
+        return None if i is None else self._person(i)
+
+    def exists(self, name: str) -> bool:
+        i = self._id(name)
+        return i is not None and bool(self._flags[i] & HAS_PERSON)
+
+    # ---- conversion ----
+    def to_directed_graph(self) -> Tuple[DirectedGraph, PeopleDirectory]:
+        graph = DirectedGraph()
+        directory = PeopleDirectory()
+        names = [self.name(i) for i in range(self.n)]
+        flags = self._flags
+        for i, name in enumerate(names):
+            person = self._person(i)
+            if person is not None:
+                directory.add(person)
+            if flags[i] & IN_GRAPH:
+                graph.addVertex(name)
+        offsets, targets = self._out_offsets, self._out_targets
+
+        def edges():
+            for i, name in enumerate(names):
+                for j in targets[offsets[i]:offsets[i + 1]]:
+                    yield name, names[j]
+        # sources arrive in name order, so every follower insert is an append
+        graph.addEdges(edges())
+        return graph, directory
+
+    def to_csr_graph(self, **kwargs) -> CSRGraph:
+        if self._vertex_count != self.n:
+            # profiles without a vertex would take up IDs; rebuild instead
+            offsets, targets, name = self._out_offsets, self._out_targets, self.name
+            edges = ((name(i), name(j)) for i in range(self.n)
+                     for j in targets[offsets[i]:offsets[i + 1]])
+            return CSRGraph.fromEdges(edges, vertices=self.vertices(), **kwargs)
+        g = CSRGraph(**kwargs)
+        for i in range(self.n):
+            g._intern(self.name(i))
+        g._out_offsets = array("q", self._out_offsets)
+        g._out_targets = array("i", self._out_targets)
+        g._in_offsets = array("q", self._in_offsets)
+        g._in_sources = array("i", self._in_sources)
+        g._edge_count = self._edge_count
+        return g
+
+
+def open_snapshot(path: str) -> GraphSnapshot:
+    return GraphSnapshot(path)
+
+
+def load_snapshot(path: str) -> Tuple[DirectedGraph, PeopleDirectory]:
+    with GraphSnapshot(path) as snap:
+        return snap.to_directed_graph()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load edge lists and write graph snapshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="CSV/TSV edge list (+ people) -> snapshot")
+    b.add_argument("edges")
+    b.add_argument("--people")
+    b.add_argument("--delimiter")
+    b.add_argument("-o", "--output", required=True)
+    i = sub.add_parser("info", help="summarize a snapshot")
+    i.add_argument("snapshot")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        graph, directory = load_text(args.edges, args.people, delimiter=args.delimiter)
+        size = save_snapshot(args.output, graph, directory)
+        print(f"{graph.vertexCount()} vertices, {graph.edgeCount()} edges, "
+              f"{len(directory._by_name)} people -> {args.output} ({size / 1e6:.1f} MB)")
+    else:
+        with open_snapshot(args.snapshot) as snap:
+            print(f"{snap.path}: {snap.vertexCount()} vertices, {snap.edgeCount()} edges, "
+                  f"{snap.n} names, {os.path.getsize(snap.path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
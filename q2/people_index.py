@@ -0,0 +1,127 @@
+"""Search indexes behind PeopleDirectory.
+
+NameIndex: every name in a SortedSet keyed by (casefolded name, name),
+so type-ahead is a binary search to the first key >= the prefix and
+then a walk forward while keys still match: O(log n + page), no scan.
+The same order doubles as the directory's sorted name list.
+
+TextIndex: an inverted index, token -> {name: occurrences}. A query
+only looks at the posting list of its rarest token and checks the
+other tokens against their postings, so the cost depends on how many
+people match, not on how many there are. Matches are ranked by
+tf-idf (rarer words count for more), ties broken by name.
+
+PeopleDirectory decides what goes in: all names, but only PUBLIC
+biographies.
+"""
+import math
+import re
+from heapq import nsmallest
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sorted_set import SortedSet
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+class NameIndex:
+
+    def __init__(self) -> None:
+        self._keys = SortedSet()
+        # all names in order, rebuilt (without sorting) after a change
+        self._names: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def names(self) -> List[str]:
+        if self._names is None:
+            self._names = [name for _, name in self._keys]
+        return self._names
+
+    def add(self, name: str) -> None:
+        if self._keys.add((name.casefold(), name)):
+            self._names = None
+
+    def discard(self, name: str) -> None:
+        if self._keys.discard((name.casefold(), name)):
+            self._names = None
+
+    def search(self, prefix: str, after: Optional[str] = None,
+               limit: Optional[int] = None) -> List[str]:
+        """Names starting with prefix (any case), in order, after the cursor."""
+        prefix = prefix.casefold()
+        # (prefix,) sorts before every (prefix..., name) key
+        start = (prefix,) if after is None else max((prefix,), (after.casefold(), after))
+        result = []
+        for key, name in self._keys.iter_after(start):
+            if not key.startswith(prefix) or (limit is not None and len(result) >= limit):
+                break
+            result.append(name)
+        return result
+
+
+class TextIndex:
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # name -> its tokens, so a document can be taken out again
+        self._docs: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._docs
+
+    def add(self, name: str, text: str) -> None:
+        self.discard(name)
+        tokens = tokenize(text)
+        self._docs[name] = tokens
+        for token in tokens:
+            docs = self._postings.setdefault(token, {})
+            docs[name] = docs.get(name, 0) + 1
+
+    def discard(self, name: str) -> None:
+        tokens = self._docs.pop(name, None)
+        if tokens is None:
+            return
+        for token in set(tokens):
+            docs = self._postings[token]
+            del docs[name]
+            if not docs:
+                del self._postings[token]
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> List[Tuple[str, float]]:
+        """(name, score) for documents containing every query word, best first."""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        postings = []
+        for token in tokens:
+            docs = self._postings.get(token)
+            if not docs:
+                return []
+            postings.append(docs)
+        postings.sort(key=len)
+        n = len(self._docs)
+        idf = [math.log(1 + n / len(docs)) for docs in postings]
+        scores = []
+        for name, tf in postings[0].items():
+            score = tf * idf[0]
+            for docs, weight in zip(postings[1:], idf[1:]):
+                count = docs.get(name)
+                if count is None:
+                    break
+                score += count * weight
+            else:
+                scores.append((name, score))
+        ranked = nsmallest(offset + limit, scores, key=lambda item: (-item[1], item[0]))
+        return ranked[offset:]
@@ -0,0 +1,119 @@
+"""'Who to follow' recommendations with a bounded LRU cache.
+
+A user's suggestions are the accounts followed by the people they
+follow (friends of friends), ranked by how many of the people they
+follow also follow that account. Users they already follow, and
+themselves, are left out.
+
+Results are cached per user. The recommender listens to the graph, so
+a follow or unfollow a -> b drops only the entries it can change:
+
+- a's own suggestions (a's following list changed)
+- the suggestions of everyone who follows a (one of their "friends"
+  changed who they follow)
+
+Nobody else's friends-of-friends set involves that edge, so the rest of
+the cache stays warm.
+"""
+from collections import OrderedDict
+from heapq import nsmallest
+from typing import Dict, List, Optional, Tuple
+
+from graph import DirectedGraph, PeopleDirectory
+
+
+class Recommender:
+
+    def __init__(self, graph: DirectedGraph, directory: Optional[PeopleDirectory] = None,
+                 capacity: int = 1024, max_results: int = 50) -> None:
+        self.graph = graph
+        self.directory = directory
+        self.capacity = capacity
+        # how many suggestions are computed and cached per user
+        self.max_results = max_results
+        self._cache: "OrderedDict[str, List[Tuple[str, int]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        graph.addListener(self._on_change)
+
+    def close(self) -> None:
+        # stop listening (e.g. before throwing the recommender away)
+        self.graph.removeListener(self._on_change)
+
+    def recommend(self, user: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Up to `limit` (name, mutual count) pairs, best first."""
+        if limit > self.max_results:
+            # more than the cache holds: compute directly, don't cache
+            self.misses += 1
+            return self._compute(user, limit)
+        cached = self._cache.get(user)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(user)
+            return cached[:limit]
+        self.misses += 1
+        result = self._compute(user, self.max_results)
+        self._cache[user] = result
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return result[:limit]
+
+    def _compute(self, user: str, limit: int) -> List[Tuple[str, int]]:
+        g = self.graph
+        if not g.hasVertex(user):
+            return []
+        following = g._adj[user]
+        counts: Dict[str, int] = {}
+        for friend in following:
+            for candidate in g._adj[friend]:
+                counts[candidate] = counts.get(candidate, 0) + 1
+        counts.pop(user, None)
+        for friend in following:
+            counts.pop(friend, None)
+        if self.directory is not None:
+            exists = self.directory.exists
+            counts = {c: n for c, n in counts.items() if exists(c)}
+        # highest count first, ties by name
+        return nsmallest(limit, counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def _on_change(self, event: str, src: str, dst: Optional[str]) -> None:
+        if event == "addVertex":
+            return
+        cache = self._cache
+        if not cache:
+            return
+        self._drop(src)
+        if event == "removeVertex":
+            # its edges were reported (and handled) one by one already
+            return
+        # everyone following src counts src's follows as friends-of-friends;
+        # walk whichever is smaller, src's followers or the cache itself
+        if self.graph.inDegree(src) <= len(cache):
+            for user in self.graph.iterFollowers(src):
+                self._drop(user)
+        else:
+            for user in [u for u in cache if src in self.graph._adj.get(u, ())]:
+                self._drop(user)
+
+    def _drop(self, user: str) -> None:
+        if self._cache.pop(user, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_all(self) -> None:
+        self.invalidations += len(self._cache)
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "size": len(self._cache),
+            "capacity": self.capacity,
+        }
@@ -0,0 +1,130 @@
+"""Chunked sorted set for neighbor lists.
+
+Items live in a list of sorted chunks (at most 2 * CHUNK each) with the
+max of every chunk kept alongside, so add/discard/contains cost two
+binary searches plus a shift inside one small chunk. The items are
+always in order, so reading a page after a cursor costs O(log k + page)
+instead of sorting all k items first.
+"""
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+CHUNK = 512
+
+
+class SortedSet:
+    # two of these per vertex, so no per-instance __dict__
+    __slots__ = ("_chunks", "_maxes", "_len")
+
+    def __init__(self, items: Iterable = ()) -> None:
+        self._chunks: List[list] = []
+        self._maxes: list = []
+        self._len = 0
+        items = sorted(set(items))
+        if items:
+            self._chunks = [items[i:i + CHUNK] for i in range(0, len(items), CHUNK)]
+            self._maxes = [chunk[-1] for chunk in self._chunks]
+            self._len = len(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __contains__(self, item) -> bool:
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return False
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, item)
+        return chunk[j] == item
+
+    def __iter__(self) -> Iterator:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __repr__(self) -> str:
+        return f"SortedSet({list(self)!r})"
+
+    def copy(self) -> "SortedSet":
+        # chunks are already sorted and sized, so no re-sort
+        new = SortedSet.__new__(SortedSet)
+        new._chunks = [chunk[:] for chunk in self._chunks]
+        new._maxes = list(self._maxes)
+        new._len = self._len
+        return new
+
+    def add(self, item) -> bool:
+        """Insert item; returns False if it was already present."""
+        maxes = self._maxes
+        if not maxes:
+            self._chunks.append([item])
+            maxes.append(item)
+            self._len = 1
+            return True
+        i = bisect_left(maxes, item)
+        if i == len(maxes):
+            # larger than everything: goes at the end of the last chunk
+            i -= 1
+            self._chunks[i].append(item)
+            maxes[i] = item
+        else:
+            chunk = self._chunks[i]
+            j = bisect_left(chunk, item)
+            if chunk[j] == item:
+                return False
+            chunk.insert(j, item)
+        self._len += 1
+        chunk = self._chunks[i]
+        if len(chunk) > 2 * CHUNK:
+            self._chunks[i:i + 1] = [chunk[:CHUNK], chunk[CHUNK:]]
+            maxes[i:i + 1] = [chunk[CHUNK - 1], chunk[-1]]
+        return True
+
+    def discard(self, item) -> bool:
+        """Remove item if present; returns whether it was."""
+        maxes = self._maxes
+        i = bisect_left(maxes, item)
+        if i == len(maxes):
+            return False
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, item)
+        if chunk[j] != item:
+            return False
+        del chunk[j]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[i]
+            del maxes[i]
+        elif j == len(chunk):
+            maxes[i] = chunk[-1]
+        return True
+
+    def remove(self, item) -> None:
+        if not self.discard(item):
+            raise KeyError(item)
+
+    def iter_after(self, after=None) -> Iterator:
+        """Items strictly greater than `after` (all items if None), lazily."""
+        if after is None:
+            return iter(self)
+        i = bisect_right(self._maxes, after)
+        if i == len(self._maxes):
+            return iter(())
+        return self._iter_from(i, bisect_right(self._chunks[i], after))
+
+    def _iter_from(self, i: int, j: int) -> Iterator:
+        # (like a dict, don't modify the set while iterating it)
+        chunks = self._chunks
+        yield from chunks[i][j:]
+        for k in range(i + 1, len(chunks)):
+            yield from chunks[k]
+
+    def page(self, after=None, limit: Optional[int] = None) -> list:
+        """Up to `limit` items after the cursor, in order."""
+        items = self.iter_after(after)
+        if limit is None:
+            return list(items)
+        return list(islice(items, limit))
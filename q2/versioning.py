@@ -0,0 +1,170 @@
+"""Pinned snapshots and an append-only change feed for DirectedGraph.
+
+GraphView (from graph.snapshot()) is a read-only DirectedGraph frozen
+at one version. Iterating it is safe while the live graph keeps
+changing, so analytics see one consistent graph and never hit "set
+changed size during iteration":
+
+    with graph.snapshot() as view:
+        for v, outs in view._adj.items():   # or any DirectedGraph reads
+            ...
+
+Every change and snapshot() hold the graph's lock, so a snapshot can
+be taken on any thread and then read there while another thread keeps
+writing. The live graph itself is still only safe to read on the
+writing thread; other threads should read through a snapshot.
+
+Taking a snapshot copies nothing. The graph copies on write instead:
+the first change to a vertex's following (or follower) set after a
+snapshot hands the old set to the pinned views and goes on with a copy,
+and the vertex list is copied once if vertices are added or removed.
+So a snapshot costs O(rows changed while it is pinned), and nothing at
+all once it is released (or garbage collected).
+
+ChangeFeed keeps every change as (version, event, src, dst), in order.
+A cache or index that was built from a snapshot catches up by reading
+feed.since(view.version) instead of rescanning the graph:
+
+    feed = ChangeFeed(graph)
+    view = graph.snapshot()
+    index = build(view); seen = view.version; view.release()
+    ...
+    for change in feed.since(seen):
+        apply(index, change)
+        seen = change.version
+
+With a capacity the feed keeps only the newest entries; a reader that
+falls further behind than that gets a LookupError and has to rebuild
+from a fresh snapshot.
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from graph import DirectedGraph
+from sorted_set import SortedSet
+
+
+class _PinnedRows(Mapping):
+    # vertex -> row as of the snapshot: a row the graph has replaced
+    # since was kept by the view, anything else is still the live row
+
+    def __init__(self, live: Dict[str, SortedSet], kept: Dict[str, Optional[SortedSet]],
+                 view: "GraphView") -> None:
+        self._live = live
+        self._kept = kept
+        self._view = view
+
+    def get(self, v, default=None):
+        # live first, then kept: the graph keeps the old row before it
+        # swaps in a copy (under its lock), so this order is safe against
+        # a writer on another thread
+        row = self._live.get(v)
+        kept = self._kept
+        if v in kept:
+            row = kept[v]
+        return default if row is None else row
+
+    def __getitem__(self, v: str) -> SortedSet:
+        row = self.get(v)
+        if row is None:
+            raise KeyError(v)
+        return row
+
+    def __contains__(self, v) -> bool:
+        return self.get(v) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._view._vertices)
+
+    def __len__(self) -> int:
+        return len(self._view._vertices)
+
+
+class GraphView(DirectedGraph):
+    """Read-only DirectedGraph pinned at the version it was taken."""
+
+    def __init__(self, graph: DirectedGraph) -> None:
+        # no super().__init__(): the rows are the graph's, not new ones
+        self._graph = graph
+        self.version = graph.version
+        self._kept = ({}, {})
+        self._adj = _PinnedRows(graph._adj, self._kept[0], self)
+        self._radj = _PinnedRows(graph._radj, self._kept[1], self)
+        self._vertices = graph._vertices
+        self._edge_count = graph._edge_count
+        self._listeners = []
+        self._pins = {}
+        self._released = False
+
+    def _keep(self, side: int, v: str, row: Optional[SortedSet]) -> None:
+        kept = self._kept[side]
+        if v not in kept:
+            kept[v] = row
+
+    def release(self) -> None:
+        # unpin: the graph stops keeping rows for this view
+        if not self._released:
+            self._released = True
+            self._graph._unpin(id(self))
+
+    def __enter__(self) -> "GraphView":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("a graph snapshot is read-only")
+
+    addVertex = addEdge = addEdges = removeVertex = removeEdge = _read_only
+    snapshot = _read_only
+
+
+class Change(NamedTuple):
+    version: int
+    event: str          # addVertex, removeVertex, addEdge or removeEdge
+    src: str
+    dst: Optional[str]
+
+
+class ChangeFeed:
+
+    def __init__(self, graph: DirectedGraph, capacity: Optional[int] = None) -> None:
+        self.graph = graph
+        self.capacity = capacity
+        self._entries: List[Change] = []
+        self._start = 0             # entries before this were dropped
+        # the feed has every change after this version (and none before)
+        self._floor = graph.version
+        graph.addListener(self._on_change)
+
+    def close(self) -> None:
+        self.graph.removeListener(self._on_change)
+
+    def _on_change(self, event: str, src: str, dst: Optional[str]) -> None:
+        self._entries.append(Change(self.graph.version, event, src, dst))
+        if self.capacity is not None and len(self._entries) - self._start > self.capacity:
+            self._floor = self._entries[self._start].version
+            self._start += 1
+            if self._start > len(self._entries) // 2:
+                # drop the dead prefix now and then, not on every append
+                del self._entries[:self._start]
+                self._start = 0
+
+    def __len__(self) -> int:
+        return len(self._entries) - self._start
+
+    @property
+    def head(self) -> int:
+        """Version of the newest change in the feed."""
+        return self._floor + len(self)
+
+    def since(self, version: int, limit: Optional[int] = None) -> List[Change]:
+        """Changes after `version`, oldest first (at most `limit`)."""
+        if version < self._floor:
+            raise LookupError(f"changes after version {version} are no longer in the "
+                              f"feed (it starts at {self._floor + 1}); rebuild from a snapshot")
+        # versions in the feed are consecutive, so no search is needed
+        i = self._start + min(version - self._floor, len(self))
+        j = len(self._entries) if limit is None else min(len(self._entries), i + limit)
+        return self._entries[i:j]
@@ -0,0 +1,356 @@
+"""Headless benchmark harness for the factorial engine.
+
+    python benchmark.py --sizes 2000 5000 --backends serial thread process --workers 1 2 4
+    python benchmark.py --config bench.json --json results.json --csv results.csv
+    python benchmark.py --config bench.json --baseline results.json   (exit 1 on regression)
+    python benchmark.py --strategies loop swing --plot plots/
+
+Every case is one workload size x strategy x backend x worker count. A
+workload is `count` factorials of n drawn from [n/2, n] (seeded, so
+every run and every case gets the same numbers). Each case gets its own
+FactorialEngine, which is started and run `warmup` times before
+`repeat` timed rounds, so pool start-up, imports and first-call costs
+stay out of the numbers. The GC is paused while a round runs.
+
+Per case it reports, over the rounds:
+- wall time (perf_counter_ns): median, IQR and a distribution-free 95%
+  confidence interval for the median (from order statistics; with
+  8 rounds or fewer that is just [min, max]);
+- CPU time: the CPU the tasks used (thread_time_ns inside each task,
+  summed over workers), and the parent's own CPU (process_time_ns:
+  scheduling and pickling). cpu/wall near the worker count means the
+  workers really ran in parallel; near 1 means they took turns (the GIL);
+- speedup over the serial backend for the same workload (a ratio).
+
+A config file is JSON with the same keys as the options, e.g.
+
+    {"sizes": [2000, 5000], "count": 64, "strategies": ["loop"],
+     "backends": ["serial", "thread", "process"], "workers": [1, 2, 4],
+     "repeat": 7, "warmup": 1}
+
+Options given on the command line win over the file.
+
+--strategies takes loop, split, swing, math and cached. Each case
+starts "cached" with an empty cache per worker; the warm-up rounds fill
+it, so the timed rounds measure a warm cache.
+
+With --baseline (a JSON file written by an earlier --json), a case is
+flagged as a regression when its median is more than --threshold slower
+than the baseline's AND the two confidence intervals do not overlap, so
+ordinary noise does not trip it.
+
+--plot saves PNGs with the Agg backend (no display, never blocks), and
+is skipped with a note when matplotlib is not installed.
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from functools import partial
+from math import comb
+from typing import List, Optional, Sequence, Tuple
+
+from concurrent_factorial import compute_factorial
+from factorial_algorithms import STRATEGIES, default_cache
+from factorial_engine import FactorialEngine, available_backends, gil_enabled
+
+DEFAULTS = {
+    "sizes": [2000, 5000],
+    "count": 64,
+    "strategies": ["loop"],
+    "backends": None,       # every available backend
+    "workers": [1, 2, 4],
+    "repeat": 7,
+    "warmup": 1,
+    "seed": 42,
+    "threshold": 0.10,
+}
+
+# a case is identified by these columns (matching rows against a baseline)
+KEY = ("n", "count", "strategy", "backend", "workers")
+
+
+# 1. WORKER TASK (module level, so process pools can pickle it)
+def _timed_task(n: int, strategy: str) -> Tuple[int, int]:
+    """(bit length of n!, CPU ns this task used)."""
+    start = time.thread_time_ns()
+    bits = compute_factorial(n, strategy).bit_length()
+    return bits, time.thread_time_ns() - start
+
+
+# 2. STATISTICS
+def median_ci(samples: Sequence[float], confidence: float = 0.95) -> Tuple[float, float]:
+    """Confidence interval for the median from order statistics.
+
+    [x(j), x(n-j+1)] covers the true median with probability
+    1 - 2 * P(Binomial(n, 1/2) < j); j is the largest that still reaches
+    `confidence` (at least 1, so up to 8 samples this is [min, max]).
+    """
+    xs = sorted(samples)
+    n = len(xs)
+    alpha = (1 - confidence) / 2
+    j, tail = 0, 0.0
+    while j < n // 2:
+        tail += comb(n, j) / 2 ** n      # P(B <= j)
+        if tail > alpha:
+            break
+        j += 1
+    j = max(j, 1)
+    return xs[j - 1], xs[n - j]
+
+
+def summarize(samples: Sequence[float]) -> dict:
+    xs = sorted(samples)
+    if len(xs) > 1:
+        q1, _, q3 = statistics.quantiles(xs, n=4, method="inclusive")
+    else:
+        q1 = q3 = xs[0]
+    low, high = median_ci(xs)
+    return {"median": statistics.median(xs), "q1": q1, "q3": q3, "iqr": q3 - q1,
+            "ci_low": low, "ci_high": high, "min": xs[0], "max": xs[-1]}
+
+
+# 3. RUNNING CASES
+def workload(n: int, count: int, seed: int) -> List[int]:
+    rng = random.Random(seed * 1_000_003 + n)
+    return [rng.randint(max(n // 2, 0), n) for _ in range(count)]
+
+
+def run_case(numbers: List[int], strategy: str, backend: str, workers: int,
+             repeat: int, warmup: int) -> dict:
+    """Time one case; returns the raw samples (wall, task CPU, parent CPU) in ns."""
+    wall, cpu, parent_cpu = [], [], []
+    task = partial(_timed_task, strategy=strategy)
+    # every case starts cold: "cached" must not reuse an earlier case's
+    # entries (forked workers would copy the parent's cache too)
+    default_cache.clear()
+    with FactorialEngine(backend, workers, func=task) as engine:
+        for _ in range(warmup):
+            engine.map(numbers)
+        for _ in range(repeat):
+            gc.collect()
+            gc.disable()
+            try:
+                cpu_start = time.process_time_ns()
+                start = time.perf_counter_ns()
+                outputs = engine.map(numbers)
+                wall.append(time.perf_counter_ns() - start)
+                parent_cpu.append(time.process_time_ns() - cpu_start)
+            finally:
+                gc.enable()
+            cpu.append(sum(task_ns for _, task_ns in outputs))
+    return {"wall_ns": wall, "cpu_ns": cpu, "parent_cpu_ns": parent_cpu}
+
+
+def run(config: dict, log=print) -> List[dict]:
+    backends = config["backends"] or available_backends()
+    rows = []
+    for n in config["sizes"]:
+        numbers = workload(n, config["count"], config["seed"])
+        for strategy in config["strategies"]:
+            serial_median = None
+            # serial first: it is the baseline for the speedups
+            for backend in sorted(backends, key=lambda b: b != "serial"):
+                for workers in ([1] if backend == "serial" else config["workers"]):
+                    samples = run_case(numbers, strategy, backend, workers,
+                                       config["repeat"], config["warmup"])
+                    wall = summarize([t / 1e9 for t in samples["wall_ns"]])
+                    cpu = statistics.median(samples["cpu_ns"]) / 1e9
+                    if backend == "serial":
+                        serial_median = wall["median"]
+                    row = {"n": n, "count": config["count"], "strategy": strategy,
+                           "backend": backend, "workers": workers,
+                           "repeat": config["repeat"]}
+                    row.update({f"wall_{k}_s": v for k, v in wall.items()})
+                    row["cpu_median_s"] = cpu
+                    row["parent_cpu_median_s"] = statistics.median(samples["parent_cpu_ns"]) / 1e9
+                    row["cpu_per_wall"] = cpu / wall["median"] if wall["median"] else 0.0
+                    row["speedup"] = (serial_median / wall["median"]
+                                      if serial_median and wall["median"] else None)
+                    row["samples"] = samples
+                    rows.append(row)
+                    log(format_row(row))
+    return rows
+
+
+# 4. OUTPUT
+HEADER = (f"{'n':>8}{'strategy':>9}{'backend':>12}{'workers':>8}{'median s':>10}"
+          f"{'IQR s':>9}{'95% CI s':>20}{'cpu/wall':>9}{'speedup':>9}")
+
+
+def format_row(row: dict) -> str:
+    ci = f"[{row['wall_ci_low_s']:.4f}, {row['wall_ci_high_s']:.4f}]"
+    speedup = "" if row["speedup"] is None else f"{row['speedup']:.2f}x"
+    return (f"{row['n']:>8}{row['strategy']:>9}{row['backend']:>12}{row['workers']:>8}"
+            f"{row['wall_median_s']:>10.4f}{row['wall_iqr_s']:>9.4f}{ci:>20}"
+            f"{row['cpu_per_wall']:>9.2f}{speedup:>9}")
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "cpus": os.cpu_count(), "gil": gil_enabled()}
+
+
+def write_json(path: str, config: dict, rows: List[dict]) -> None:
+    with open(path, "w") as f:
+        json.dump({"config": config, "environment": environment(), "rows": rows}, f, indent=2)
+
+
+def write_csv(path: str, rows: List[dict]) -> None:
+    # one line per case; the raw samples only go to the JSON file
+    fields = [k for k in rows[0] if k != "samples"] if rows else list(KEY)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# 5. BASELINE COMPARISON
+def compare(rows: List[dict], baseline: dict, threshold: float) -> List[dict]:
+    """Per case found in both: the change in median and a verdict."""
+    old_rows = {tuple(r[k] for k in KEY): r for r in baseline["rows"]}
+    result = []
+    for row in rows:
+        old = old_rows.get(tuple(row[k] for k in KEY))
+        if old is None:
+            continue
+        change = row["wall_median_s"] / old["wall_median_s"] - 1
+        if change > threshold and row["wall_ci_low_s"] > old["wall_ci_high_s"]:
+            verdict = "REGRESSION"
+        elif change < -threshold and row["wall_ci_high_s"] < old["wall_ci_low_s"]:
+            verdict = "faster"
+        else:
+            verdict = "same"
+        result.append({**{k: row[k] for k in KEY}, "baseline_s": old["wall_median_s"],
+                       "current_s": row["wall_median_s"], "change": change,
+                       "verdict": verdict})
+    return result
+
+
+# 6. PLOTS (optional)
+def plot(rows: List[dict], directory: str) -> List[str]:
+    """Median wall time per worker count, one PNG per size and strategy."""
+    try:
+        import matplotlib
+    except ImportError:
+        print("matplotlib is not installed; skipping plots")
+        return []
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    cases = sorted({(r["n"], r["strategy"]) for r in rows})
+    for n, strategy in cases:
+        fig, ax = plt.subplots(figsize=(7, 4.5))
+        for backend in dict.fromkeys(r["backend"] for r in rows):
+            group = [r for r in rows if (r["n"], r["strategy"], r["backend"]) == (n, strategy, backend)]
+            if not group:
+                continue
+            x = [r["workers"] for r in group]
+            y = [r["wall_median_s"] for r in group]
+            err = [[r["wall_median_s"] - r["wall_q1_s"] for r in group],
+                   [r["wall_q3_s"] - r["wall_median_s"] for r in group]]
+            ax.errorbar(x, y, yerr=err, marker="o", capsize=3, label=backend)
+        ax.set_title(f"{rows[0]['count']} factorials, n <= {n} ({strategy})")
+        ax.set_xlabel("Workers")
+        ax.set_ylabel("Median wall time (s), bars = IQR")
+        ax.grid(True, linestyle="--", alpha=0.5)
+        ax.legend()
+        fig.tight_layout()
+        path = os.path.join(directory, f"q3_bench_{n}_{strategy}.png")
+        fig.savefig(path, dpi=150)
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+# 7. CLI
+def load_config(args: argparse.Namespace) -> dict:
+    config = dict(DEFAULTS)
+    if args.config:
+        with open(args.config) as f:
+            from_file = json.load(f)
+        unknown = set(from_file) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown keys in {args.config}: {sorted(unknown)}")
+        config.update(from_file)
+    for key in DEFAULTS:
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+    for key, low in (("repeat", 1), ("warmup", 0), ("count", 1)):
+        if config[key] < low:
+            raise ValueError(f"{key} must be at least {low}, got {config[key]}")
+    for strategy in config["strategies"]:
+        if strategy != "loop" and strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}")
+    unknown = [b for b in config["backends"] or () if b not in available_backends()]
+    if unknown:
+        raise ValueError(f"backends not available here: {unknown}")
+    return config
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Factorial engine benchmark harness")
+    parser.add_argument("--config", help="JSON file with any of the options below")
+    parser.add_argument("--sizes", type=int, nargs="+", help="workload sizes (largest n)")
+    parser.add_argument("--count", type=int, help="factorials per workload")
+    parser.add_argument("--strategies", nargs="+", help="loop, " + ", ".join(STRATEGIES))
+    parser.add_argument("--backends", nargs="+", help="default: every available backend")
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--repeat", type=int, help="timed rounds per case")
+    parser.add_argument("--warmup", type=int, help="untimed rounds per case")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--threshold", type=float,
+                        help="slowdown that counts as a regression (0.10 = 10%%)")
+    parser.add_argument("--json", help="write config, environment and results here")
+    parser.add_argument("--csv", help="write one line per case here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--plot", metavar="DIR", help="save PNG plots here")
+    args = parser.parse_args(argv)
+    try:
+        config = load_config(args)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    env = environment()
+    print(f"{config['count']} factorials per workload, {env['cpus']} CPUs, "
+          f"Python {env['python']}, GIL {'on' if env['gil'] else 'off'}, "
+          f"{config['warmup']} warm-up + {config['repeat']} timed rounds")
+    print(HEADER)
+    rows = run(config)
+
+    if args.json:
+        write_json(args.json, config, rows)
+    if args.csv:
+        write_csv(args.csv, rows)
+    if args.plot:
+        for path in plot(rows, args.plot):
+            print("saved", path)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("cpus") != env["cpus"]:
+            print("note: the baseline was recorded on a machine with a different CPU count")
+        print(f"\nagainst {args.baseline} (threshold {config['threshold']:.0%}):")
+        print(f"{'n':>8}{'strategy':>9}{'backend':>12}{'workers':>8}{'before s':>10}"
+              f"{'after s':>10}{'change':>9}")
+        for c in compare(rows, baseline, config["threshold"]):
+            print(f"{c['n']:>8}{c['strategy']:>9}{c['backend']:>12}{c['workers']:>8}"
+                  f"{c['baseline_s']:>10.4f}{c['current_s']:>10.4f}{c['change']:>+9.1%}  {c['verdict']}")
+            if c["verdict"] == "REGRESSION":
+                status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
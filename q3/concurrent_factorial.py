@@ -1,13 +1,17 @@
-from threading import Thread
+from threading import Barrier, Thread
 import time
 from statistics import mean
 from typing import List, Tuple
-import matplotlib.pyplot as plt
+
+from factorial_algorithms import STRATEGIES
 
 
 # 1. FACTORIAL FUNCTION
-def compute_factorial(n: int) -> int:
-    """Compute factorial in a simple loop."""
+def compute_factorial(n: int, strategy: str = "loop") -> int:
+    """Compute factorial in a simple loop (or with a faster strategy, see
+    factorial_algorithms: "split", "swing", "math", "cached")."""
+    if strategy != "loop":
+        return STRATEGIES[strategy](n)
     result = 1
     for i in range(2, n + 1):
         result *= i
@@ -20,29 +24,27 @@ def run_factorials_multithread(numbers: List[int], rounds: int = 10) -> Tuple[Li
     times = []
 
     for _ in range(rounds):
-        threads = []
-        start_times = []
-        end_times = []
+        # every thread waits at the barrier until all are created, so
+        # thread start-up is outside the timed window
+        barrier = Barrier(len(numbers) + 1)
+        # one slot per thread instead of appending to a shared list
+        results = [0] * len(numbers)
 
         # Work done inside each thread
-        def worker(num: int):
-            start = time.time_ns()
-            compute_factorial(num)
-            end = time.time_ns()
-            start_times.append(start)
-            end_times.append(end)
+        def worker(i: int, num: int):
+            barrier.wait()
+            results[i] = compute_factorial(num)
 
         # Create one thread per number
-        for num in numbers:
-            t = Thread(target=worker, args=(num,))
-            threads.append(t)
+        threads = [Thread(target=worker, args=(i, num)) for i, num in enumerate(numbers)]
+        for t in threads:
             t.start()
 
+        barrier.wait()
+        start = time.perf_counter_ns()
         for t in threads:
             t.join()
-
-        total_ns = max(end_times) - min(start_times)
-        times.append(total_ns)
+        times.append(time.perf_counter_ns() - start)
 
     return times, mean(times)
 
@@ -53,18 +55,25 @@ def run_factorials_singlethread(numbers: List[int], rounds: int = 10) -> Tuple[L
     times = []
 
     for _ in range(rounds):
-        start = time.time_ns()
+        start = time.perf_counter_ns()
         for num in numbers:
             compute_factorial(num)
-        end = time.time_ns()
+        end = time.perf_counter_ns()
         times.append(end - start)
 
     return times, mean(times)
 
 
 # 4. GRAPH PLOTTING
-def plot_results(mt_times_ns: List[int], st_times_ns: List[int]) -> None:
-    """Create graphs for round-by-round time and average time."""
+def plot_results(mt_times_ns: List[int], st_times_ns: List[int], show: bool = False) -> None:
+    """Create graphs for round-by-round time and average time (saved as PNG;
+    show=True also opens a window)."""
+    # imported here so worker processes (factorial_engine) don't load it
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")   # files only: no display needed, never blocks
+    import matplotlib.pyplot as plt
+
     # Convert nanoseconds → milliseconds
     mt_ms = [t / 1e6 for t in mt_times_ns]
     st_ms = [t / 1e6 for t in st_times_ns]
@@ -90,7 +99,9 @@ def plot_results(mt_times_ns: List[int], st_times_ns: List[int]) -> None:
     plt.tight_layout()
     plt.savefig("q3_average_times.png", dpi=300)
 
-    plt.show()
+    if show:
+        plt.show()
+    plt.close("all")
 
 
 # 5. MAIN EXPERIMENT
@@ -120,10 +131,11 @@ def main():
 
     # --- Summary ---
     print("\n[Summary]")
-    speedup = (mt_avg/st_avg)*100 if mt_avg > 0 else 0
+    # a ratio, not a percentage: below 1x the threads were slower
+    speedup = st_avg / mt_avg if mt_avg > 0 else 0
     print(f"Avg Multi-thread : {mt_avg:,.0f} ns")
     print(f"Avg Single-thread: {st_avg:,.0f} ns")
-    print(f"Speedup %: {speedup:.2f}%")
+    print(f"Speedup (single / multi): {speedup:.2f}x")
 
     # Create graphs
     plot_results(mt_times, st_times)
@@ -0,0 +1,254 @@
+"""Fast big-integer factorial strategies and a bounded memo cache.
+
+Multiplying 2..n into one running product costs O(n) multiplications
+of a huge number by a small one: roughly quadratic in the size of n!.
+These strategies keep the operands balanced, so the big
+multiplications are between numbers of similar size, where CPython's
+Karatsuba multiplication pays off:
+
+    split   binary splitting: product(lo..hi) = product(lo..mid) * product(mid..hi)
+    swing   Luschny's prime swing: n! = (n//2)!^2 * swing(n), where
+            swing(n) is a product of primes (each to a small power)
+            found with a sieve. Fewer, smaller multiplications than split
+    math    math.factorial (C, divide and conquer): the baseline
+
+    cached  swing behind a per-process FactorialCache (default_cache)
+
+compute_factorial(n, strategy) in concurrent_factorial picks one; its
+default stays the original loop.
+
+FactorialCache memoizes results up to a bound. On a miss it looks at the
+largest cached n' <= n only: if 2*n' >= n it multiplies in (n'+1)..n
+instead of starting over, otherwise (or with nothing cached below n) it
+computes n! from scratch. Smaller entries are never chained together.
+
+    python factorial_algorithms.py --n 1000 10000 100000 1000000
+"""
+import argparse
+import math
+import statistics
+import time
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+# below this many factors a plain loop beats recursing further
+_LEAF = 16
+
+
+# 1. PRODUCT TREE
+def product_range(lo: int, hi: int) -> int:
+    """lo * (lo+1) * ... * (hi-1), by binary splitting (1 if empty)."""
+    if hi - lo <= _LEAF:
+        result = 1
+        for i in range(lo, hi):
+            result *= i
+        return result
+    mid = (lo + hi) // 2
+    return product_range(lo, mid) * product_range(mid, hi)
+
+
+def product_list(values: List[int], lo: int = 0, hi: Optional[int] = None) -> int:
+    """Product of values[lo:hi], by binary splitting."""
+    if hi is None:
+        hi = len(values)
+    if hi - lo <= _LEAF:
+        result = 1
+        for i in range(lo, hi):
+            result *= values[i]
+        return result
+    mid = (lo + hi) // 2
+    return product_list(values, lo, mid) * product_list(values, mid, hi)
+
+
+def split_factorial(n: int) -> int:
+    return product_range(2, n + 1)
+
+
+# 2. PRIME SWING
+def primes_up_to(n: int) -> List[int]:
+    if n < 2:
+        return []
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0] = sieve[1] = 0
+    for p in range(2, math.isqrt(n) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, n + 1, p)))
+    return [i for i, is_prime in enumerate(sieve) if is_prime]
+
+
+def _swing(n: int, primes: List[int]) -> int:
+    # n! / (n//2)!^2 = product of p^e, where e counts the odd n // p^k
+    factors = []
+    root = math.isqrt(n)
+    for p in primes:
+        if p > n:
+            break
+        if p > n // 2:
+            factors.append(p)           # exponent is 1
+        elif p > root:
+            if (n // p) & 1:
+                factors.append(p)
+        else:
+            q, power = n, 1
+            while q:
+                q //= p
+                if q & 1:
+                    power *= p
+            if power > 1:
+                factors.append(power)
+    return product_list(factors)
+
+
+def swing_factorial(n: int) -> int:
+    if n < 2:
+        return 1
+    primes = primes_up_to(n)
+    # n! = (n//2)!^2 * swing(n), unrolled from the bottom up
+    halves = []
+    m = n
+    while m >= 2:
+        halves.append(m)
+        m //= 2
+    result = 1
+    for m in reversed(halves):
+        result = result * result * _swing(m, primes)
+    return result
+
+
+STRATEGIES: Dict[str, Callable[[int], int]] = {
+    "split": split_factorial,
+    "swing": swing_factorial,
+    "math": math.factorial,
+}
+
+
+# 3. MEMO CACHE
+class FactorialCache:
+    """Bounded LRU cache of factorials.
+
+    A miss extends from the nearest cached n' below n, but only when
+    2*n' >= n (it reuses at least half of the product); otherwise n! is
+    computed from scratch with `strategy`.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bits: int = 1 << 30,
+                 strategy: str = "swing") -> None:
+        self.max_entries = max_entries
+        # total size of the cached values (default 128 MiB)
+        self.max_bits = max_bits
+        self.strategy = STRATEGIES[strategy]
+        self._values: "OrderedDict[int, int]" = OrderedDict()
+        self._keys: List[int] = []          # the cached n, sorted
+        self._bits = 0
+        self.hits = 0
+        self.extended = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, n: int) -> bool:
+        return n in self._values
+
+    def factorial(self, n: int) -> int:
+        if n < 0:
+            raise ValueError("factorial() not defined for negative values")
+        value = self._values.get(n)
+        if value is not None:
+            self.hits += 1
+            self._values.move_to_end(n)
+            return value
+        i = bisect_right(self._keys, n)
+        base = self._keys[i - 1] if i else 0
+        if base and 2 * base >= n:
+            # n! = base! * (base+1)...n
+            self.extended += 1
+            self._values.move_to_end(base)
+            value = self._values[base] * product_range(base + 1, n + 1)
+        else:
+            self.misses += 1
+            value = self.strategy(n)
+        self._store(n, value)
+        return value
+
+    def _store(self, n: int, value: int) -> None:
+        bits = value.bit_length()
+        if bits > self.max_bits:
+            return
+        self._values[n] = value
+        insort(self._keys, n)
+        self._bits += bits
+        while len(self._values) > self.max_entries or self._bits > self.max_bits:
+            old, old_value = self._values.popitem(last=False)
+            self._keys.remove(old)
+            self._bits -= old_value.bit_length()
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._keys.clear()
+        self._bits = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._values), "bits": self._bits, "hits": self.hits,
+                "extended": self.extended, "misses": self.misses}
+
+
+# one per process (pool workers each get their own)
+default_cache = FactorialCache()
+STRATEGIES["cached"] = default_cache.factorial
+
+
+# 4. STRATEGY COMPARISON
+def time_strategy(fn: Callable[[int], int], n: int, repeat: int) -> float:
+    """Median seconds of fn(n)."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn(n)
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1e9
+
+
+def main() -> None:
+    from concurrent_factorial import compute_factorial
+
+    parser = argparse.ArgumentParser(description="Compare factorial strategies")
+    parser.add_argument("--n", type=int, nargs="+", default=[1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-max", type=int, default=200_000,
+                        help="skip the original loop above this n (it is quadratic)")
+    args = parser.parse_args()
+
+    # "cached" would time cache hits here; it gets its own run below
+    strategies = {"loop": compute_factorial,
+                  **{k: v for k, v in STRATEGIES.items() if k != "cached"}}
+    print(f"{'n':>10}" + "".join(f"{name:>12}" for name in strategies) + "   (seconds, median)")
+    for n in args.n:
+        expected = math.factorial(n)
+        row = f"{n:>10}"
+        for name, fn in strategies.items():
+            if name == "loop" and n > args.loop_max:
+                row += f"{'-':>12}"
+                continue
+            assert fn(n) == expected, name
+            row += f"{time_strategy(fn, n, args.repeat):>12.4f}"
+        print(row)
+
+    # the cache on a rising sequence of n, each close to the previous one
+    sequence = [max(args.n) // 10 * k // 8 for k in range(8, 81, 8)]
+    cache = FactorialCache()
+    start = time.perf_counter()
+    for n in sequence:
+        cache.factorial(n)
+    cached_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for n in sequence:
+        swing_factorial(n)
+    fresh_s = time.perf_counter() - start
+    print(f"\n{len(sequence)} rising n up to {sequence[-1]}: cache {cached_s:.3f}s "
+          f"({cache.stats()['extended']} extended), swing from scratch {fresh_s:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
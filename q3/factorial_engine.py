@@ -0,0 +1,221 @@
+"""Factorial execution engine with pluggable backends.
+
+compute_factorial is pure-Python CPU work, so plain threads never run
+two of them at once under the GIL (one Thread per number is slower than
+a single loop). The engine keeps a pool of long-lived workers instead,
+picked by backend name:
+
+    serial       in the calling thread (the baseline)
+    thread       ThreadPoolExecutor: only scales on a free-threaded
+                 (no-GIL) build, see gil_enabled()
+    process      ProcessPoolExecutor: one interpreter and GIL per worker
+    interpreter  InterpreterPoolExecutor (Python 3.14+): one GIL per
+                 subinterpreter, in a single process
+
+More can be added with register_backend(name, factory).
+
+    with FactorialEngine("process", workers=4) as engine:
+        results = engine.map([10_000, 20_000, 50_000])
+
+Work is spread largest-first (factorial cost grows faster than n), in
+chunks, so workers stay evenly busy and per-task overhead is amortized.
+Results come back in input order. A big int crosses the process
+boundary as its raw two's-complement bytes (pickle never goes through
+decimal), which costs about as much as copying it once. Pass
+results=False to get bit lengths instead, when only the timing matters.
+Never str() a large result: since Python 3.11 that raises above 4300
+digits unless sys.set_int_max_str_digits is raised.
+
+Run this file for a speedup table:
+
+    python factorial_engine.py --count 2000 --low 10000 --high 100000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from concurrent_factorial import compute_factorial
+
+
+# 1. WORKER FUNCTIONS (module level, so process pools can pickle them)
+def factorial_bit_length(n: int) -> int:
+    """Compute n! but return only its size in bits (nothing big to send back)."""
+    return compute_factorial(n).bit_length()
+
+
+def _ready(_: int) -> int:
+    return os.getpid()
+
+
+# 2. BACKENDS
+class SerialExecutor(Executor):
+    """Runs everything in the calling thread; same interface as the pools."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        return map(fn, *iterables)
+
+
+def gil_enabled() -> bool:
+    # False only on a free-threaded build running with the GIL off
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+
+def _interpreter_pool(workers: int) -> Executor:
+    from concurrent.futures import InterpreterPoolExecutor
+    return InterpreterPoolExecutor(workers)
+
+
+BACKENDS: Dict[str, Callable[[int], Executor]] = {
+    "serial": lambda workers: SerialExecutor(),
+    "thread": lambda workers: ThreadPoolExecutor(workers),
+    "process": lambda workers: ProcessPoolExecutor(workers),
+    "interpreter": _interpreter_pool,
+}
+
+
+def register_backend(name: str, factory: Callable[[int], Executor]) -> None:
+    """Add a backend: factory(workers) must return a concurrent.futures Executor."""
+    BACKENDS[name] = factory
+
+
+def available_backends() -> List[str]:
+    names = []
+    for name in BACKENDS:
+        if name == "interpreter":
+            try:
+                from concurrent.futures import InterpreterPoolExecutor  # noqa: F401
+            except ImportError:
+                continue
+        names.append(name)
+    return names
+
+
+# 3. ENGINE
+class FactorialEngine:
+    """A long-lived worker pool that computes many factorials at once."""
+
+    def __init__(self, backend: str = "process", workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None,
+                 func: Callable[[int], int] = compute_factorial) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}; choose from {sorted(BACKENDS)}")
+        if backend == "interpreter" and "interpreter" not in available_backends():
+            raise RuntimeError("the interpreter backend needs Python 3.14+")
+        self.backend = backend
+        self.workers = 1 if backend == "serial" else (workers or os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.func = func
+        self._executor: Optional[Executor] = None
+
+    def __enter__(self) -> "FactorialEngine":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Create the pool and wait until every worker is up."""
+        if self._executor is None:
+            self._executor = BACKENDS[self.backend](self.workers)
+            # one round trip per worker, so later timings don't include
+            # process start-up or imports
+            list(self._executor.map(_ready, range(self.workers)))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunk_size(self, count: int) -> int:
+        if self.chunk_size:
+            return self.chunk_size
+        # ~4 chunks per worker: small enough to balance, big enough to
+        # amortize the round trip
+        return max(1, count // (self.workers * 4))
+
+    def map(self, numbers: Iterable[int], results: bool = True) -> List[int]:
+        """n! for every n (or its bit length with results=False), in input order."""
+        self.start()
+        numbers = list(numbers)
+        func = self.func if results else factorial_bit_length
+        # biggest first: the long tasks start early instead of finishing last
+        order = sorted(range(len(numbers)), key=numbers.__getitem__, reverse=True)
+        outputs = self._executor.map(func, [numbers[i] for i in order],
+                                     chunksize=self._chunk_size(len(numbers)))
+        ordered: List[int] = [0] * len(numbers)
+        for i, value in zip(order, outputs):
+            ordered[i] = value
+        return ordered
+
+
+# 4. SPEEDUP TABLE
+def time_engine(engine: FactorialEngine, numbers: List[int], repeat: int,
+                results: bool) -> float:
+    """Median wall time in seconds of engine.map(numbers), pool already warm."""
+    engine.start()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        engine.map(numbers, results)
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1e9
+
+
+def speedup_table(numbers: List[int], backends: List[str], workers: List[int],
+                  repeat: int = 3, results: bool = False) -> List[dict]:
+    with FactorialEngine("serial") as engine:
+        baseline = time_engine(engine, numbers, repeat, results)
+    rows = [{"backend": "serial", "workers": 1, "seconds": baseline,
+             "speedup": 1.0, "efficiency": 1.0}]
+    for backend in backends:
+        for count in workers:
+            with FactorialEngine(backend, count) as engine:
+                seconds = time_engine(engine, numbers, repeat, results)
+            speedup = baseline / seconds
+            rows.append({"backend": backend, "workers": count, "seconds": seconds,
+                         "speedup": speedup, "efficiency": speedup / count})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Factorial engine speedup table")
+    parser.add_argument("--count", type=int, default=200, help="how many factorials")
+    parser.add_argument("--low", type=int, default=10_000)
+    parser.add_argument("--high", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--backends", nargs="+", default=None,
+                        help="default: every available backend except serial")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--results", action="store_true",
+                        help="send the full results back (default: bit lengths only)")
+    args = parser.parse_args()
+
+    import random
+    rng = random.Random(42)
+    numbers = [rng.randint(args.low, args.high) for _ in range(args.count)]
+    backends = args.backends or [b for b in available_backends() if b != "serial"]
+    print(f"{args.count} factorials, n in [{args.low}, {args.high}], "
+          f"{os.cpu_count()} CPUs, GIL {'on' if gil_enabled() else 'off'}, "
+          f"results {'sent back' if args.results else 'as bit lengths'}")
+    print(f"{'backend':<12}{'workers':>8}{'seconds':>10}{'speedup':>10}{'efficiency':>12}")
+    for row in speedup_table(numbers, backends, args.workers, args.repeat, args.results):
+        print(f"{row['backend']:<12}{row['workers']:>8}{row['seconds']:>10.3f}"
+              f"{row['speedup']:>9.2f}x{row['efficiency']:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()